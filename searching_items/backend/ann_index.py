@@ -0,0 +1,341 @@
+from db_pool import get_connection
+from product_writer import add_listener
+from recommender import FEATURE_WEIGHTS, name_tfidf, attribute_features, spherical_kmeans, load_products
+from scipy import sparse
+from scipy.sparse.linalg import svds
+import numpy as np
+import threading
+import argparse
+import json
+import math
+import time
+import os
+
+# -------------------- ANN SETTINGS --------------------
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ann_index.npz")
+DIMENSIONS = 64               # Product vectors are reduced to this many dims with a truncated SVD
+SVD_SAMPLE = 200000           # Rows the SVD is fitted on
+DEFAULT_K = 10
+DEFAULT_PROBES = 8            # Inverted lists scanned per query
+DELTA_MIN_SIZE = 4096         # Inserts wait in a delta until max(DELTA_MIN_SIZE, n / DELTA_FRACTION)
+DELTA_FRACTION = 32
+RANDOM_SEED = 7
+
+# -------------------- PRODUCT VECTORS --------------------
+class ProductEncoder:
+    """
+    recommender.py features (name TF-IDF + attribute groups, FEATURE_WEIGHTS-weighted)
+    projected to DIMENSIONS unit-length dims. The vocabulary, idf, attribute columns
+    and projection are fixed when fitted, so later products are encoded the same way;
+    words first seen after the fit are ignored until the next --build.
+    """
+
+    def __init__(self, vocabulary, idf, columns, components):
+        self.vocabulary = vocabulary  # token -> column
+        self.idf = idf
+        self.columns = columns        # attribute group -> {value: column}
+        self.components = components  # features x DIMENSIONS projection
+
+    @property
+    def dimensions(self):
+        return self.components.shape[1]
+
+    @staticmethod
+    def _features(names_matrix, attributes):
+        names_matrix = names_matrix * np.float32(math.sqrt(FEATURE_WEIGHTS["name"]))
+        return sparse.hstack([names_matrix, sparse.csr_matrix(attributes)]).tocsr()
+
+    @classmethod
+    def fit(cls, names, categories, prices, currencies, units, ratings, dimensions=DIMENSIONS, seed=RANDOM_SEED):
+        names_matrix, vocabulary, idf = name_tfidf(names)
+        attributes, columns = attribute_features(categories, prices, currencies, units, ratings)
+        features = cls._features(names_matrix, attributes)
+        if features.shape[0] > SVD_SAMPLE:
+            rng = np.random.default_rng(seed)
+            features = features[rng.choice(features.shape[0], SVD_SAMPLE, replace=False)]
+
+        dimensions = min(dimensions, min(features.shape) - 1)
+        _, _, components = svds(features.astype(np.float64), k=dimensions,
+                                random_state=np.random.RandomState(seed))
+        return cls(vocabulary, idf, columns, components.T.astype(np.float32))
+
+    def encode(self, names, categories, prices, currencies, units, ratings):
+        """(n, dimensions) float32 unit rows"""
+        names_matrix, _, _ = name_tfidf(names, self.vocabulary, self.idf)
+        attributes, _ = attribute_features(categories, prices, currencies, units, ratings, self.columns)
+        vectors = np.asarray(self._features(names_matrix, attributes) @ self.components, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    # ---------- persistence ----------
+    def state(self):
+        """Everything but the arrays, as JSON (attribute keys can be tuples, stored as lists)"""
+        tokens = sorted(self.vocabulary, key=self.vocabulary.get)
+        columns = {group: [[key, column] for key, column in values.items()]
+                   for group, values in self.columns.items()}
+        return json.dumps({"tokens": tokens, "columns": columns})
+
+    @classmethod
+    def from_state(cls, state, idf, components):
+        state = json.loads(state)
+        vocabulary = {token: column for column, token in enumerate(state["tokens"])}
+        columns = {group: {tuple(key) if isinstance(key, list) else key: column for key, column in values}
+                   for group, values in state["columns"].items()}
+        return cls(vocabulary, idf, columns, components)
+
+# -------------------- IVF INDEX --------------------
+class IVFIndex:
+    """
+    Inverted-file index over product vectors: k-means centroids split the vectors
+    into lists stored contiguously, and a query only scores the lists of its
+    `probes` nearest centroids. Inserts go to a small delta (scanned the same way)
+    that is merged into the lists once it grows past a fraction of the index.
+    """
+
+    def __init__(self, encoder, centroids):
+        self.encoder = encoder
+        self.centroids = centroids
+        dimensions = centroids.shape[1]
+        self.vectors = np.empty((0, dimensions), dtype=np.float32)  # sorted by list
+        self.ids = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(len(centroids) + 1, dtype=np.int64)  # list c is rows offsets[c]:offsets[c+1]
+        self.delta_vectors = np.empty((0, dimensions), dtype=np.float32)
+        self.delta_ids = np.empty(0, dtype=np.int64)
+        self.delta_lists = np.empty(0, dtype=np.int64)
+        self._sorted_ids = None   # (main ids sorted, their rows), rebuilt after merges
+        self.max_product_id = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids) + len(self.delta_ids)
+
+    def _assign(self, vectors):
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def _set_lists(self, ids, vectors, lists):
+        order = np.argsort(lists, kind="stable")
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.ids = ids[order]
+        self.offsets = np.searchsorted(lists[order], np.arange(len(self.centroids) + 1))
+        self._sorted_ids = None
+
+    def _main_rows(self, ids):
+        """Row in the main lists of each id, or -1"""
+        if self._sorted_ids is None:
+            order = np.argsort(self.ids)
+            self._sorted_ids = (self.ids[order], order)
+        sorted_ids, order = self._sorted_ids
+        if len(sorted_ids) == 0:
+            return np.full(len(ids), -1)
+        positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        return np.where(sorted_ids[positions] == ids, order[positions], -1)
+
+    def build(self, ids, vectors):
+        self._set_lists(np.asarray(ids, dtype=np.int64), vectors, self._assign(vectors))
+
+    def add(self, ids, vectors):
+        """Insert products; ids already in the index are skipped. Returns how many were added"""
+        ids = np.asarray(ids, dtype=np.int64)
+        with self.lock:
+            known = (self._main_rows(ids) >= 0) | np.isin(ids, self.delta_ids)
+            ids, vectors = ids[~known], vectors[~known]
+            if len(ids) == 0:
+                return 0
+            self.delta_vectors = np.vstack([self.delta_vectors, vectors])
+            self.delta_ids = np.concatenate([self.delta_ids, ids])
+            self.delta_lists = np.concatenate([self.delta_lists, self._assign(vectors)])
+            if len(self.delta_ids) >= max(DELTA_MIN_SIZE, len(self.ids) // DELTA_FRACTION):
+                self._merge()
+            return len(ids)
+
+    def _merge(self):
+        lists = np.repeat(np.arange(len(self.centroids)), np.diff(self.offsets))
+        self._set_lists(np.concatenate([self.ids, self.delta_ids]),
+                        np.vstack([self.vectors, self.delta_vectors]),
+                        np.concatenate([lists, self.delta_lists]))
+        self.delta_vectors = self.delta_vectors[:0]
+        self.delta_ids = self.delta_ids[:0]
+        self.delta_lists = self.delta_lists[:0]
+
+    def vector(self, product_id):
+        with self.lock:
+            row = self._main_rows(np.array([product_id]))[0]
+            if row >= 0:
+                return self.vectors[row]
+            rows = np.flatnonzero(self.delta_ids == product_id)
+            return self.delta_vectors[rows[0]] if len(rows) else None
+
+    def search(self, vector, k=DEFAULT_K, probes=DEFAULT_PROBES, exclude=None):
+        """Approximate top-k by inner product: (product ids, scores), best first"""
+        with self.lock:
+            centroid_scores = self.centroids @ vector
+            probes = min(probes, len(self.centroids))
+            probed = np.argpartition(-centroid_scores, probes - 1)[:probes]
+
+            scores = [self.vectors[self.offsets[c]:self.offsets[c + 1]] @ vector for c in probed]
+            ids = [self.ids[self.offsets[c]:self.offsets[c + 1]] for c in probed]
+            if len(self.delta_ids):
+                in_probed = np.isin(self.delta_lists, probed)
+                scores.append(self.delta_vectors[in_probed] @ vector)
+                ids.append(self.delta_ids[in_probed])
+        scores = np.concatenate(scores)
+        ids = np.concatenate(ids)
+
+        if exclude is not None:
+            scores[ids == exclude] = -np.inf
+        k = min(k, len(scores))
+        if k <= 0:
+            return ids[:0], scores[:0]
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        best = best[np.isfinite(scores[best])]
+        return ids[best], scores[best]
+
+    def neighbors(self, product_id, k=DEFAULT_K, probes=DEFAULT_PROBES):
+        """Products most similar to an indexed product, as [(product_id, score)]"""
+        vector = self.vector(product_id)
+        if vector is None:
+            return []
+        ids, scores = self.search(vector, k, probes, exclude=product_id)
+        return [(int(i), float(score)) for i, score in zip(ids, scores)]
+
+    # ---------- keeping current ----------
+    def add_products(self, products):
+        """products: (id, product_name, category, price_minor, currency, qty_unit, rating_value) rows"""
+        if not products:
+            return 0
+        ids, names, categories, prices, currencies, units, ratings = (list(column) for column in zip(*products))
+        added = self.add(ids, self.encoder.encode(names, categories, prices, currencies, units, ratings))
+        self.max_product_id = max(self.max_product_id, max(ids))
+        return added
+
+    def on_rows(self, rows):
+        """
+        ProductWriter listener: encodes new products. Writer rows carry no ids, so they
+        are looked up by link; links that were already indexed (price updates) are skipped.
+        """
+        links = {row[5]: row for row in rows if row[5]}
+        if not links:
+            return
+        db, cursor = get_connection()
+        try:
+            cursor.execute(f"SELECT id, product_link FROM daraz_products WHERE product_link IN "
+                           f"({', '.join(['%s'] * len(links))})", tuple(links))
+            found = cursor.fetchall()
+        finally:
+            cursor.close()
+            db.close()
+        self.add_products([(product_id, links[link][0], links[link][3], links[link][8], links[link][9],
+                            links[link][12], links[link][10]) for product_id, link in found])
+
+    def refresh(self):
+        """Pick up rows other processes inserted since the last build/refresh"""
+        db, cursor = get_connection()
+        try:
+            cursor.execute("SELECT id, product_name, category, price_minor, currency, qty_unit, rating_value "
+                           "FROM daraz_products WHERE id > %s ORDER BY id", (self.max_product_id,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            db.close()
+        return self.add_products(rows)
+
+    # ---------- persistence ----------
+    def save(self, path=INDEX_PATH):
+        with self.lock:
+            if len(self.delta_ids):
+                self._merge()
+            # np.savez adds .npz to other names; write beside the target and swap so readers never see half a file
+            temporary = path + ".tmp.npz"
+            np.savez(temporary, centroids=self.centroids, vectors=self.vectors, ids=self.ids,
+                     offsets=self.offsets, max_product_id=self.max_product_id,
+                     encoder_state=self.encoder.state(), idf=self.encoder.idf,
+                     components=self.encoder.components)
+            os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            encoder = ProductEncoder.from_state(str(data["encoder_state"]), data["idf"], data["components"])
+            index = cls(encoder, data["centroids"])
+            index.vectors = data["vectors"]
+            index.ids = data["ids"]
+            index.offsets = data["offsets"]
+            index.max_product_id = int(data["max_product_id"])
+        return index
+
+    def stats(self):
+        return {
+            "products": len(self),
+            "lists": len(self.centroids),
+            "dimensions": self.centroids.shape[1],
+            "megabytes": (self.vectors.nbytes + self.delta_vectors.nbytes) / 1e6,
+        }
+
+def build_index(ids, names, categories, prices, currencies, units, ratings, lists=None):
+    """Fit the encoder and centroids on these products and index them all"""
+    encoder = ProductEncoder.fit(names, categories, prices, currencies, units, ratings)
+    vectors = encoder.encode(names, categories, prices, currencies, units, ratings)
+    lists = lists or max(1, int(math.sqrt(len(ids))))
+    index = IVFIndex(encoder, spherical_kmeans(vectors, min(lists, len(ids))))
+    index.build(ids, vectors)
+    index.max_product_id = max(ids)
+    return index
+
+# -------------------- SHARED INDEX --------------------
+# Loaded from INDEX_PATH (or built from the table) on first use, then kept current by every ProductWriter flush
+_index = None
+_index_lock = threading.Lock()
+
+def build_from_db():
+    ids, names, categories, prices, currencies, units, ratings = load_products()
+    if len(ids) < 2:
+        return None
+    return build_index(ids, names, categories, prices, currencies, units, ratings)
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            started = time.perf_counter()
+            if os.path.exists(INDEX_PATH):
+                _index = IVFIndex.load()
+                _index.refresh()
+            else:
+                _index = build_from_db()
+                if _index is None:
+                    return None
+                _index.save()
+            add_listener(_index.on_rows)
+            stats = _index.stats()
+            print(f"🧭 ANN index: {stats['products']} products in {stats['lists']} lists "
+                  f"({stats['dimensions']} dims, {stats['megabytes']:.0f} MB) in {time.perf_counter() - started:.2f}s")
+        return _index
+
+def neighbors(product_id, k=DEFAULT_K, probes=DEFAULT_PROBES):
+    index = get_index()
+    return index.neighbors(product_id, k, probes) if index is not None else []
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Approximate nearest-neighbour index over product vectors")
+    parser.add_argument("--build", action="store_true", help=f"rebuild {os.path.basename(INDEX_PATH)} from the table")
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--probes", type=int, default=DEFAULT_PROBES)
+    parser.add_argument("product_ids", nargs="*", type=int, help="products to show neighbours for")
+    args = parser.parse_args()
+
+    if args.build:
+        started = time.perf_counter()
+        index = build_from_db()
+        if index is None:
+            print("⚠️ Not enough products to build the index")
+        else:
+            index.save()
+            print(f"💾 Indexed {len(index)} products in {time.perf_counter() - started:.2f}s -> {INDEX_PATH}")
+    for product_id in args.product_ids:
+        started = time.perf_counter()
+        results = neighbors(product_id, args.k, args.probes)
+        print(f"Similar to #{product_id} ({(time.perf_counter() - started) * 1000:.2f} ms):")
+        for neighbor_id, score in results:
+            print(f"  {score:.3f}  #{neighbor_id}")
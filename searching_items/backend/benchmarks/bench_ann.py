@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ann_index import build_index, DEFAULT_K
+from bench_quantity import build_corpus
+
+CATEGORIES = ["protein", "creatine", "vitamins", "pre workout", "mass gainer", "fish oil", "bcaa"]
+UNITS = ["g", "ml", "count", None]
+RATINGS = [None, 3.0, 3.5, 4.0, 4.5, 5.0]
+
+# -------------------- CORPUS --------------------
+def build_products(size, seed=42):
+    """Column lists (ids, names, categories, prices, currencies, units, ratings) like load_products()"""
+    rng = random.Random(seed)
+    names = build_corpus(size, seed)
+    return (list(range(1, size + 1)), names,
+            [rng.choice(CATEGORIES) for _ in names],
+            [rng.randint(50000, 5000000) for _ in names],
+            ["PKR"] * size,
+            [rng.choice(UNITS) for _ in names],
+            [rng.choice(RATINGS) for _ in names])
+
+# -------------------- BENCHMARK --------------------
+def exact_top_k(vectors, ids, query_id, k):
+    scores = vectors @ vectors[query_id - 1]
+    scores[query_id - 1] = -np.inf
+    best = np.argpartition(-scores, k - 1)[:k]
+    return ids[best], scores[best]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the IVF index against exact search")
+    parser.add_argument("--size", type=int, default=1_000_000, help="number of products")
+    parser.add_argument("--queries", type=int, default=500, help="query products (recall uses the first 200)")
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    args = parser.parse_args()
+
+    columns = build_products(args.size)
+    started = time.perf_counter()
+    index = build_index(*columns)
+    print(f"🏗️ Built {len(index)} products into {len(index.centroids)} lists in {time.perf_counter() - started:.1f}s")
+
+    # Exact search over the same vectors, brute force
+    vectors = np.empty_like(index.vectors)
+    vectors[index.ids - 1] = index.vectors
+    ids = np.arange(1, args.size + 1)
+    query_ids = np.random.default_rng(0).choice(ids, args.queries, replace=False)
+    started = time.perf_counter()
+    truth = [exact_top_k(vectors, ids, query_id, args.k) for query_id in query_ids[:200]]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(truth)
+    print(f"   Exact:    {exact_ms:8.3f} ms/query")
+
+    for probes in args.probes:
+        latencies = []
+        for query_id in query_ids:
+            started = time.perf_counter()
+            index.neighbors(int(query_id), args.k, probes)
+            latencies.append((time.perf_counter() - started) * 1000)
+        # Ties make id overlap too strict, so a hit is any result scoring at least the exact k-th score
+        recall = np.mean([np.mean(np.array([score for _, score in index.neighbors(int(query_id), args.k, probes)])
+                                  >= exact_scores.min() - 1e-6) if len(exact_scores) else 1.0
+                          for query_id, (_, exact_scores) in zip(query_ids, truth)])
+        print(f"   probes={probes:<3} p50 {np.percentile(latencies, 50):6.3f} ms  "
+              f"p99 {np.percentile(latencies, 99):6.3f} ms  recall@{args.k} {recall:.3f}")
+
+    # Incremental inserts through the same path the ProductWriter listener uses
+    extra = build_products(10000, seed=7)
+    extra = ([args.size + i for i in extra[0]],) + extra[1:]
+    started = time.perf_counter()
+    for start in range(0, 10000, 100):
+        index.add_products(list(zip(*(column[start:start + 100] for column in extra))))
+    print(f"   Inserts:  {10000 / (time.perf_counter() - started):,.0f} products/s (batches of 100)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+from html import escape
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import db_pool
+from bench_quantity import build_corpus
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_PAGES = {"daraz": (5, 40), "jacknutrition": (5, 24), "amazon": (5, 22)}   # site -> (pages, products per page)
+QUANTITY_CALLS = 200_000
+REGRESSION_THRESHOLD = 0.20    # --compare fails when a rate drops (or peak RSS grows) by more than this
+
+# target -> (module, scrape function, website)
+TARGETS = {
+    "scrape_real_website:daraz": ("scraper", "scrape_real_website", "daraz"),
+    "scrape_real_website:jacknutrition": ("scraper", "scrape_real_website", "jacknutrition"),
+    "scrape_website:daraz": ("multiscraper", "scrape_website", "daraz"),
+    "scrape_website:jacknutrition": ("multiscraper", "scrape_website", "jacknutrition"),
+    "scrape_amazon": ("multiscraper", "scrape_amazon", "amazon"),
+    "extract_quantity": (None, None, None),
+}
+
+# -------------------- FIXTURE PAGES --------------------
+def _daraz_page(products, has_next):
+    cards = "".join(
+        f'<div class="Bm3ON" data-qa-locator="product-item"><div class="inner">'
+        f'<a href="/products/{slug}-i{item_id}.html"><img alt="{escape(name)}" src="/static/{item_id}.jpg"></a>'
+        f'<div class="title"><a href="/products/{slug}-i{item_id}.html">{escape(name)}</a></div>'
+        f'<div class="price"><span class="ooOxS">Rs. {price:,}</span></div>'
+        f'<div class="mdmmT"><span>({reviews})</span></div></div></div>'
+        for item_id, slug, name, price, reviews in products)
+    disabled = "" if has_next else " ant-pagination-disabled"
+    return (f'<html><head><title>Daraz</title></head><body><div class="box--pRqdD">{cards}</div>'
+            f'<ul class="ant-pagination"><li class="ant-pagination-next{disabled}"><a>Next</a></li></ul></body></html>')
+
+def _jacknutrition_page(products, has_next, number):
+    cards = "".join(
+        f'<div class="product-item"><a href="/products/{slug}" class="product-item__image">'
+        f'<img alt="{escape(name)}" src="/static/{item_id}.jpg"></a>'
+        f'<a href="/products/{slug}" class="product-item__title title">{escape(name)}</a>'
+        f'<span class="price"><span class="money">Rs.{price:,}.00</span></span></div>'
+        for item_id, slug, name, price, _ in products)
+    next_link = f'<link rel="next" href="?page={number + 1}">' if has_next else ""
+    return (f'<html><head><title>JackNutrition</title>{next_link}</head><body>'
+            f'<div class="product-list">{cards}</div></body></html>')
+
+def _amazon_page(products, has_next, number):
+    cards = "".join(
+        f'<div data-component-type="s-search-result" data-asin="B0{item_id:08d}"><div class="s-card">'
+        f'<h2><a class="a-link-normal s-link-style" href="/{slug}/dp/B0{item_id:08d}"><span>{escape(name)}</span></a></h2>'
+        f'<span class="a-price"><span class="a-price-whole">{price // 100}.</span><span class="a-price-fraction">99</span></span>'
+        f'<span class="a-icon-alt">{reviews % 20 / 10 + 3:.1f} out of 5 stars</span></div></div>'
+        for item_id, slug, name, price, reviews in products)
+    next_class = "s-pagination-next" if has_next else "s-pagination-next s-pagination-disabled"
+    return (f'<html><head><title>Amazon</title></head><body><div class="s-main-slot">{cards}</div>'
+            f'<a class="{next_class}" href="?page={number + 1}">Next</a></body></html>')
+
+def build_fixtures(directory=FIXTURES_DIR, seed=42):
+    """
+    Listing pages shaped like each site's markup (only what its configured selectors
+    read), with realistic supplement names. Overwrite them with real saved pages via --record.
+    """
+    rng = random.Random(seed)
+    for site, (pages, per_page) in FIXTURE_PAGES.items():
+        os.makedirs(os.path.join(directory, site), exist_ok=True)
+        names = build_corpus(pages * per_page, seed=seed + len(site))
+        for number in range(1, pages + 1):
+            products = []
+            for i in range(per_page):
+                item_id = (number - 1) * per_page + i + 1
+                name = names[item_id - 1]
+                slug = "-".join(name.lower().replace("%", "").replace("(", "").replace(")", "").split())[:60]
+                products.append((item_id, slug, name, rng.randint(15, 400) * 100 - 1, rng.randint(0, 900)))
+            has_next = number < pages
+            if site == "daraz":
+                html = _daraz_page(products, has_next)
+            elif site == "jacknutrition":
+                html = _jacknutrition_page(products, has_next, number)
+            else:
+                html = _amazon_page(products, has_next, number)
+            with open(os.path.join(directory, site, f"page-{number}.html"), "w") as f:
+                f.write(html)
+    print(f"🧩 Wrote fixture pages to {directory}")
+
+def record_fixtures(site, category, pages, directory=FIXTURES_DIR):
+    """Save a live category's listing pages as fixtures (browser for JavaScript sites)"""
+    import multiscraper
+    from pagination import page_url
+    from static_fetch import fetch_html
+    config = multiscraper.WEBSITE_CONFIGS[site]
+    first_url = config['base_url'] + config['search_urls'][category]
+    driver = multiscraper.setup_driver() if config['requires_js'] else None
+    os.makedirs(os.path.join(directory, site), exist_ok=True)
+    try:
+        for number in range(1, pages + 1):
+            url = page_url(first_url, number)
+            if driver:
+                driver.get(url)
+                time.sleep(config['page_timeout'] / 3)
+                html = driver.page_source
+            else:
+                html = fetch_html(url)
+            if not html:
+                break
+            with open(os.path.join(directory, site, f"page-{number}.html"), "w") as f:
+                f.write(html)
+            print(f"   💾 {site}/page-{number}.html <- {url}")
+            time.sleep(config['request_interval'])
+    finally:
+        if driver:
+            driver.quit()
+
+# -------------------- FIXTURE SERVER --------------------
+class FixtureHandler(BaseHTTPRequestHandler):
+    """/<site>/<any path>?page=N serves fixtures/<site>/page-N.html, with an ETag for conditional GETs"""
+    directory = FIXTURES_DIR
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        site = parts.path.strip("/").split("/")[0]
+        number = parse_qs(parts.query).get("page", ["1"])[0]
+        path = os.path.join(self.directory, site, f"page-{number}.html")
+        if not site or not os.path.isfile(path):
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_server(directory=FIXTURES_DIR):
+    FixtureHandler.directory = directory
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+# -------------------- ONE TARGET (child process) --------------------
+def peak_rss_mb():
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def configure_db(db):
+    if db == "memory":
+        db_pool.configure_pool("sqlite", db_pool.SQLitePool(":memory:"))
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench_crawl_"), "bench.db")
+        db_pool.configure_pool("sqlite", db_pool.SQLitePool(path))
+
+def crawl_pass(scrape, driver, website, category):
+    from metrics import metrics
+    metrics.reset()
+    started = time.perf_counter()
+    if website == "amazon":
+        scrape(driver, category)
+    else:
+        scrape(driver, website, category)
+    elapsed = time.perf_counter() - started
+
+    snapshot = metrics.to_json()
+    counters = {}
+    for counter in snapshot["counters"]:
+        key = f"{counter['name']}:{counter['labels'].get('status') or counter['labels'].get('event')}"
+        counters[key] = counters.get(key, 0) + counter["value"]
+    pages = sum(value for key, value in counters.items() if key.startswith("pages:") and key != "pages:failed")
+    products = counters.get("products:seen", 0)
+    extraction = {}
+    for stage in snapshot["stages"]:
+        if stage["stage"] in ("html_parse", "extract_page"):
+            extraction = {"p50_ms": stage["p50"] * 1000, "p90_ms": stage["p90"] * 1000,
+                          "p99_ms": stage["p99"] * 1000}
+    return {"seconds": round(elapsed, 4), "pages": pages, "products": products,
+            "pages_per_second": round(pages / elapsed, 2) if elapsed else 0.0,
+            "products_per_second": round(products / elapsed, 2) if elapsed else 0.0,
+            "inserted": counters.get("products:inserted", 0),
+            "unchanged_pages": counters.get("pages:unchanged", 0),
+            "extraction": {key: round(value, 3) for key, value in extraction.items()}}
+
+def run_crawl_target(target, db, browser):
+    module_name, function_name, website = TARGETS[target]
+    configure_db(db)
+    server, base = start_server()
+    module = __import__(module_name)
+    config = module.WEBSITE_CONFIGS[website]
+    config.update({"base_url": f"{base}/{website}", "accessible": True, "request_interval": 0,
+                   "requires_js": browser})
+    category = next(iter(config['search_urls']))
+
+    driver = None
+    if browser:
+        driver = module.setup_driver()
+        if driver is None:
+            return {"target": target, "skipped": "Chrome could not be started"}
+    try:
+        # Silence the scrapers' per-product prints, they would dominate the timing
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                cold = crawl_pass(getattr(module, function_name), driver, website, category)
+                # Second pass over the same pages: conditional GETs / unchanged hashes
+                recrawl = crawl_pass(getattr(module, function_name), driver, website, category)
+            finally:
+                sys.stdout = stdout
+    finally:
+        if driver:
+            driver.quit()
+        server.shutdown()
+    return {"target": target, "mode": "browser" if browser else "http", "db": db,
+            "cold": cold, "recrawl": recrawl, "peak_rss_mb": peak_rss_mb()}
+
+def run_quantity_target(calls=QUANTITY_CALLS):
+    from bs4 import BeautifulSoup
+    from quantity import extract_quantity
+    names = []
+    for site in FIXTURE_PAGES:
+        site_dir = os.path.join(FIXTURES_DIR, site)
+        for filename in sorted(os.listdir(site_dir)):
+            soup = BeautifulSoup(open(os.path.join(site_dir, filename)).read(), "lxml")
+            names += [img.get("alt") for img in soup.select("img[alt]")]
+            names += [span.get_text(strip=True) for span in soup.select("h2 a span")]
+    names = [name for name in names if name]
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(calls):
+        call_started = time.perf_counter_ns()
+        extract_quantity(names[i % len(names)])
+        latencies.append(time.perf_counter_ns() - call_started)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    percentile = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] / 1000, 2)
+    return {"target": "extract_quantity", "calls": calls, "names": len(names),
+            "calls_per_second": round(calls / elapsed), "p50_us": percentile(0.5),
+            "p90_us": percentile(0.9), "p99_us": percentile(0.99), "peak_rss_mb": peak_rss_mb()}
+
+# -------------------- REPORT --------------------
+def print_result(result):
+    if "skipped" in result:
+        print(f"  {result['target']:36} skipped: {result['skipped']}")
+    elif result["target"] == "extract_quantity":
+        print(f"  {result['target']:36} {result['calls_per_second']:>10,} calls/s  "
+              f"p50 {result['p50_us']} µs  p90 {result['p90_us']} µs  p99 {result['p99_us']} µs  "
+              f"peak RSS {result['peak_rss_mb']} MB")
+    else:
+        for name in ("cold", "recrawl"):
+            run = result[name]
+            extraction = run["extraction"]
+            latency = (f"extract p50 {extraction['p50_ms']} ms p99 {extraction['p99_ms']} ms"
+                       if extraction else "no pages parsed")
+            label = result["target"] if name == "cold" else ""
+            print(f"  {label:36} {name:8} {run['pages_per_second']:>8} pages/s {run['products_per_second']:>9} products/s  "
+                  f"{latency}")
+        print(f"  {'':36} {'':8} peak RSS {result['peak_rss_mb']} MB")
+
+def rates(result):
+    """Higher-is-better numbers a regression check compares"""
+    if "skipped" in result:
+        return {}
+    if result["target"] == "extract_quantity":
+        return {"calls_per_second": result["calls_per_second"]}
+    return {"cold pages/s": result["cold"]["pages_per_second"],
+            "cold products/s": result["cold"]["products_per_second"],
+            "recrawl pages/s": result["recrawl"]["pages_per_second"]}
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print regressions against a saved run. Returns True if there are any"""
+    previous = {result["target"]: result for result in baseline}
+    regressed = False
+    for result in results:
+        old = previous.get(result["target"])
+        if not old or "skipped" in old:
+            continue
+        changes = [(name, rates(old)[name], value) for name, value in rates(result).items() if rates(old).get(name)]
+        changes.append(("peak RSS MB (lower is better)", -old["peak_rss_mb"], -result["peak_rss_mb"]))
+        for name, before, after in changes:
+            change = (after - before) / abs(before) if before else 0.0
+            if change < -threshold:
+                regressed = True
+                print(f"  ❌ {result['target']}: {name} {abs(before)} -> {abs(after)} ({change:+.0%})")
+    if not regressed:
+        print(f"  ✅ No regression beyond {threshold:.0%}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline crawl benchmark on fixture pages and SQLite")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--db", choices=["memory", "file"], default="memory",
+                        help="in-memory SQLite or a temporary SQLite file")
+    parser.add_argument("--browser", action="store_true",
+                        help="load fixture pages in headless Chrome instead of over plain HTTP")
+    parser.add_argument("--build-fixtures", action="store_true", help="regenerate the fixture pages")
+    parser.add_argument("--record", nargs=2, metavar=("SITE", "CATEGORY"),
+                        help="save live listing pages of a category as the site's fixtures")
+    parser.add_argument("--record-pages", type=int, default=5)
+    parser.add_argument("--save", metavar="JSON", help="write the results (use as a --compare baseline)")
+    parser.add_argument("--compare", metavar="JSON", help="exit 1 if a rate dropped more than the threshold")
+    parser.add_argument("--target", help=argparse.SUPPRESS)     # child process: run one target
+    args = parser.parse_args()
+
+    if args.target:
+        if args.target == "extract_quantity":
+            result = run_quantity_target()
+        else:
+            result = run_crawl_target(args.target, args.db, args.browser)
+        print(json.dumps(result))
+        return
+
+    if args.record:
+        record_fixtures(args.record[0], args.record[1], args.record_pages)
+        return
+    if args.build_fixtures or not os.path.isdir(FIXTURES_DIR):
+        build_fixtures()
+
+    # One process per target, so peak RSS belongs to that target alone
+    print(f"🏁 Crawl benchmark ({'browser' if args.browser else 'http'}, {args.db} SQLite)")
+    results = []
+    for target in args.targets:
+        command = [sys.executable, os.path.abspath(__file__), "--target", target, "--db", args.db]
+        if args.browser:
+            command.append("--browser")
+        completed = subprocess.run(command, capture_output=True, text=True)
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines:
+            print(f"  ❌ {target} failed: {completed.stderr.strip()[-300:]}")
+            continue
+        result = json.loads(lines[-1])
+        results.append(result)
+        print_result(result)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"💾 Saved results to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(results, json.load(f)):
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
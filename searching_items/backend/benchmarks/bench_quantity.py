@@ -0,0 +1,126 @@
+import os
+import sys
+import re
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from quantity import extract_quantity
+
+# -------------------- OLD EXTRACTOR (scraper.py before the shared module) --------------------
+def legacy_extract_quantity(product_name, website="daraz"):
+    """Per-pattern re.search loop, kept here as the benchmark baseline"""
+    if not product_name:
+        return "Not specified"
+
+    text = product_name.lower()
+
+    patterns = [
+        (r'(\d+(?:\.\d+)?)\s*(kg|kilogram|kilo)\b', 'kg'),
+        (r'(\d+(?:\.\d+)?)\s*(g|gm|gram)\b', 'g'),
+        (r'(\d+)\s*(mg|milligram)\b', 'mg'),
+        (r'(\d+(?:\.\d+)?)\s*(l|litre|liter)\b', 'L'),
+        (r'(\d+(?:\.\d+)?)\s*(ml|milliliter)\b', 'ml'),
+        (r'(\d+)\s*(capsules?|caps?)\b', 'capsules'),
+        (r'(\d+)\s*(tablets?|tabs?)\b', 'tablets'),
+        (r'(\d+)\s*(pills?)\b', 'pills'),
+        (r'(\d+)\s*(pieces?|pcs?)\b', 'pieces'),
+        (r'(\d+)\s*(servings?)\b', 'servings'),
+        (r'(\d+)\s*(packs?|pk?)\b', 'pack'),
+        (r'(\d+)\s*(bottles?)\b', 'bottle'),
+        (r'(\d+)\s*(jars?)\b', 'jar'),
+        (r'(\d+)\s*(tubs?)\b', 'tub'),
+        (r'(\d+)\s*(scoops?)\b', 'scoops'),
+        (r'(\d+)\s*x\s*(\d+)\s*(mg|g|kg|ml|l|capsules?|tablets?|servings?)\b', 'multi-pack'),
+        (r'(\d+(?:\.\d+)?)\s*(oz|ounce)\b', 'oz'),
+        (r'(\d+(?:\.\d+)?)\s*(lb|pound)\b', 'lb'),
+    ]
+
+    for pattern, unit in patterns:
+        match = re.search(pattern, text)
+        if match:
+            if unit == 'multi-pack':
+                count = match.group(1)
+                amount = match.group(2)
+                sub_unit = match.group(3)
+                return f"{count} x {amount}{sub_unit}"
+            else:
+                amount = match.group(1)
+                return f"{amount} {unit}"
+
+    common_phrases = {
+        '1kg': '1 kg', '2kg': '2 kg', '5kg': '5 kg',
+        '500g': '500 g', '250g': '250 g', '1l': '1 L',
+        '500ml': '500 ml', '30capsules': '30 capsules',
+        '60tablets': '60 tablets', '90caps': '90 capsules',
+        '2lb': '2 lb', '5lb': '5 lb', '10lb': '10 lb',
+        '907g': '907 g', '2268g': '2268 g',
+        '30servings': '30 servings', '60servings': '60 servings',
+    }
+
+    for phrase, quantity in common_phrases.items():
+        if phrase in text.replace(" ", ""):
+            return quantity
+
+    return "Not specified"
+
+# -------------------- CORPUS --------------------
+BRANDS = ["Optimum Nutrition", "MuscleTech", "Dymatize", "BSN", "MyProtein", "Jack Nutrition",
+          "Cellucor", "Rule 1", "GNC", "Universal", "Scitec", "Applied Nutrition", "Nutrex"]
+PRODUCTS = ["Gold Standard Whey Protein", "Creatine Monohydrate", "ISO100 Hydrolyzed",
+            "Syntha-6 Protein Powder", "Serious Mass Gainer", "BCAA Energy", "C4 Pre-Workout",
+            "Multivitamin", "Omega 3 Fish Oil", "Vitamin D3", "Glutamine", "ZMA", "Casein Protein"]
+QUANTITIES = ["{n}kg", "{n} kg", "{n}g", "{n} gm", "{n}lb", "{n} lbs", "{n} pound", "{n}ml",
+              "{n} Capsules", "{n} caps", "{n} Tablets", "{n} Servings", "{n} Scoops",
+              "{n} x {m}g", "{n}x{m} capsules", "{n} oz", "{n}L", "{n} Pack", "", ""]
+EXTRAS = ["", "", "Chocolate", "Vanilla Ice Cream", "(Imported)", "Free Shaker", "Unflavored",
+          "- Original", "100% Authentic", "Buy 1 Get 1"]
+
+def build_corpus(size, seed=42):
+    """Random but realistic supplement product names"""
+    rng = random.Random(seed)
+    names = []
+    for _ in range(size):
+        quantity = rng.choice(QUANTITIES).format(n=rng.choice([1, 2, 2.5, 4.5, 5, 10, 12, 30, 60, 90, 120, 500, 907]),
+                                                 m=rng.choice([30, 60, 250, 500]))
+        parts = [rng.choice(BRANDS), rng.choice(PRODUCTS), quantity, rng.choice(EXTRAS)]
+        if rng.random() < 0.3:
+            parts.insert(2, rng.choice(EXTRAS))
+        names.append(" ".join(part for part in parts if part))
+    return names
+
+# -------------------- BENCHMARK --------------------
+def time_extractor(extractor, names, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for name in names:
+            extractor(name)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the quantity extractor")
+    parser.add_argument("--size", type=int, default=200_000, help="number of product names")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per extractor (best is reported)")
+    args = parser.parse_args()
+
+    names = build_corpus(args.size)
+
+    # Both extractors must agree on every name before timing means anything
+    mismatches = [name for name in names if extract_quantity(name) != legacy_extract_quantity(name)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} names differ, e.g. {mismatches[:3]}")
+        sys.exit(1)
+    print(f"✅ Identical results on {len(names)} names")
+
+    legacy_time = time_extractor(legacy_extract_quantity, names, args.repeat)
+    new_time = time_extractor(extract_quantity, names, args.repeat)
+
+    print(f"   Legacy:   {legacy_time:.3f}s ({len(names) / legacy_time:,.0f} names/s)")
+    print(f"   Compiled: {new_time:.3f}s ({len(names) / new_time:,.0f} names/s)")
+    print(f"   Speedup:  x{legacy_time / new_time:.2f}")
+
+if __name__ == "__main__":
+    main()
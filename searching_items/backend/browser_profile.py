@@ -0,0 +1,135 @@
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from collections import namedtuple
+from urllib.parse import urlparse
+import threading
+
+# -------------------- PROFILE SETTINGS --------------------
+LEAN_PROFILE = True             # False: load full pages (images, fonts, trackers) like a normal browser
+
+# The scrapers only read the DOM (the Daraz name is the img alt attribute, not the
+# image), so images, media and fonts are never downloaded
+BLOCKED_RESOURCES = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+]
+# Third-party analytics/ads every site loads; site-specific ones go in the
+# config's "blocked_urls"
+BLOCKED_TRACKERS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*connect.facebook.net*", "*hotjar.com*",
+    "*clarity.ms*", "*tiktok.com*", "*criteo.*", "*scorecardresearch.com*",
+]
+CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.notifications": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+}
+LEAN_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+]
+
+def blocked_urls(website_configs):
+    """Common resource and tracker patterns plus every site's "blocked_urls" (one browser serves all sites)"""
+    patterns = BLOCKED_RESOURCES + BLOCKED_TRACKERS
+    for config in website_configs.values():
+        patterns += [pattern for pattern in config.get('blocked_urls', []) if pattern not in patterns]
+    return patterns
+
+def lean_options(options):
+    """
+    Turn ChromeOptions into the lean profile: no images, eager page loads (driver.get
+    returns at DOMContentLoaded; wait_for_products waits for the grid itself)
+    """
+    options.page_load_strategy = "eager"
+    options.add_experimental_option("prefs", CHROME_PREFS)
+    for argument in LEAN_ARGUMENTS:
+        options.add_argument(argument)
+    return options
+
+def block_urls(driver, patterns):
+    """Block requests matching the patterns for the whole session (CDP, Chrome only)"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        return True
+    except (WebDriverException, AttributeError) as e:
+        print(f"⚠️ Could not set URL blocklist: {str(e)[:80]}")
+        return False
+
+# -------------------- PAGE METRICS --------------------
+# Times in ms from navigation start. Bytes are transfer sizes from the Resource Timing
+# API, so cross-origin resources without Timing-Allow-Origin count as 0 (blocked ones
+# are never fetched and never listed)
+PageMetrics = namedtuple("PageMetrics", ["url", "host", "dom_ready_ms", "ready_ms",
+                                         "document_bytes", "resource_bytes", "resources"])
+
+METRICS_SCRIPT = """
+var navigation = performance.getEntriesByType('navigation')[0] || {};
+var resources = performance.getEntriesByType('resource');
+var bytes = 0;
+resources.forEach(function (entry) { bytes += entry.transferSize || 0; });
+return [navigation.domContentLoadedEventEnd || 0, performance.now(),
+        navigation.transferSize || 0, bytes, resources.length];
+"""
+
+def page_metrics(driver, url):
+    """PageMetrics for the page the driver is on, read in one script call (None if unavailable)"""
+    try:
+        dom_ready, ready, document_bytes, resource_bytes, resources = driver.execute_script(METRICS_SCRIPT)
+    except (WebDriverException, TypeError, ValueError):
+        return None
+    return PageMetrics(url, urlparse(url).netloc, round(dom_ready), round(ready),
+                       int(document_bytes), int(resource_bytes), int(resources))
+
+class PageStats:
+    """Page load totals per host across every browser in the process"""
+
+    def __init__(self):
+        self.hosts = {}           # host -> [pages, ready_ms, bytes, resources]
+        self.lock = threading.Lock()
+
+    def record(self, metrics):
+        if metrics is None:
+            return
+        with self.lock:
+            totals = self.hosts.setdefault(metrics.host, [0, 0, 0, 0])
+            totals[0] += 1
+            totals[1] += metrics.ready_ms
+            totals[2] += metrics.document_bytes + metrics.resource_bytes
+            totals[3] += metrics.resources
+
+    def summary(self):
+        """{host: {"pages", "avg_ready_ms", "avg_kb", "avg_resources"}}"""
+        with self.lock:
+            return {host: {"pages": pages, "avg_ready_ms": round(ready / pages),
+                           "avg_kb": round(size / pages / 1024, 1), "avg_resources": round(resources / pages, 1)}
+                    for host, (pages, ready, size, resources) in self.hosts.items()}
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print("\n📶 Page loads per host:")
+        for host, totals in sorted(summary.items()):
+            print(f"   {host:28} {totals['pages']:>4} pages  {totals['avg_ready_ms']:>6} ms  "
+                  f"{totals['avg_kb']:>8} KB  {totals['avg_resources']:>6} requests (avg)")
+
+# Shared by every scraper thread
+page_stats = PageStats()
+
+def setup_lean_driver(options, patterns, page_load_timeout=30):
+    """Start Chrome with the lean profile and the URL blocklist (unless LEAN_PROFILE is off)"""
+    driver = webdriver.Chrome(options=lean_options(options) if LEAN_PROFILE else options)
+    driver.set_page_load_timeout(page_load_timeout)
+    if LEAN_PROFILE:
+        block_urls(driver, patterns)
+    return driver
@@ -0,0 +1,61 @@
+from selenium.common.exceptions import WebDriverException
+
+# -------------------- BULK EXTRACTION SETTINGS --------------------
+BULK_EXTRACT = True             # False: always use the per-element WebDriver path
+
+# For every container and field, the first selector that matches decides the value:
+# attr None is the visible text (like WebElement.text), "textContent" the raw text,
+# anything else the element property (absolute href, alt, ...) or attribute.
+# Fields with no matching selector come back as null.
+EXTRACT_SCRIPT = """
+var containers = arguments[0], fields = arguments[1];
+function read(element, attr) {
+    if (attr === null) return (element.innerText || '').trim();
+    if (attr === 'textContent') return element.textContent;
+    var value = element[attr];
+    return typeof value === 'string' ? value : element.getAttribute(attr);
+}
+return containers.map(function (container) {
+    var record = {};
+    Object.keys(fields).forEach(function (field) {
+        record[field] = null;
+        for (var i = 0; i < fields[field].length; i++) {
+            var element = container.querySelector(fields[field][i][0]);
+            if (element) {
+                record[field] = read(element, fields[field][i][1]);
+                break;
+            }
+        }
+    });
+    return record;
+});
+"""
+
+def field(*options):
+    """Fallback chain for one field: field((selector, attr), (selector, attr), ...)"""
+    return [list(option) for option in options]
+
+def read_records(driver, containers, fields):
+    """
+    Every container's fields in one execute_script round trip instead of several
+    find_element/get_attribute calls per product. None if the script fails (stale
+    elements, navigation, a driver without JavaScript), so the caller can fall back.
+    """
+    try:
+        records = driver.execute_script(EXTRACT_SCRIPT, list(containers), fields)
+    except WebDriverException as e:
+        print(f"   ⚠️ Bulk extraction failed, reading elements one by one: {str(e)[:60]}")
+        return None
+    if not isinstance(records, list) or len(records) != len(containers):
+        return None
+    return records
+
+def extract_page(driver, containers, fields, build, extract):
+    """
+    Products of one listing page: build(record) for each bulk-read record, or
+    extract(container) per element when bulk extraction is off or fails
+    """
+    records = read_records(driver, containers, fields) if BULK_EXTRACT else None
+    if records is None:
+        return [extract(container) for container in containers]
+    return [build(record) for record in records]
@@ -0,0 +1,324 @@
+from datetime import datetime
+from db_pool import get_connection, MYSQL_CONFIG, DatabaseError
+from normalize import normalize_row, NORMALIZED_COLUMNS
+from quantity import extract_quantity
+import mysql.connector
+import db_pool
+import argparse
+import gzip
+import time
+import csv
+import os
+
+# -------------------- I/O SETTINGS --------------------
+CHUNK_ROWS = 50_000             # Rows per fetchmany / executemany / Parquet row group
+# Preferred column order; whatever else a table has (created_at, description) follows
+COLUMN_ORDER = ["id", "product_name", "price", "rating", "category", "website", "product_link", "page",
+                "quantity", "price_minor", "currency", "rating_value", "qty_value", "qty_unit",
+                "unit_price_minor", "created_at", "last_updated", "description"]
+INT_COLUMNS = {"id", "page", "price_minor", "unit_price_minor"}
+FLOAT_COLUMNS = {"rating_value", "qty_value"}
+TIMESTAMP_COLUMNS = {"created_at", "last_updated"}
+# Scraped values normalize_row() needs to fill in the numeric columns
+SCRAPED_COLUMNS = ["product_name", "price", "rating", "category", "website", "product_link", "page", "quantity"]
+
+# -------------------- TABLE ACCESS --------------------
+def table_columns(cursor, dialect):
+    """daraz_products columns that can be written (MySQL's generated link_hash is left out)"""
+    if dialect == "sqlite":
+        cursor.execute("PRAGMA table_info(daraz_products)")
+        columns = [row[1] for row in cursor.fetchall()]
+    else:
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'daraz_products'
+              AND EXTRA NOT LIKE '%%GENERATED%%'
+            ORDER BY ORDINAL_POSITION
+        """)
+        columns = [row[0] for row in cursor.fetchall()]
+    return sorted(columns, key=lambda column: COLUMN_ORDER.index(column) if column in COLUMN_ORDER else len(COLUMN_ORDER))
+
+def read_table(backend=None, chunk_rows=CHUNK_ROWS):
+    """
+    Yield (columns, rows) chunks of the whole table. MySQL streams through an unbuffered
+    (server-side) cursor and SQLite steps its cursor, so only one chunk is ever in memory.
+    """
+    db, cursor = get_connection(backend)
+    dialect = getattr(db, "dialect", "mysql")
+    columns = table_columns(cursor, dialect)
+    stream = db.cursor(buffered=False) if dialect == "mysql" else db.cursor()
+    try:
+        stream.execute(f"SELECT {', '.join(columns)} FROM daraz_products ORDER BY id")
+        while True:
+            rows = stream.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield columns, rows
+    finally:
+        stream.close()
+        cursor.close()
+        db.close()
+
+def _upsert_sql(columns, dialect):
+    placeholders = ", ".join(["%s"] * len(columns))
+    updates = [column for column in columns if column not in ("id", "product_link")]
+    if dialect == "sqlite":
+        conflict = ", ".join(f"{column} = excluded.{column}" for column in updates)
+        return (f"INSERT INTO daraz_products ({', '.join(columns)}) VALUES ({placeholders}) "
+                f"ON CONFLICT(product_link) DO UPDATE SET {conflict}")
+    conflict = ", ".join(f"{column} = VALUES({column})" for column in updates)
+    return (f"INSERT INTO daraz_products ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON DUPLICATE KEY UPDATE {conflict}")
+
+def _complete_rows(columns, rows):
+    """
+    Add quantity and the normalized numeric columns when the source has none
+    (e.g. the original daraz_products.csv). Returns (columns, rows)
+    """
+    missing = [column for column in ["quantity"] + NORMALIZED_COLUMNS if column not in columns]
+    if not missing or "product_name" not in columns:
+        return columns, rows
+    position = {column: i for i, column in enumerate(columns)}
+    completed = []
+    for row in rows:
+        scraped = [row[position[column]] if column in position else None for column in SCRAPED_COLUMNS]
+        if scraped[7] is None:
+            scraped[7] = extract_quantity(scraped[0])
+        extra = dict(zip(["quantity"] + NORMALIZED_COLUMNS, [scraped[7]] + list(normalize_row(scraped))))
+        completed.append(tuple(row) + tuple(extra[column] for column in missing))
+    return columns + missing, completed
+
+def write_table(chunks, backend=None, keep_ids=False):
+    """
+    Upsert (columns, rows) chunks into daraz_products by product_link, one executemany
+    and transaction per chunk. Columns the table does not have are dropped; ids are only
+    kept with keep_ids (meant for copying into an empty table). Returns rows written.
+    """
+    db, cursor = get_connection(backend)
+    dialect = getattr(db, "dialect", "mysql")
+    target = set(table_columns(cursor, dialect))
+    written = 0
+    started = time.perf_counter()
+    try:
+        for columns, rows in chunks:
+            columns, rows = _complete_rows(list(columns), rows)
+            keep = [i for i, column in enumerate(columns)
+                    if column in target and (keep_ids or column != "id")]
+            kept_columns = [columns[i] for i in keep]
+            values = [tuple(row[i] for i in keep) for row in rows]
+            try:
+                db.start_transaction()
+                cursor.executemany(_upsert_sql(kept_columns, dialect), values)
+                db.commit()
+            except DatabaseError:
+                db.rollback()
+                raise
+            written += len(values)
+            print(f"   📥 {written:,} rows ({written / (time.perf_counter() - started):,.0f} rows/s)")
+    finally:
+        cursor.close()
+        db.close()
+    return written
+
+# -------------------- CSV --------------------
+def _open_text(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", newline="", encoding="utf-8")
+    return open(path, mode, newline="", encoding="utf-8")
+
+def write_csv(path, chunks):
+    """Stream chunks to CSV (gzip for .gz). NULL is written as an empty field"""
+    rows_written = 0
+    with _open_text(path, "w") as f:
+        writer = csv.writer(f)
+        for columns, rows in chunks:
+            if rows_written == 0:
+                writer.writerow(columns)
+            writer.writerows(rows)
+            rows_written += len(rows)
+    return rows_written
+
+def read_csv(path, chunk_rows=CHUNK_ROWS):
+    """Yield (columns, rows) chunks from a CSV with a header; empty fields become NULL"""
+    with _open_text(path, "r") as f:
+        reader = csv.reader(f)
+        columns = next(reader, None)
+        if not columns:
+            return
+        rows = []
+        for record in reader:
+            rows.append(tuple(value if value != "" else None for value in record))
+            if len(rows) >= chunk_rows:
+                yield columns, rows
+                rows = []
+        if rows:
+            yield columns, rows
+
+def load_data_infile(path, keep_ids=False):
+    """
+    MySQL's own CSV loader for a plain .csv written by write_csv (or the original
+    daraz_products.csv). Rows whose product_link already exists are skipped, empty
+    fields become NULL. Needs local_infile enabled on the server. Returns rows loaded.
+    """
+    db = mysql.connector.connect(**MYSQL_CONFIG, allow_local_infile=True)
+    cursor = db.cursor()
+    try:
+        target = set(table_columns(cursor, "mysql"))
+        with open(path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f))
+        variables, assignments = [], []
+        for i, column in enumerate(header):
+            if column in target and (keep_ids or column != "id"):
+                variables.append(f"@c{i}")
+                assignments.append(f"{column} = NULLIF(@c{i}, '')")
+            else:
+                variables.append("@skip")
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE daraz_products
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '\\r\\n'
+            IGNORE 1 LINES
+            ({', '.join(variables)})
+            SET {', '.join(assignments)}
+        """, (os.path.abspath(path),))
+        loaded = cursor.rowcount
+        db.commit()
+    finally:
+        cursor.close()
+        db.close()
+    print("   ℹ️ LOAD DATA does not fill the normalized columns, run normalize.py --backfill afterwards")
+    return loaded
+
+# -------------------- PARQUET / ARROW --------------------
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("Parquet/Arrow files need pyarrow (pip install pyarrow)")
+
+def _timestamp(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def arrow_schema(columns):
+    pa = _arrow()
+    def column_type(column):
+        if column in INT_COLUMNS:
+            return pa.int64()
+        if column in FLOAT_COLUMNS:
+            return pa.float64()
+        if column in TIMESTAMP_COLUMNS:
+            return pa.timestamp("s")
+        return pa.string()
+    return pa.schema([(column, column_type(column)) for column in columns])
+
+def arrow_batch(columns, rows, schema):
+    """One chunk as a RecordBatch (rows are transposed into columns here, chunk by chunk)"""
+    pa = _arrow()
+    arrays = []
+    for column, values in zip(columns, zip(*rows)):
+        if column in TIMESTAMP_COLUMNS:
+            values = [_timestamp(value) for value in values]
+        elif column not in INT_COLUMNS and column not in FLOAT_COLUMNS:
+            values = [None if value is None else str(value) for value in values]
+        arrays.append(pa.array(values, type=schema.field(column).type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def write_columnar(path, chunks):
+    """Stream chunks to Parquet (one row group per chunk) or, for .arrow/.feather, Arrow IPC"""
+    pa = _arrow()
+    writer = None
+    rows_written = 0
+    try:
+        for columns, rows in chunks:
+            if writer is None:
+                schema = arrow_schema(columns)
+                if path.endswith((".arrow", ".feather")):
+                    writer = pa.ipc.new_file(path, schema)
+                else:
+                    writer = pa.parquet.ParquetWriter(path, schema, compression="zstd")
+            writer.write_batch(arrow_batch(columns, rows, schema))
+            rows_written += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows_written
+
+def read_columnar(path, chunk_rows=CHUNK_ROWS):
+    """Yield (columns, rows) chunks from Parquet or Arrow IPC, one batch at a time"""
+    pa = _arrow()
+    if path.endswith((".arrow", ".feather")):
+        reader = pa.ipc.open_file(path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    else:
+        batches = pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_rows)
+    for batch in batches:
+        columns = batch.schema.names
+        yield columns, list(zip(*(batch.column(i).to_pylist() for i in range(len(columns)))))
+
+# -------------------- COMMANDS --------------------
+def _is_columnar(path):
+    return path.endswith((".parquet", ".arrow", ".feather"))
+
+def export_catalog(path, backend=None, chunk_rows=CHUNK_ROWS):
+    """daraz_products -> CSV (.csv/.csv.gz), Parquet (.parquet) or Arrow (.arrow/.feather)"""
+    started = time.perf_counter()
+    chunks = read_table(backend, chunk_rows)
+    count = write_columnar(path, chunks) if _is_columnar(path) else write_csv(path, chunks)
+    print(f"📤 Exported {count:,} products to {path} in {time.perf_counter() - started:.1f}s")
+    return count
+
+def import_catalog(path, backend=None, keep_ids=False, load_data=False, chunk_rows=CHUNK_ROWS):
+    """File -> daraz_products (upsert by product_link)"""
+    started = time.perf_counter()
+    backend = backend or db_pool.DB_BACKEND
+    if load_data and backend == "mysql" and path.endswith(".csv"):
+        count = load_data_infile(path, keep_ids)
+    else:
+        if load_data:
+            print("   ℹ️ LOAD DATA needs MySQL and a plain .csv, using executemany")
+        chunks = read_columnar(path, chunk_rows) if _is_columnar(path) else read_csv(path, chunk_rows)
+        count = write_table(chunks, backend, keep_ids)
+    print(f"📥 Imported {count:,} products from {path} in {time.perf_counter() - started:.1f}s")
+    return count
+
+def copy_catalog(source, target, keep_ids=False, chunk_rows=CHUNK_ROWS):
+    """Stream daraz_products from one backend into the other (e.g. mysql -> sqlite)"""
+    started = time.perf_counter()
+    count = write_table(read_table(source, chunk_rows), target, keep_ids)
+    print(f"🔁 Copied {count:,} products {source} -> {target} in {time.perf_counter() - started:.1f}s")
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import/export of daraz_products")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], help="database to use (default: SCRAPER_DB)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="table -> .csv, .csv.gz, .parquet, .arrow")
+    export_parser.add_argument("path")
+
+    import_parser = commands.add_parser("import", help=".csv, .csv.gz, .parquet, .arrow -> table")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--keep-ids", action="store_true", help="keep the file's ids (empty table only)")
+    import_parser.add_argument("--load-data", action="store_true", help="MySQL LOAD DATA LOCAL INFILE for plain .csv")
+
+    copy_parser = commands.add_parser("copy", help="stream the table from one backend to the other")
+    copy_parser.add_argument("--from", dest="source", choices=["mysql", "sqlite"], required=True)
+    copy_parser.add_argument("--to", dest="target", choices=["mysql", "sqlite"], required=True)
+    copy_parser.add_argument("--keep-ids", action="store_true", help="keep ids (empty target table only)")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_catalog(args.path, args.backend, args.chunk_rows)
+    elif args.command == "import":
+        import_catalog(args.path, args.backend, args.keep_ids, args.load_data, args.chunk_rows)
+    else:
+        copy_catalog(args.source, args.target, args.keep_ids, args.chunk_rows)
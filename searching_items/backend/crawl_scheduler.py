@@ -0,0 +1,169 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+import time
+
+# -------------------- SCHEDULER SETTINGS --------------------
+# Max categories scraped at the same time on one website
+DEFAULT_SITE_LIMITS = {
+    "daraz": 2,
+    "jacknutrition": 2,
+    "amazon": 1,
+}
+DEFAULT_SITE_LIMIT = 1
+
+# -------------------- TASK BUILDING --------------------
+def build_tasks(website_configs, sites=None, is_due=None):
+    """
+    Build (website, category) pairs for every configured search url.
+    is_due(website, category), if given, drops categories that do not need a recrawl yet.
+    """
+    if sites is None:
+        sites = list(website_configs.keys())
+
+    tasks = []
+    skipped = 0
+    for website in sites:
+        if website not in website_configs:
+            print(f"⚠️ Unknown website: {website}")
+            continue
+        for category in website_configs[website]["search_urls"]:
+            if is_due is not None and not is_due(website, category):
+                skipped += 1
+                continue
+            tasks.append((website, category))
+    if skipped:
+        print(f"⏭️ {skipped} categories not due for a recrawl yet")
+    return tasks
+
+# -------------------- CRAWL RUNNER --------------------
+def _run_task(driver_pool, scrape_fn, website, category, use_browser):
+    """Run one scrape (on a leased browser if needed) and time it"""
+    started = time.perf_counter()
+    error = None
+    count = 0
+    try:
+        if use_browser:
+            with driver_pool.lease() as driver:
+                count = scrape_fn(driver, website, category) or 0
+        else:
+            count = scrape_fn(None, website, category) or 0
+    except Exception as e:
+        error = str(e)[:100]
+    finished = time.perf_counter()
+    return {
+        "website": website,
+        "category": category,
+        "count": count,
+        "started": started,
+        "finished": finished,
+        "error": error,
+    }
+
+def run_crawl(tasks, scrape_fn, driver_pool, site_limits=None, max_workers=None,
+              needs_browser=None):
+    """
+    Run every (website, category) task concurrently on browsers leased from driver_pool.
+    scrape_fn(driver, website, category) must return the number of products added.
+    At most site_limits[website] tasks run at once for the same website.
+    Websites where needs_browser(website) is False get driver=None and no lease.
+    """
+    limits = dict(DEFAULT_SITE_LIMITS)
+    if site_limits:
+        limits.update(site_limits)
+
+    pending = {}
+    for website, category in tasks:
+        pending.setdefault(website, deque()).append(category)
+
+    if max_workers is None:
+        max_workers = sum(limits.get(site, DEFAULT_SITE_LIMIT) for site in pending) or 1
+
+    running = {site: 0 for site in pending}
+    results = []
+    crawl_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+
+        def submit_ready():
+            # Fill free worker slots while respecting per-site limits
+            for site, categories in pending.items():
+                while (categories and len(futures) < max_workers
+                       and running[site] < limits.get(site, DEFAULT_SITE_LIMIT)):
+                    category = categories.popleft()
+                    use_browser = needs_browser(site) if needs_browser else True
+                    future = executor.submit(_run_task, driver_pool, scrape_fn,
+                                             site, category, use_browser)
+                    futures[future] = site
+                    running[site] += 1
+
+        submit_ready()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                site = futures.pop(future)
+                running[site] -= 1
+                result = future.result()
+                results.append(result)
+                if result["error"]:
+                    print(f"   ❌ {site} / {result['category']}: {result['error']}")
+            submit_ready()
+
+    wall_time = time.perf_counter() - crawl_start
+    return build_report(results, wall_time)
+
+# -------------------- REPORTING --------------------
+def build_report(results, wall_time):
+    """Summarize task results per website"""
+    sites = {}
+    for result in results:
+        site = sites.setdefault(result["website"], {
+            "categories": 0,
+            "products": 0,
+            "errors": 0,
+            "busy_time": 0.0,
+            "first_start": result["started"],
+            "last_finish": result["finished"],
+        })
+        site["categories"] += 1
+        site["products"] += result["count"]
+        site["errors"] += 1 if result["error"] else 0
+        site["busy_time"] += result["finished"] - result["started"]
+        site["first_start"] = min(site["first_start"], result["started"])
+        site["last_finish"] = max(site["last_finish"], result["finished"])
+
+    for site in sites.values():
+        site["wall_time"] = site["last_finish"] - site["first_start"]
+        site["products_per_second"] = (
+            site["products"] / site["wall_time"] if site["wall_time"] > 0 else 0.0
+        )
+        # Sum of task times = what the old serial loop would have taken
+        site["serial_time"] = site["busy_time"]
+        del site["first_start"], site["last_finish"], site["busy_time"]
+
+    total_products = sum(site["products"] for site in sites.values())
+    serial_time = sum(site["serial_time"] for site in sites.values())
+    return {
+        "wall_time": wall_time,
+        "serial_time": serial_time,
+        "total_products": total_products,
+        "products_per_second": total_products / wall_time if wall_time > 0 else 0.0,
+        "sites": sites,
+        "tasks": results,
+    }
+
+def print_crawl_report(report):
+    """Print wall time and throughput per website"""
+    print("\n" + "="*60)
+    print("⏱️ CRAWL REPORT")
+    print("="*60)
+    for website, site in report["sites"].items():
+        print(f"  • {website}: {site['products']} products from {site['categories']} categories "
+              f"in {site['wall_time']:.1f}s ({site['products_per_second']:.2f} products/s, "
+              f"{site['errors']} errors)")
+    print(f"\nTotal: {report['total_products']} products in {report['wall_time']:.1f}s "
+          f"({report['products_per_second']:.2f} products/s)")
+    if report["wall_time"] > 0:
+        print(f"Serial estimate: {report['serial_time']:.1f}s "
+              f"(speedup x{report['serial_time'] / report['wall_time']:.1f})")
+    print("="*60)
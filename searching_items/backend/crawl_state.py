@@ -0,0 +1,191 @@
+from db_pool import get_connection
+from link_dedup import link_hash
+import threading
+import argparse
+import hashlib
+import time
+
+# -------------------- RECRAWL SETTINGS --------------------
+DEFAULT_INTERVAL = 2 * 3600       # First guess for a page we have fetched once
+MIN_INTERVAL = 15 * 60
+MAX_INTERVAL = 24 * 3600
+CHANGED_FACTOR = 0.5              # Page changed: check twice as often
+UNCHANGED_FACTOR = 1.5            # Page unchanged (304 or same products): back off
+
+UPSERT_SQL = """
+INSERT INTO crawl_state (url_hash, url, website, category, etag, last_modified, content_hash,
+                         last_fetched, last_changed, interval_seconds, fetch_count, change_count)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    etag = VALUES(etag),
+    last_modified = VALUES(last_modified),
+    content_hash = VALUES(content_hash),
+    last_fetched = VALUES(last_fetched),
+    last_changed = VALUES(last_changed),
+    interval_seconds = VALUES(interval_seconds),
+    fetch_count = VALUES(fetch_count),
+    change_count = VALUES(change_count)
+"""
+SQLITE_UPSERT_SQL = """
+INSERT INTO crawl_state (url_hash, url, website, category, etag, last_modified, content_hash,
+                         last_fetched, last_changed, interval_seconds, fetch_count, change_count)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT(url_hash) DO UPDATE SET
+    etag = excluded.etag,
+    last_modified = excluded.last_modified,
+    content_hash = excluded.content_hash,
+    last_fetched = excluded.last_fetched,
+    last_changed = excluded.last_changed,
+    interval_seconds = excluded.interval_seconds,
+    fetch_count = excluded.fetch_count,
+    change_count = excluded.change_count
+"""
+COLUMNS = ["url", "website", "category", "etag", "last_modified", "content_hash",
+           "last_fetched", "last_changed", "interval_seconds", "fetch_count", "change_count"]
+
+# -------------------- CONTENT HASHES --------------------
+def content_hash(text):
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+def product_list_hash(products):
+    """Hash of what we would store from a listing page, in page order"""
+    return content_hash("\n".join(f"{p['link']}\t{p['name']}\t{p['price']}\t{p['rating']}"
+                                  for p in products if p))
+
+def listing_text_hash(driver, containers):
+    """Hash of the containers' visible text, read in one script call instead of per-element lookups"""
+    return content_hash(driver.execute_script(
+        "return arguments[0].map(function (e) { return e.innerText; }).join('\\n');", list(containers)))
+
+# -------------------- CRAWL STATE --------------------
+class CrawlState:
+    """
+    Per-URL validators (ETag / Last-Modified), content hash and last fetch time,
+    plus a recrawl interval that shrinks when a page changes and grows when it
+    does not. Everything is kept in memory and written through to crawl_state.
+    """
+
+    def __init__(self):
+        self.pages = {}           # url -> {column: value}
+        self.lock = threading.Lock()
+
+    def load(self):
+        db, cursor = get_connection()
+        try:
+            cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM crawl_state")
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            db.close()
+        with self.lock:
+            for row in rows:
+                self.pages[row[0]] = dict(zip(COLUMNS, row))
+        return len(rows)
+
+    def page(self, url):
+        with self.lock:
+            page = self.pages.get(url)
+            return dict(page) if page else None
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since for the validators the server last sent"""
+        page = self.page(url) or {}
+        headers = {}
+        if page.get("etag"):
+            headers["If-None-Match"] = page["etag"]
+        if page.get("last_modified"):
+            headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+    def unchanged(self, url, page_hash):
+        """True if the page content is the same as at the last recorded fetch"""
+        page = self.page(url)
+        return page is not None and page["content_hash"] == page_hash
+
+    def record(self, url, website, category, page_hash=None, etag=None, last_modified=None, now=None):
+        """
+        Record a fetch. page_hash=None means the server answered 304, so the stored hash
+        (and validators, unless new ones came) stay. Only call this once the page's
+        products are safely written. Returns True if the content changed.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            page = self.pages.get(url)
+            if page is None:
+                page = {"url": url, "website": website, "category": category, "etag": None,
+                        "last_modified": None, "content_hash": None, "last_fetched": None,
+                        "last_changed": None, "interval_seconds": DEFAULT_INTERVAL,
+                        "fetch_count": 0, "change_count": 0}
+                changed = page_hash is not None
+            else:
+                changed = page_hash is not None and page_hash != page["content_hash"]
+                # The first fetch tells us nothing about how often the page changes
+                factor = CHANGED_FACTOR if changed else UNCHANGED_FACTOR
+                page["interval_seconds"] = min(MAX_INTERVAL, max(MIN_INTERVAL, page["interval_seconds"] * factor))
+
+            page["etag"] = etag or page["etag"]
+            page["last_modified"] = last_modified or page["last_modified"]
+            if page_hash is not None:
+                page["content_hash"] = page_hash
+            page["last_fetched"] = now
+            page["fetch_count"] += 1
+            if changed:
+                page["last_changed"] = now
+                page["change_count"] += 1
+            self.pages[url] = page
+            values = (link_hash(url),) + tuple(page[column] for column in COLUMNS)
+
+        db, cursor = get_connection()
+        try:
+            cursor.execute(SQLITE_UPSERT_SQL if getattr(db, "dialect", "mysql") == "sqlite" else UPSERT_SQL, values)
+        finally:
+            cursor.close()
+            db.close()
+        return changed
+
+    def next_due(self, url):
+        """Epoch time the URL should be fetched again (0 if never fetched)"""
+        page = self.page(url)
+        if page is None or page["last_fetched"] is None:
+            return 0
+        return page["last_fetched"] + page["interval_seconds"]
+
+    def is_due(self, url, now=None):
+        return (time.time() if now is None else now) >= self.next_due(url)
+
+    def category_due(self, website, category, now=None):
+        """A category is due when any of its recorded pages is (or none was ever fetched)"""
+        now = time.time() if now is None else now
+        with self.lock:
+            pages = [page for page in self.pages.values()
+                     if page["website"] == website and page["category"] == category]
+        return not pages or any(now >= page["last_fetched"] + page["interval_seconds"] for page in pages)
+
+# Loaded from the table on first use, shared by every scraper thread
+_state = None
+_state_lock = threading.Lock()
+
+def get_state():
+    global _state
+    with _state_lock:
+        if _state is None:
+            state = CrawlState()
+            state.load()
+            _state = state
+        return _state
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recrawl state per listing page")
+    parser.add_argument("--website", help="only this website key, e.g. daraz")
+    args = parser.parse_args()
+
+    state = get_state()
+    now = time.time()
+    pages = sorted(state.pages.values(), key=lambda page: (page["website"] or "", page["category"] or "", page["url"]))
+    print(f"{'website':15} {'category':16} {'interval':>9} {'changes':>9} {'due in':>9}  url")
+    for page in pages:
+        if args.website and page["website"] != args.website:
+            continue
+        due_in = max(0, state.next_due(page["url"]) - now)
+        print(f"{page['website'] or '':15} {page['category'] or '':16} {page['interval_seconds'] / 3600:8.2f}h "
+              f"{page['change_count']:>4}/{page['fetch_count']:<4} {due_in / 3600:8.2f}h  {page['url']}")
@@ -0,0 +1,383 @@
+from mysql.connector import pooling
+import mysql.connector
+from metrics import metrics
+import sqlite3
+import threading
+import queue
+import time
+import os
+
+# -------------------- DATABASE SETTINGS --------------------
+# "mysql" (default) or "sqlite" for the local ecommerce.db file
+DB_BACKEND = os.environ.get("SCRAPER_DB", "mysql")
+
+MYSQL_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "mazhar334",
+    "database": "ecommerce",
+}
+SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ecommerce.db")
+
+POOL_SIZE = 8           # MySQL allows at most 32 connections per pool
+POOL_TIMEOUT = 30       # Seconds to wait for a free connection
+
+# Catch these instead of mysql.connector.Error when code may run on either backend
+DatabaseError = (mysql.connector.Error, sqlite3.Error)
+
+MYSQL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daraz_products (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    product_name VARCHAR(500),
+    price VARCHAR(100),
+    rating VARCHAR(50),
+    category VARCHAR(100),
+    website VARCHAR(50),
+    product_link VARCHAR(1000) UNIQUE,
+    page INT,
+    quantity VARCHAR(100),
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+)
+"""
+# Added to existing tables by setup_schema() when missing
+MYSQL_EXTRA_COLUMNS = {
+    # MD5 of the link, kept in sync by MySQL, so dedup lookups use a short fixed-width key
+    "link_hash": "CHAR(32) GENERATED ALWAYS AS (MD5(product_link)) STORED",
+    # Numeric copies of price/rating/quantity (see normalize.py)
+    "price_minor": "BIGINT NULL",
+    "currency": "CHAR(3) NULL",
+    "rating_value": "FLOAT NULL",
+    "qty_value": "DOUBLE NULL",
+    "qty_unit": "VARCHAR(8) NULL",
+    "unit_price_minor": "BIGINT NULL",
+}
+MYSQL_INDEXES = {
+    "idx_link_hash": "(link_hash)",
+    "idx_website": "(website)",
+    "idx_price_minor": "(currency, price_minor)",
+    "idx_unit_price": "(currency, qty_unit, unit_price_minor)",
+}
+# Tables owned by the other backend modules, created alongside daraz_products
+MYSQL_EXTRA_TABLES = [
+    # Canonical product clusters (see matching.py)
+    """
+    CREATE TABLE IF NOT EXISTS product_matches (
+        product_id INT PRIMARY KEY,
+        cluster_id INT NOT NULL,
+        brand VARCHAR(100),
+        product_line VARCHAR(255),
+        qty_value DOUBLE NULL,
+        qty_unit VARCHAR(8) NULL,
+        matched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_cluster (cluster_id)
+    )
+    """,
+    # Precomputed "similar products" (see recommender.py)
+    """
+    CREATE TABLE IF NOT EXISTS product_neighbors (
+        product_id INT NOT NULL,
+        neighbor_rank SMALLINT NOT NULL,
+        neighbor_id INT NOT NULL,
+        score FLOAT NOT NULL,
+        PRIMARY KEY (product_id, neighbor_rank)
+    )
+    """,
+    # Append-only price/rating changes (see price_history.py); ids grow with time
+    """
+    CREATE TABLE IF NOT EXISTS price_history (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        product_id INT NOT NULL,
+        price VARCHAR(100),
+        rating VARCHAR(50),
+        price_minor BIGINT NULL,
+        currency CHAR(3) NULL,
+        rating_value FLOAT NULL,
+        recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_history_product (product_id, id),
+        INDEX idx_history_recorded (recorded_at)
+    )
+    """,
+    # Per-URL validators and adaptive recrawl intervals (see crawl_state.py); times are epoch seconds
+    """
+    CREATE TABLE IF NOT EXISTS crawl_state (
+        url_hash CHAR(32) PRIMARY KEY,
+        url VARCHAR(2000) NOT NULL,
+        website VARCHAR(50),
+        category VARCHAR(100),
+        etag VARCHAR(255),
+        last_modified VARCHAR(64),
+        content_hash CHAR(32),
+        last_fetched DOUBLE,
+        last_changed DOUBLE,
+        interval_seconds DOUBLE,
+        fetch_count INT DEFAULT 0,
+        change_count INT DEFAULT 0
+    )
+    """,
+]
+
+# Same table as the checked-in ecommerce.db
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daraz_products (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_name TEXT NOT NULL,
+    price TEXT,
+    rating TEXT,
+    category TEXT,
+    website TEXT DEFAULT 'Daraz',
+    product_link TEXT UNIQUE,
+    page INTEGER DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    description TEXT
+)
+"""
+# Columns the scrapers write that the original SQLite file does not have
+SQLITE_EXTRA_COLUMNS = {
+    "quantity": "TEXT",
+    "last_updated": "TIMESTAMP",
+    "price_minor": "INTEGER",
+    "currency": "TEXT",
+    "rating_value": "REAL",
+    "qty_value": "REAL",
+    "qty_unit": "TEXT",
+    "unit_price_minor": "INTEGER",
+}
+# product_link is UNIQUE, which already gives SQLite an index for link lookups.
+# The old idx_price is on the TEXT price, so range queries use idx_price_minor instead
+SQLITE_INDEXES = {
+    "idx_website": "(website)",
+    "idx_price_minor": "(currency, price_minor)",
+    "idx_unit_price": "(currency, qty_unit, unit_price_minor)",
+}
+SQLITE_EXTRA_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS product_matches (
+        product_id INTEGER PRIMARY KEY,
+        cluster_id INTEGER NOT NULL,
+        brand TEXT,
+        product_line TEXT,
+        qty_value REAL,
+        qty_unit TEXT,
+        matched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_matches_cluster ON product_matches (cluster_id)",
+    """
+    CREATE TABLE IF NOT EXISTS product_neighbors (
+        product_id INTEGER NOT NULL,
+        neighbor_rank INTEGER NOT NULL,
+        neighbor_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (product_id, neighbor_rank)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS price_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id INTEGER NOT NULL,
+        price TEXT,
+        rating TEXT,
+        price_minor INTEGER,
+        currency TEXT,
+        rating_value REAL,
+        recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_history_product ON price_history (product_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_history_recorded ON price_history (recorded_at)",
+    """
+    CREATE TABLE IF NOT EXISTS crawl_state (
+        url_hash TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        website TEXT,
+        category TEXT,
+        etag TEXT,
+        last_modified TEXT,
+        content_hash TEXT,
+        last_fetched REAL,
+        last_changed REAL,
+        interval_seconds REAL,
+        fetch_count INTEGER DEFAULT 0,
+        change_count INTEGER DEFAULT 0
+    )
+    """,
+]
+
+# -------------------- MYSQL POOL --------------------
+class MySQLPool:
+    """mysql.connector connection pool. Schema is created once, when the pool is built"""
+
+    dialect = "mysql"
+
+    def __init__(self, size=POOL_SIZE, config=None):
+        self.pool = pooling.MySQLConnectionPool(
+            pool_name="scraper",
+            pool_size=size,
+            autocommit=True,
+            **(config or MYSQL_CONFIG)
+        )
+        self.setup_schema()
+
+    def setup_schema(self):
+        db = self.get_connection()
+        try:
+            cursor = db.cursor()
+            cursor.execute(MYSQL_SCHEMA)
+            
+            cursor.execute("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND table_name = 'daraz_products'
+            """)
+            columns = {row[0].lower() for row in cursor.fetchall()}
+            for column, definition in MYSQL_EXTRA_COLUMNS.items():
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE daraz_products ADD COLUMN {column} {definition}")
+            
+            cursor.execute("""
+                SELECT DISTINCT index_name FROM information_schema.statistics
+                WHERE table_schema = DATABASE() AND table_name = 'daraz_products'
+            """)
+            indexes = {row[0].lower() for row in cursor.fetchall()}
+            for index, columns_sql in MYSQL_INDEXES.items():
+                if index not in indexes:
+                    cursor.execute(f"ALTER TABLE daraz_products ADD INDEX {index} {columns_sql}")
+
+            for statement in MYSQL_EXTRA_TABLES:
+                cursor.execute(statement)
+            cursor.close()
+        finally:
+            db.close()
+
+    def get_connection(self, timeout=POOL_TIMEOUT):
+        """Borrow a connection; db.close() gives it back to the pool"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.pool.get_connection()
+            except mysql.connector.errors.PoolError:
+                # Every connection is leased, wait for a worker to return one
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+# -------------------- SQLITE POOL --------------------
+class SQLiteCursor:
+    """sqlite3 cursor that accepts the %s placeholders the MySQL code uses"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, sql, params=()):
+        return self.cursor.execute(sql.replace("%s", "?"), params)
+
+    def executemany(self, sql, rows):
+        return self.cursor.executemany(sql.replace("%s", "?"), rows)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+class SQLiteConnection:
+    """Pooled sqlite3 connection with the parts of the MySQL connection API the scrapers use"""
+
+    dialect = "sqlite"
+
+    def __init__(self, pool, connection):
+        self.pool = pool
+        self.connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return SQLiteCursor(self.connection.cursor())
+
+    def start_transaction(self):
+        self.connection.execute("BEGIN")
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        """Give the connection back to the pool"""
+        if self.connection.in_transaction:
+            self.connection.rollback()
+        self.pool.release(self.connection)
+
+class SQLitePool:
+    """Fixed-size pool of sqlite3 connections to one database file"""
+
+    dialect = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH, size=POOL_SIZE):
+        # ":memory:" databases are per-connection, share one through a URI instead
+        if path == ":memory:":
+            path = "file:scraper_memdb?mode=memory&cache=shared"
+        self.path = path
+        self.idle = queue.Queue()
+        for _ in range(size):
+            self.idle.put(self._connect())
+        self.setup_schema()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, uri=self.path.startswith("file:"),
+                                     check_same_thread=False, timeout=POOL_TIMEOUT,
+                                     isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def setup_schema(self):
+        db = self.get_connection()
+        try:
+            cursor = db.cursor()
+            cursor.execute(SQLITE_SCHEMA)
+            cursor.execute("PRAGMA table_info(daraz_products)")
+            columns = {row[1] for row in cursor.fetchall()}
+            for column, column_type in SQLITE_EXTRA_COLUMNS.items():
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE daraz_products ADD COLUMN {column} {column_type}")
+            for index, columns_sql in SQLITE_INDEXES.items():
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {index} ON daraz_products {columns_sql}")
+            for statement in SQLITE_EXTRA_TABLES:
+                cursor.execute(statement)
+            cursor.close()
+        finally:
+            db.close()
+
+    def get_connection(self, timeout=POOL_TIMEOUT):
+        """Borrow a connection; db.close() gives it back to the pool"""
+        return SQLiteConnection(self, self.idle.get(timeout=timeout))
+
+    def release(self, connection):
+        self.idle.put(connection)
+
+# -------------------- PROCESS-WIDE POOLS --------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(backend=None):
+    """Build the pool (and run schema setup) on first use, then reuse it for the whole process"""
+    backend = backend or DB_BACKEND
+    with _pools_lock:
+        if backend not in _pools:
+            if backend == "sqlite":
+                _pools[backend] = SQLitePool()
+            else:
+                _pools[backend] = MySQLPool()
+        return _pools[backend]
+
+def configure_pool(backend, pool):
+    """Install a custom pool (e.g. SQLitePool(':memory:') for benchmarks)"""
+    global DB_BACKEND
+    with _pools_lock:
+        _pools[backend] = pool
+    DB_BACKEND = backend
+
+def get_connection(backend=None):
+    """Return (db, cursor) from the process-wide pool"""
+    with metrics.timer("db_connection_wait"):
+        db = get_pool(backend).get_connection()
+    return db, db.cursor()
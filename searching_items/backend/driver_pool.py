@@ -0,0 +1,136 @@
+from selenium.common.exceptions import WebDriverException
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import queue
+import threading
+import os
+
+# -------------------- POOL SETTINGS --------------------
+DEFAULT_POOL_SIZE = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_PAGE_LOADS = 50     # Recycle a browser after this many driver.get() calls
+DEFAULT_LEASE_TIMEOUT = 300     # Seconds to wait for a free browser
+
+# -------------------- POOLED DRIVER --------------------
+class PooledDriver:
+    """Wraps a WebDriver to count page loads and remember browser errors"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.page_loads = 0
+        self.broken = False
+
+    def get(self, url):
+        self.page_loads += 1
+        try:
+            return self.driver.get(url)
+        except WebDriverException:
+            self.broken = True
+            raise
+
+    def __getattr__(self, name):
+        # Everything else goes straight to the real driver
+        return getattr(self.driver, name)
+
+    def is_healthy(self):
+        """Cheap round trip to check the browser session is still alive"""
+        if self.broken:
+            return False
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+# -------------------- DRIVER POOL --------------------
+class DriverPool:
+    """
+    Pre-warmed pool of headless Chrome sessions.
+    Use `with pool.lease() as driver:` to borrow a browser for one scrape task.
+    A leased driver is None when Chrome could not be started (callers fall back to demo mode).
+    """
+
+    def __init__(self, driver_factory, size=DEFAULT_POOL_SIZE,
+                 max_page_loads=DEFAULT_MAX_PAGE_LOADS, lease_timeout=DEFAULT_LEASE_TIMEOUT):
+        self.driver_factory = driver_factory
+        self.size = max(1, size)
+        self.max_page_loads = max_page_loads
+        self.lease_timeout = lease_timeout
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.stats = {"created": 0, "recycled": 0, "failed": 0, "leases": 0}
+
+        # Chrome startup takes seconds, so start all browsers in parallel
+        print(f"🚀 Starting {self.size} browser(s)...")
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for driver in executor.map(lambda _: self._create(), range(self.size)):
+                self.idle.put(driver)
+
+    def _create(self):
+        """Start a new browser, or return None if Chrome fails to start"""
+        driver = self.driver_factory()
+        with self.lock:
+            if driver:
+                self.stats["created"] += 1
+            else:
+                self.stats["failed"] += 1
+        return PooledDriver(driver) if driver else None
+
+    def _recycle(self, pooled):
+        """Replace a used-up or broken browser with a fresh one"""
+        if pooled:
+            pooled.quit()
+        with self.lock:
+            self.stats["recycled"] += 1
+        return self._create()
+
+    @contextmanager
+    def lease(self):
+        """Borrow a browser, returning it to the pool (or recycling it) afterwards"""
+        if self.closed:
+            raise RuntimeError("DriverPool is closed")
+
+        pooled = self.idle.get(timeout=self.lease_timeout)
+        with self.lock:
+            self.stats["leases"] += 1
+
+        if pooled is None:
+            # Chrome failed to start for this slot earlier, try again
+            print("   🔁 Retrying browser startup...")
+            pooled = self._create()
+        elif not pooled.is_healthy():
+            print("   ♻️ Browser session is dead, starting a new one...")
+            pooled = self._recycle(pooled)
+
+        try:
+            yield pooled
+        except WebDriverException:
+            if pooled:
+                pooled.broken = True
+            raise
+        finally:
+            if pooled and (pooled.broken or pooled.page_loads >= self.max_page_loads):
+                pooled = self._recycle(pooled)
+
+            if self.closed:
+                if pooled:
+                    pooled.quit()
+            else:
+                self.idle.put(pooled)
+
+    def close(self):
+        """Quit every idle browser (leased ones are quit when returned)"""
+        self.closed = True
+        while True:
+            try:
+                pooled = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            if pooled:
+                pooled.quit()
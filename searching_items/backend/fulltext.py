@@ -0,0 +1,321 @@
+from array import array
+from collections import OrderedDict
+from db_pool import get_connection
+from product_writer import add_listener
+import numpy as np
+import threading
+import argparse
+import math
+import time
+import re
+
+# -------------------- BM25 SETTINGS --------------------
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_K = 10
+DECODED_CACHE_SIZE = 256      # Posting lists of recently queried terms kept decoded
+
+# Name tokens count fully; category/website mostly serve as extra matches and filters
+FIELD_WEIGHTS = {
+    "product_name": 1.0,
+    "category": 0.5,
+    "website": 0.3,
+}
+
+# -------------------- TOKENIZER --------------------
+WORD_RE = re.compile(r'[a-z0-9]+(?:\.\d+)?')
+PARTS_RE = re.compile(r'\d+(?:\.\d+)?|[a-z]+')
+NUMBER_RE = re.compile(r'\d+(?:\.\d+)?$')
+
+UNIT_ALIASES = {
+    "kgs": "kg", "kilo": "kg", "kilos": "kg", "kilogram": "kg", "kilograms": "kg",
+    "gm": "g", "gms": "g", "gram": "g", "grams": "g",
+    "mgs": "mg", "milligram": "mg", "milligrams": "mg",
+    "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "ounce": "oz", "ounces": "oz",
+    "ltr": "l", "litre": "l", "liter": "l", "litres": "l", "liters": "l",
+    "cap": "capsules", "caps": "capsules", "capsule": "capsules",
+    "tab": "tablets", "tabs": "tablets", "tablet": "tablets",
+    "serving": "servings", "scoop": "scoops",
+}
+UNITS = set(UNIT_ALIASES.values()) | {"kg", "g", "mg", "lb", "oz", "l", "ml", "capsules", "tablets",
+                                      "servings", "scoops"}
+
+# Multi-word brands also get one joined token, so "muscle tech" and "muscletech" match
+BRAND_PHRASES = {
+    ("optimum", "nutrition"): "optimumnutrition",
+    ("muscle", "tech"): "muscletech",
+    ("jack", "nutrition"): "jacknutrition",
+    ("applied", "nutrition"): "appliednutrition",
+    ("universal", "nutrition"): "universalnutrition",
+    ("rule", "1"): "rule1",
+    ("my", "protein"): "myprotein",
+}
+
+def _unit(token):
+    return UNIT_ALIASES.get(token, token)
+
+def tokenize(text):
+    """
+    Supplement-aware tokens: "Dymatize ISO100 5lbs" -> dymatize, iso100, iso, 100, 5lb, 5, lb.
+    "5 lb" and "5lb" give the same tokens, unit spellings are unified and known
+    multi-word brands add a joined token.
+    """
+    if not text:
+        return []
+
+    words = WORD_RE.findall(text.lower())
+    tokens = []
+    for i, word in enumerate(words):
+        parts = PARTS_RE.findall(word)
+        if len(parts) > 1:
+            # "5lbs" -> "5lb", "5", "lb"; "iso100" -> "iso100", "iso", "100"
+            parts = [_unit(part) for part in parts]
+            tokens.append("".join(parts))
+            tokens.extend(parts)
+        else:
+            word = _unit(word)
+            tokens.append(word)
+            # "5 lb" -> also "5lb"
+            if NUMBER_RE.match(word) and i + 1 < len(words) and _unit(words[i + 1]) in UNITS:
+                tokens.append(word + _unit(words[i + 1]))
+
+        if i + 1 < len(words) and (word, words[i + 1]) in BRAND_PHRASES:
+            tokens.append(BRAND_PHRASES[(word, words[i + 1])])
+    return tokens
+
+# -------------------- COMPRESSED POSTINGS --------------------
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+class PostingList:
+    """
+    (doc id, tf) pairs in increasing doc order, stored as varint-encoded
+    (doc gap, tf) bytes: most gaps and tfs fit in one byte.
+    """
+
+    __slots__ = ("data", "count", "last_doc")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.count = 0
+        self.last_doc = 0
+
+    def append(self, doc, tf):
+        _write_varint(self.data, doc - self.last_doc)
+        _write_varint(self.data, tf)
+        self.last_doc = doc
+        self.count += 1
+
+    def decode(self):
+        """All postings as (doc ids, tfs) numpy arrays, decoded without a Python loop"""
+        raw = np.frombuffer(bytes(self.data), dtype=np.uint8)
+        # A byte below 0x80 ends a varint; each value is the sum of its 7-bit groups shifted into place
+        ends = np.flatnonzero(raw < 0x80)
+        starts = np.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        shifts = 7 * (np.arange(len(raw)) - np.repeat(starts, ends - starts + 1))
+        values = np.add.reduceat((raw & 0x7F).astype(np.int64) << shifts, starts)
+        return np.cumsum(values[0::2]).astype(np.int32), values[1::2].astype(np.float32)
+
+    def nbytes(self):
+        return len(self.data)
+
+# -------------------- INVERTED INDEX --------------------
+class FullTextIndex:
+    """BM25 search over product_name, category and website"""
+
+    def __init__(self):
+        self.postings = {}        # term -> PostingList
+        self.doc_ids = {}         # product_link -> doc id
+        self.docs = []            # (product_name, category, website, product_link) per doc id
+        self.doc_lengths = array("d")
+        self.doc_sites = array("i")       # website id per doc, for filters
+        self.doc_categories = array("i")  # category id per doc, for filters
+        self.site_ids = {}        # lowercase website -> id
+        self.category_ids = {}    # lowercase category -> id
+        self.total_length = 0.0
+        self._arrays = None       # numpy copies of the doc arrays, rebuilt after adds
+        self._decoded = OrderedDict()  # term -> (posting count, docs, tfs), least recently used first
+        self.max_product_id = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add_document(self, product_name, category, website, product_link):
+        """Index one product; links already indexed are ignored. Returns the doc id or None"""
+        key = product_link or f"{website}:{product_name}"
+        if not product_name or key in self.doc_ids:
+            return None
+
+        weights = {}
+        for field, text in (("product_name", product_name), ("category", category), ("website", website)):
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0) + FIELD_WEIGHTS[field]
+
+        doc = len(self.docs)
+        self.doc_ids[key] = doc
+        self.docs.append((product_name, category, website, product_link))
+        length = sum(weights.values())
+        self.doc_lengths.append(length)
+        self.doc_sites.append(self.site_ids.setdefault((website or "").lower(), len(self.site_ids)))
+        self.doc_categories.append(self.category_ids.setdefault((category or "").lower(), len(self.category_ids)))
+        self.total_length += length
+
+        # Field weights are fractional; tf is stored in tenths so postings stay integers
+        for token, weight in weights.items():
+            posting_list = self.postings.get(token)
+            if posting_list is None:
+                posting_list = self.postings[token] = PostingList()
+            posting_list.append(doc, max(1, round(weight * 10)))
+        return doc
+
+    def add(self, rows):
+        """Add (product_name, category, website, product_link) tuples"""
+        with self.lock:
+            for row in rows:
+                self.add_document(*row)
+
+    def on_rows(self, rows):
+        """ProductWriter listener"""
+        self.add((row[0], row[3], row[4], row[5]) for row in rows)
+
+    def refresh(self):
+        """Pick up rows other processes inserted since the last build/refresh"""
+        db, cursor = get_connection()
+        try:
+            cursor.execute("SELECT id, product_name, category, website, product_link FROM daraz_products "
+                           "WHERE id > %s ORDER BY id", (self.max_product_id,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            db.close()
+        if rows:
+            self.max_product_id = rows[-1][0]
+            self.add(row[1:] for row in rows)
+        return len(rows)
+
+    # ---------- scoring ----------
+    def _idf(self, df):
+        n = len(self.docs)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _doc_arrays(self):
+        if self._arrays is None or len(self._arrays[0]) != len(self.docs):
+            self._arrays = (np.array(self.doc_lengths), np.array(self.doc_sites), np.array(self.doc_categories))
+        return self._arrays
+
+    def _decode(self, term):
+        posting_list = self.postings[term]
+        cached = self._decoded.get(term)
+        if cached is None or cached[0] != posting_list.count:
+            cached = (posting_list.count,) + posting_list.decode()
+            self._decoded[term] = cached
+            if len(self._decoded) > DECODED_CACHE_SIZE:
+                self._decoded.popitem(last=False)
+        self._decoded.move_to_end(term)
+        return cached[1], cached[2]
+
+    def search(self, query, k=DEFAULT_K, site=None, category=None):
+        """
+        Top-k products for the query as (score, product_name, category, website, product_link).
+        site/category filter on exact (case-insensitive) values.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or k <= 0:
+            return []
+
+        with self.lock:
+            terms = [term for term in terms if term in self.postings]
+            site_id = self.site_ids.get(site.lower(), -1) if site else None
+            category_id = self.category_ids.get(category.lower(), -1) if category else None
+            if not terms or site_id == -1 or category_id == -1:
+                return []
+
+            lengths, sites, categories = self._doc_arrays()
+            n = len(self.docs)
+            average_length = self.total_length / n
+
+            # Term-at-a-time over the query's posting lists only, so the work grows with
+            # the posting list lengths and not with the catalog
+            matched, contributions = [], []
+            for term in terms:
+                docs, tfs = self._decode(term)
+                # tf is stored in tenths, so k1 is scaled the same way
+                length_norm = BM25_K1 * 10 * (1 - BM25_B + BM25_B * lengths[docs] / average_length)
+                matched.append(docs)
+                contributions.append(self._idf(self.postings[term].count) * tfs * (BM25_K1 + 1) / (tfs + length_norm))
+            candidates, positions = np.unique(np.concatenate(matched), return_inverse=True)
+            scores = np.bincount(positions, weights=np.concatenate(contributions))
+
+            keep = np.ones(len(candidates), dtype=bool)
+            if site_id is not None:
+                keep &= sites[candidates] == site_id
+            if category_id is not None:
+                keep &= categories[candidates] == category_id
+            candidates, scores = candidates[keep], scores[keep]
+            if len(candidates) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                candidates, scores = candidates[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+            return [(round(float(scores[i]), 4),) + self.docs[candidates[i]] for i in order]
+
+    def stats(self):
+        return {
+            "documents": len(self.docs),
+            "terms": len(self.postings),
+            "posting_bytes": sum(posting_list.nbytes() for posting_list in self.postings.values()),
+        }
+
+# -------------------- SHARED INDEX --------------------
+# Built from the table on first use, then kept current by every ProductWriter flush
+_index = None
+_index_lock = threading.Lock()
+
+def build_from_db():
+    index = FullTextIndex()
+    db, cursor = get_connection()
+    try:
+        cursor.execute("SELECT id, product_name, category, website, product_link FROM daraz_products ORDER BY id")
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+    if rows:
+        index.max_product_id = rows[-1][0]
+        index.add(row[1:] for row in rows)
+    return index
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            started = time.perf_counter()
+            _index = build_from_db()
+            add_listener(_index.on_rows)
+            stats = _index.stats()
+            print(f"📚 Full-text index: {stats['documents']} products, {stats['terms']} terms, "
+                  f"{stats['posting_bytes'] / 1024:.0f} KB postings in {time.perf_counter() - started:.2f}s")
+        return _index
+
+def search(query, k=DEFAULT_K, site=None, category=None):
+    return get_index().search(query, k, site, category)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ranked product search (BM25)")
+    parser.add_argument("query")
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--site", help="only this website, e.g. Daraz")
+    parser.add_argument("--category", help="only this category, e.g. protein")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = search(args.query, args.k, args.site, args.category)
+    print(f"🔍 {len(results)} results for {args.query!r} in {(time.perf_counter() - started) * 1000:.2f} ms")
+    for score, name, category, website, link in results:
+        print(f"  {score:6.2f}  {name[:60]} | {website} | {category}")
@@ -0,0 +1,230 @@
+from db_pool import get_connection
+from product_writer import add_listener
+from fulltext import tokenize, WORD_RE
+import fulltext
+import threading
+import argparse
+import time
+
+# -------------------- FUZZY SETTINGS --------------------
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7             # Only the first characters get delete variants (SymSpell's prefix trick)
+MAX_SUGGESTIONS = 5
+
+def allowed_distance(word, max_distance=MAX_EDIT_DISTANCE):
+    """Short words get fewer edits, otherwise "c4" or "zma" would match almost anything"""
+    if len(word) <= 2 or word.replace(".", "").isdigit():
+        return 0
+    if len(word) <= 4:
+        return min(1, max_distance)
+    return max_distance
+
+# -------------------- EDIT DISTANCE --------------------
+def edit_distance(a, b, max_distance):
+    """
+    Damerau-Levenshtein (optimal string alignment) distance between a and b,
+    or max_distance + 1 as soon as it is known to be larger.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+def deletes(word, max_distance):
+    """Every string made by removing up to max_distance characters from the word's prefix"""
+    key = word[:PREFIX_LENGTH]
+    results = {key}
+    frontier = {key}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            for i in range(len(item)):
+                variant = item[:i] + item[i + 1:]
+                if variant not in results:
+                    next_frontier.add(variant)
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+# -------------------- SYMSPELL INDEX --------------------
+class FuzzyIndex:
+    """
+    SymSpell index over the product vocabulary: words are found through shared
+    delete variants, then verified with a bounded edit distance.
+    """
+
+    def __init__(self, max_distance=MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self.word_counts = {}     # word -> times seen in written product names
+        self.variants = {}        # delete variant -> words
+        self.links = set()        # product links already counted, so re-upserts don't count twice
+        self.max_product_id = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.word_counts)
+
+    def add_text(self, text):
+        with self.lock:
+            for word in set(tokenize(text)):
+                count = self.word_counts.get(word)
+                if count is not None:
+                    self.word_counts[word] = count + 1
+                    continue
+                self.word_counts[word] = 1
+                for variant in deletes(word, allowed_distance(word, self.max_distance)):
+                    self.variants.setdefault(variant, []).append(word)
+
+    def add_product(self, product_name, website, product_link):
+        """Count a product's words once; links already indexed are ignored"""
+        key = product_link or f"{website}:{product_name}"
+        with self.lock:
+            if not product_name or key in self.links:
+                return
+            self.links.add(key)
+        self.add_text(product_name)
+
+    def on_rows(self, rows):
+        """ProductWriter listener: adds the words of new product names"""
+        for row in rows:
+            self.add_product(row[0], row[4], row[5])
+
+    def refresh(self):
+        """Pick up rows other processes inserted since the last build/refresh"""
+        db, cursor = get_connection()
+        try:
+            cursor.execute("SELECT id, product_name, website, product_link FROM daraz_products "
+                           "WHERE id > %s ORDER BY id", (self.max_product_id,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            db.close()
+        for product_id, name, website, link in rows:
+            self.add_product(name, website, link)
+            self.max_product_id = product_id
+        return len(rows)
+
+    def lookup(self, word, max_distance=None, limit=MAX_SUGGESTIONS):
+        """Vocabulary words within the allowed distance as (word, distance, count), closest/commonest first"""
+        word = word.lower()
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = allowed_distance(word, max_distance)
+
+        with self.lock:
+            if word in self.word_counts:
+                return [(word, 0, self.word_counts[word])]
+            if max_distance == 0:
+                return []
+
+            found = {}
+            for variant in deletes(word, max_distance):
+                for candidate in self.variants.get(variant, ()):
+                    if candidate in found:
+                        continue
+                    # The prefix trick only bounds the first characters, so check the whole word
+                    distance = edit_distance(word, candidate, min(max_distance, allowed_distance(candidate)))
+                    if distance <= max_distance:
+                        found[candidate] = distance
+            ranked = sorted(found.items(), key=lambda item: (item[1], -self.word_counts[item[0]], item[0]))
+            return [(candidate, distance, self.word_counts[candidate]) for candidate, distance in ranked[:limit]]
+
+    def correct(self, query):
+        """
+        Rewrite a query word by word: known words stay, "iso 100" becomes "iso100" when
+        that is a product word, and unknown words take their best correction.
+        Returns (corrected query, {original word: correction}).
+        """
+        words = WORD_RE.findall(query.lower())
+        corrected = []
+        changes = {}
+        i = 0
+        while i < len(words):
+            word = words[i]
+            if i + 1 < len(words):
+                joined = word + words[i + 1]
+                if joined in self.word_counts:
+                    corrected.append(joined)
+                    changes[f"{word} {words[i + 1]}"] = joined
+                    i += 2
+                    continue
+            candidates = self.lookup(word)
+            if candidates and candidates[0][0] != word:
+                changes[word] = candidates[0][0]
+                corrected.append(candidates[0][0])
+            else:
+                corrected.append(word)
+            i += 1
+        return " ".join(corrected), changes
+
+    def stats(self):
+        return {"words": len(self.word_counts), "variants": len(self.variants)}
+
+# -------------------- SHARED INDEX --------------------
+# Built from the table on first use, then kept current by every ProductWriter flush
+_index = None
+_index_lock = threading.Lock()
+
+def build_from_db():
+    index = FuzzyIndex()
+    db, cursor = get_connection()
+    try:
+        cursor.execute("SELECT id, product_name, website, product_link FROM daraz_products ORDER BY id")
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+    for product_id, name, website, link in rows:
+        index.add_product(name, website, link)
+        index.max_product_id = product_id
+    return index
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            started = time.perf_counter()
+            _index = build_from_db()
+            add_listener(_index.on_rows)
+            stats = _index.stats()
+            print(f"🔤 Fuzzy index: {stats['words']} words, {stats['variants']} delete variants "
+                  f"in {time.perf_counter() - started:.2f}s")
+        return _index
+
+def correct(query):
+    return get_index().correct(query)
+
+def search(query, k=fulltext.DEFAULT_K, site=None, category=None):
+    """Typo-tolerant search: correct the query, then rank with the BM25 index. Returns (corrected, results)"""
+    corrected, _ = correct(query)
+    return corrected, fulltext.search(corrected, k, site, category)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Typo-tolerant product search")
+    parser.add_argument("query")
+    parser.add_argument("-k", type=int, default=fulltext.DEFAULT_K)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    corrected, changes = correct(args.query)
+    took = (time.perf_counter() - started) * 1000
+    print(f"✏️ {args.query!r} -> {corrected!r} in {took:.2f} ms {changes if changes else ''}")
+    for score, name, category, website, link in fulltext.search(corrected, args.k):
+        print(f"  {score:6.2f}  {name[:60]} | {website} | {category}")
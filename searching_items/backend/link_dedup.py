@@ -0,0 +1,62 @@
+from metrics import timed
+import hashlib
+
+# -------------------- DEDUP SETTINGS --------------------
+LOOKUP_BATCH_SIZE = 500         # Links per "IN (...)" query
+
+def link_hash(link):
+    """Same value MySQL stores in the link_hash column (MD5 hex of product_link)"""
+    return hashlib.md5(link.encode("utf-8")).hexdigest()
+
+# -------------------- LINK DEDUP --------------------
+class LinkDeduper:
+    """
+    Answers "which of these links are already stored?" for one page of products
+    with batched indexed lookups, instead of loading every link for the website.
+    It is the one record of links seen during a scrape: looked-up links that are
+    stored and links queued since both count as known.
+    """
+
+    def __init__(self, db, cursor):
+        self.cursor = cursor
+        self.dialect = getattr(db, "dialect", "mysql")
+        self.known = set()        # Links stored in daraz_products or queued for writing
+
+    @timed("dedup_lookup")
+    def existing_links(self, links):
+        """Return the subset of links already in daraz_products (or queued by this deduper)"""
+        links = {link for link in links if link}
+        candidates = [link for link in links if link not in self.known]
+
+        found = set()
+        for start in range(0, len(candidates), LOOKUP_BATCH_SIZE):
+            batch = candidates[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(batch))
+            if self.dialect == "sqlite":
+                # product_link is UNIQUE, so SQLite already has an index on it
+                self.cursor.execute(
+                    f"SELECT product_link FROM daraz_products WHERE product_link IN ({placeholders})",
+                    batch)
+            else:
+                self.cursor.execute(
+                    f"SELECT product_link FROM daraz_products WHERE link_hash IN ({placeholders})",
+                    [link_hash(link) for link in batch])
+            found.update(row[0] for row in self.cursor.fetchall())
+
+        # Hash collisions can return other links, keep only the ones we asked about
+        self.known |= found & set(candidates)
+        return links & self.known
+
+    def is_new(self, link):
+        """
+        True the first time a link that is not stored comes up; it counts as known
+        afterwards. Call existing_links() for the page first so this needs no query.
+        """
+        if link in self.known:
+            return False
+        self.add([link])
+        return True
+
+    def add(self, links):
+        """Record links that were just queued for writing"""
+        self.known.update(links)
@@ -0,0 +1,291 @@
+from db_pool import get_connection
+from normalize import canonical_quantity
+from fulltext import WORD_RE, UNITS, UNIT_ALIASES
+import numpy as np
+import argparse
+import time
+import zlib
+import re
+
+# -------------------- MATCHING SETTINGS --------------------
+QUANTITY_TOLERANCE = 0.15     # 2kg and 5lb (2.27kg) are sold as the same tub
+MIN_JACCARD = 0.5             # Product-line token overlap needed for a match
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16                # 16 bands x 4 rows: pairs around Jaccard 0.5 and up share a band
+MINHASH_SEED = 13
+MERSENNE_PRIME = (1 << 31) - 1
+SAVE_BATCH_SIZE = 1000
+
+# Canonical brand -> spellings seen in listings
+BRAND_ALIASES = {
+    "optimum nutrition": ["optimum nutrition", "optimumnutrition"],
+    "muscletech": ["muscletech", "muscle tech"],
+    "dymatize": ["dymatize"],
+    "bsn": ["bsn"],
+    "myprotein": ["myprotein", "my protein"],
+    "jack nutrition": ["jack nutrition", "jacknutrition"],
+    "cellucor": ["cellucor"],
+    "rule 1": ["rule 1", "rule1", "rule one"],
+    "gnc": ["gnc"],
+    "universal nutrition": ["universal nutrition", "universal"],
+    "scitec nutrition": ["scitec nutrition", "scitec"],
+    "applied nutrition": ["applied nutrition"],
+    "nutrex": ["nutrex"],
+    "mutant": ["mutant"],
+    "evlution nutrition": ["evlution nutrition", "evl"],
+}
+
+# Words that do not tell two products apart: filler, marketing and flavours
+GENERIC_WORDS = {
+    "protein", "powder", "supplement", "supplements", "nutrition", "the", "with", "for", "and", "of",
+    "in", "by", "imported", "original", "authentic", "genuine", "new", "free", "shaker", "buy", "get",
+    "flavor", "flavour", "flavored", "unflavored", "unflavoured", "chocolate", "vanilla", "strawberry",
+    "cookies", "cream", "ice", "banana", "coffee", "mocha", "double", "rich", "milk", "mango", "x",
+}
+QUANTITY_WORD_RE = re.compile(r'^\d+(?:\.\d+)?([a-z]*)$')
+
+def _alias_index():
+    """First word -> [(alias words, canonical brand)], longest alias first"""
+    index = {}
+    for brand, aliases in BRAND_ALIASES.items():
+        for alias in aliases:
+            words = tuple(alias.split())
+            index.setdefault(words[0], []).append((words, brand))
+    for entries in index.values():
+        entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+    return index
+
+ALIAS_INDEX = _alias_index()
+
+# -------------------- FEATURES --------------------
+def split_brand(words):
+    """Returns (canonical brand or None, words without the brand)"""
+    for i, word in enumerate(words):
+        for alias, brand in ALIAS_INDEX.get(word, ()):
+            if tuple(words[i:i + len(alias)]) == alias:
+                return brand, words[:i] + words[i + len(alias):]
+    return None, words
+
+def product_line(words):
+    """Tokens that identify the product: no quantities, units, flavours or filler"""
+    tokens = set()
+    for word in words:
+        quantity = QUANTITY_WORD_RE.match(word)
+        if quantity and (not quantity.group(1) or UNIT_ALIASES.get(quantity.group(1), quantity.group(1)) in UNITS):
+            continue
+        if word in GENERIC_WORDS or UNIT_ALIASES.get(word, word) in UNITS:
+            continue
+        tokens.add(word)
+    return frozenset(tokens)
+
+def listing_features(product_name, quantity_text=None, qty_value=None, qty_unit=None):
+    """(brand, product-line tokens, quantity value, quantity unit) for one listing"""
+    brand, rest = split_brand(WORD_RE.findall((product_name or "").lower()))
+    if qty_unit is None:
+        qty_value, qty_unit = canonical_quantity(quantity_text, product_name)
+    return brand, product_line(rest), qty_value, qty_unit
+
+def quantities_match(value_a, unit_a, value_b, unit_b):
+    if unit_a != unit_b:
+        return False
+    if value_a is None or value_b is None:
+        return value_a is None and value_b is None
+    return abs(value_a - value_b) <= QUANTITY_TOLERANCE * max(value_a, value_b)
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+# -------------------- MINHASH --------------------
+_rng = np.random.default_rng(MINHASH_SEED)
+_HASH_A = _rng.integers(1, MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+_HASH_B = _rng.integers(0, MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+
+def minhash(tokens):
+    """NUM_PERMUTATIONS-value MinHash signature of a token set"""
+    if not tokens:
+        return np.zeros(NUM_PERMUTATIONS, dtype=np.uint64)
+    hashes = np.array([zlib.crc32(token.encode("utf-8")) for token in tokens], dtype=np.uint64)
+    # (a * h + b) mod p; a < 2^31 and h < 2^32, so nothing overflows uint64
+    return ((np.outer(_HASH_A, hashes) + _HASH_B[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+# -------------------- ENTITY RESOLUTION --------------------
+class ProductMatcher:
+    """
+    Clusters listings into canonical products. Listings are only compared when they
+    share brand, quantity unit and at least one MinHash-LSH band of their product-line
+    tokens, then verified on Jaccard and a quantity within QUANTITY_TOLERANCE.
+    Matches are merged with union-find; a cluster's id is its smallest product id.
+    Clusters only merge while all their quantities stay within QUANTITY_TOLERANCE of
+    each other, so 2kg ~ 5lb ~ 2.6kg ~ 3kg does not chain into one product. Listings
+    without a known brand are never matched.
+    """
+
+    def __init__(self):
+        self.features = {}        # product id -> listing_features()
+        self.representatives = {} # listing_features() -> first product id with exactly those features
+        self.parent = {}
+        self.quantity_range = {}  # cluster id -> (smallest, largest) quantity, None for no quantity
+        self.buckets = {}         # (brand, unit, band, band hash) -> product ids
+        self.comparisons = 0
+
+    def _find(self, product_id):
+        root = product_id
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[product_id] != root:
+            self.parent[product_id], product_id = root, self.parent[product_id]
+        return root
+
+    def _union(self, a, b, unit):
+        """Merge a's and b's clusters unless their combined quantities drift apart. Returns True if merged"""
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return True
+        range_a, range_b = self.quantity_range[root_a], self.quantity_range[root_b]
+        if (range_a is None) != (range_b is None):
+            return False
+        merged = None
+        if range_a is not None:
+            merged = (min(range_a[0], range_b[0]), max(range_a[1], range_b[1]))
+            if not quantities_match(merged[0], unit, merged[1], unit):
+                return False
+        root, child = min(root_a, root_b), max(root_a, root_b)
+        self.parent[child] = root
+        self.quantity_range[root] = merged
+        del self.quantity_range[child]
+        return True
+
+    def add(self, product_id, product_name, quantity_text=None, qty_value=None, qty_unit=None):
+        """Match one listing against everything added so far. Returns its cluster id"""
+        features = listing_features(product_name, quantity_text, qty_value, qty_unit)
+        brand, tokens, value, unit = features
+        self.features[product_id] = features
+        self.parent[product_id] = product_id
+        self.quantity_range[product_id] = None if value is None else (value, value)
+
+        # Without a brand, "Mass Gainer 5kg" from two stores may be two different products
+        if brand is None:
+            return product_id
+
+        # Same brand, line and quantity as an earlier listing: same matches, so skip the LSH work
+        representative = self.representatives.get(features)
+        if representative is not None:
+            self._union(product_id, representative, unit)
+            return self._find(product_id)
+        self.representatives[features] = product_id
+
+        signature = minhash(tokens)
+        rows = NUM_PERMUTATIONS // LSH_BANDS
+        keys = [(brand, unit, band, signature[band * rows:(band + 1) * rows].tobytes())
+                for band in range(LSH_BANDS)]
+
+        candidates = set()
+        for key in keys:
+            candidates.update(self.buckets.get(key, ()))
+        # Oldest listings first, so clusters grow the same way on every run
+        for other in sorted(candidates):
+            _, other_tokens, other_value, _ = self.features[other]
+            self.comparisons += 1
+            if quantities_match(value, unit, other_value, unit) and jaccard(tokens, other_tokens) >= MIN_JACCARD:
+                self._union(product_id, other, unit)
+
+        for key in keys:
+            self.buckets.setdefault(key, []).append(product_id)
+        return self._find(product_id)
+
+    def clusters(self):
+        """cluster id -> product ids"""
+        groups = {}
+        for product_id in self.parent:
+            groups.setdefault(self._find(product_id), []).append(product_id)
+        return groups
+
+    def rows(self):
+        """product_matches rows: (product_id, cluster_id, brand, product_line, qty_value, qty_unit)"""
+        for product_id, (brand, tokens, value, unit) in self.features.items():
+            yield (product_id, self._find(product_id), brand, " ".join(sorted(tokens))[:255], value, unit)
+
+# -------------------- DATABASE --------------------
+def match_all():
+    """Re-cluster every stored listing and replace product_matches. Returns the matcher"""
+    started = time.perf_counter()
+    db, cursor = get_connection()
+    try:
+        cursor.execute("SELECT id, product_name, quantity, qty_value, qty_unit FROM daraz_products ORDER BY id")
+        products = cursor.fetchall()
+
+        matcher = ProductMatcher()
+        for product_id, name, quantity, qty_value, qty_unit in products:
+            matcher.add(product_id, name, quantity, qty_value, qty_unit)
+
+        rows = list(matcher.rows())
+        db.start_transaction()
+        cursor.execute("DELETE FROM product_matches")
+        for start in range(0, len(rows), SAVE_BATCH_SIZE):
+            cursor.executemany(
+                "INSERT INTO product_matches (product_id, cluster_id, brand, product_line, qty_value, qty_unit) "
+                "VALUES (%s, %s, %s, %s, %s, %s)", rows[start:start + SAVE_BATCH_SIZE])
+        db.commit()
+    finally:
+        cursor.close()
+        db.close()
+
+    clusters = matcher.clusters()
+    merged = sum(1 for members in clusters.values() if len(members) > 1)
+    print(f"🔗 Matched {len(products)} listings into {len(clusters)} products "
+          f"({merged} with several listings, {matcher.comparisons} comparisons) "
+          f"in {time.perf_counter() - started:.2f}s")
+    return matcher
+
+def compare_prices(product_id):
+    """Every listing of the same canonical product, cheapest first (per currency)"""
+    db, cursor = get_connection()
+    try:
+        cursor.execute("""
+            SELECT p.id, p.website, p.product_name, p.price, p.price_minor, p.currency, p.product_link
+            FROM product_matches m
+            JOIN product_matches c ON c.cluster_id = m.cluster_id
+            JOIN daraz_products p ON p.id = c.product_id
+            WHERE m.product_id = %s
+            ORDER BY p.currency, p.price_minor IS NULL, p.price_minor
+        """, (product_id,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+def cross_site_clusters(limit=20):
+    """Canonical products listed on more than one website: (cluster_id, websites, listings)"""
+    db, cursor = get_connection()
+    try:
+        cursor.execute("""
+            SELECT m.cluster_id, COUNT(DISTINCT p.website) AS websites, COUNT(*) AS listings
+            FROM product_matches m
+            JOIN daraz_products p ON p.id = m.product_id
+            GROUP BY m.cluster_id
+            HAVING COUNT(DISTINCT p.website) > 1
+            ORDER BY websites DESC, listings DESC
+            LIMIT %s
+        """, (limit,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-site product matching")
+    parser.add_argument("--match", action="store_true", help="re-cluster all listings into product_matches")
+    parser.add_argument("--compare", type=int, metavar="PRODUCT_ID", help="prices of the same product on every site")
+    parser.add_argument("--clusters", action="store_true", help="list products sold on several sites")
+    args = parser.parse_args()
+
+    if args.match:
+        match_all()
+    if args.clusters:
+        for cluster_id, websites, listings in cross_site_clusters():
+            print(f"  cluster {cluster_id}: {listings} listings on {websites} sites")
+    if args.compare:
+        for _, website, name, price, _, _, link in compare_prices(args.compare):
+            print(f"  {website:15} {price:15} {name[:50]}")
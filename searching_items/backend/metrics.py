@@ -0,0 +1,229 @@
+from contextlib import contextmanager
+from functools import wraps
+import inspect
+import bisect
+import threading
+import json
+import time
+import os
+
+# -------------------- METRICS SETTINGS --------------------
+ENABLED = True
+METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "metrics")
+PREFIX = "scraper"
+# Histogram upper bounds in seconds, from a cached lookup to a slow page load
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUANTILES = (0.5, 0.9, 0.99)
+
+# -------------------- HISTOGRAM --------------------
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus layout, quantiles estimated from buckets)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)    # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+        return self.max
+
+    def to_dict(self):
+        summary = {"count": self.count, "sum": round(self.sum, 6), "max": round(self.max, 6),
+                   "mean": round(self.sum / self.count, 6) if self.count else 0.0}
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}"] = round(self.quantile(q), 6)
+        return summary
+
+# -------------------- REGISTRY --------------------
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+class Metrics:
+    """
+    Stage latency histograms and event counters for the scrape pipeline, shared by
+    every worker thread. Labels set with `with metrics.labels(website=..., category=...)`
+    apply to everything the thread records inside the block, so the DB layer and the
+    rate limiter are attributed to the scrape that called them.
+    """
+
+    def __init__(self):
+        self.histograms = {}      # (stage, label key) -> Histogram
+        self.counters = {}        # (name, label key) -> value
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started = time.time()
+
+    def current_labels(self):
+        return getattr(self.local, "labels", {})
+
+    @contextmanager
+    def labels(self, **labels):
+        previous = self.current_labels()
+        self.local.labels = {**previous, **labels}
+        try:
+            yield
+        finally:
+            self.local.labels = previous
+
+    def observe(self, stage, seconds, **labels):
+        if not ENABLED:
+            return
+        key = (stage, _label_key({**self.current_labels(), **labels}))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, value=1, **labels):
+        if not ENABLED or not value:
+            return
+        key = (name, _label_key({**self.current_labels(), **labels}))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+    # -------------------- EXPORT --------------------
+    def to_json(self):
+        with self.lock:
+            return {
+                "started": self.started,
+                "exported": time.time(),
+                "stages": [{"stage": stage, "labels": dict(key), **histogram.to_dict()}
+                           for (stage, key), histogram in sorted(self.histograms.items())],
+                "counters": [{"name": name, "labels": dict(key), "value": value}
+                             for (name, key), value in sorted(self.counters.items())],
+            }
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (e.g. for the node_exporter textfile collector)"""
+        lines = [f"# HELP {PREFIX}_stage_seconds Time spent per scrape pipeline stage",
+                 f"# TYPE {PREFIX}_stage_seconds histogram"]
+        with self.lock:
+            for (stage, key), histogram in sorted(self.histograms.items()):
+                labels = (("stage", stage),) + key
+                cumulative = 0
+                for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f"{PREFIX}_stage_seconds_bucket{_format_labels(labels, [('le', str(bound))])} {cumulative}")
+                lines.append(f"{PREFIX}_stage_seconds_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{PREFIX}_stage_seconds_count{_format_labels(labels)} {histogram.count}")
+
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+                for (counter, key), value in sorted(self.counters.items()):
+                    if counter == name:
+                        lines.append(f"{PREFIX}_{name}_total{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory=METRICS_DIR):
+        """Write metrics.json and metrics.prom (replaced after every run). Returns the directory"""
+        os.makedirs(directory, exist_ok=True)
+        for filename, content in (("metrics.json", json.dumps(self.to_json(), indent=1)),
+                                  ("metrics.prom", self.to_prometheus())):
+            path = os.path.join(directory, filename)
+            with open(path + ".tmp", "w") as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+        return directory
+
+    def print_summary(self):
+        """Time per stage across all sites, biggest total first"""
+        with self.lock:
+            stages = {}
+            for (stage, _), histogram in self.histograms.items():
+                merged = stages.setdefault(stage, Histogram())
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.count += histogram.count
+                merged.sum += histogram.sum
+                merged.max = max(merged.max, histogram.max)
+            products = {}
+            for (name, key), value in self.counters.items():
+                if name == "products":
+                    event = dict(key).get("event")
+                    products[event] = products.get(event, 0) + value
+        if not stages:
+            return
+        print("\n⏱️ Time per stage:")
+        for stage, histogram in sorted(stages.items(), key=lambda item: -item[1].sum):
+            print(f"   {stage:22} {histogram.sum:8.2f}s total {histogram.count:>7} calls  "
+                  f"p50 {histogram.quantile(0.5) * 1000:8.1f} ms  p99 {histogram.quantile(0.99) * 1000:8.1f} ms")
+        if products:
+            print("   Products: " + ", ".join(f"{value} {event}" for event, value in sorted(products.items())))
+
+# Shared by every scraper thread
+metrics = Metrics()
+
+def labelled(**fixed):
+    """
+    Decorator for scrape functions: everything recorded during the call gets the
+    call's website_name and category arguments (or fixed ones) as labels
+    """
+    def decorate(function):
+        signature = inspect.signature(function)
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            labels = {"website": arguments.get("website_name"), "category": arguments.get("category"), **fixed}
+            with metrics.labels(**labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def timed(stage):
+    """Decorator: record every call's duration under `stage`"""
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.observe(stage, time.perf_counter() - started)
+        return wrapper
+    return decorate
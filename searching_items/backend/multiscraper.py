@@ -3,12 +3,21 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-import mysql.connector
-import time
 import re
-import requests
-import socket
-from urllib.parse import quote
+import argparse
+from crawl_scheduler import build_tasks, run_crawl, print_crawl_report
+from browser_profile import setup_lean_driver, blocked_urls, page_stats
+import browser_profile
+from probe import probe_sites, print_probe_results, BackgroundProber
+from metrics import metrics, labelled, timed, METRICS_DIR
+from driver_pool import DriverPool, DEFAULT_POOL_SIZE, DEFAULT_MAX_PAGE_LOADS
+from pagination import paginate, page_budget, browser_page_loader, http_page_loader
+from crawl_state import get_state
+from product_writer import ProductWriter
+from db_pool import get_connection, DatabaseError
+from link_dedup import LinkDeduper
+from quantity import extract_quantity
+from bulk_extract import field
 
 # -------------------- DRIVER SETUP --------------------
 def setup_driver():
@@ -22,8 +31,7 @@ def setup_driver():
     options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     
     try:
-        driver = webdriver.Chrome(options=options)
-        driver.set_page_load_timeout(30)
+        driver = setup_lean_driver(options, blocked_urls(WEBSITE_CONFIGS))
         return driver
     except Exception as e:
         print(f"❌ Failed to create Chrome driver: {e}")
@@ -31,38 +39,10 @@ def setup_driver():
 
 # -------------------- DATABASE SETUP --------------------
 def setup_database():
-    """Setup MySQL database connection"""
+    """Get a pooled database connection (the table is created once per process)"""
     try:
-        db = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="mazhar334",
-            database="ecommerce",
-            autocommit=True
-        )
-        
-        cursor = db.cursor()
-        
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS daraz_products (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            product_name VARCHAR(500),
-            price VARCHAR(100),
-            rating VARCHAR(50),
-            category VARCHAR(100),
-            website VARCHAR(50),
-            product_link VARCHAR(1000) UNIQUE,
-            page INT,
-            quantity VARCHAR(100),
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        )
-        """
-        cursor.execute(create_table_sql)
-        db.commit()
-        
-        return db, cursor
-        
-    except mysql.connector.Error as err:
+        return get_connection()
+    except DatabaseError as err:
         print(f"❌ Database connection error: {err}")
         return None, None
 
@@ -85,7 +65,13 @@ WEBSITE_CONFIGS = {
             "product_name_attr": "alt",
             "price": ".ooOxS, .jcHByF",
             "rating": ".mdmmT span",
+            "next_page": "li.ant-pagination-next:not(.ant-pagination-disabled)",
         },
+        "requires_js": True,  # Listing grid is rendered by JavaScript
+        "page_timeout": 15,  # Max seconds to wait for product containers
+        "request_interval": 2,  # Min seconds between requests to this host
+        "page_budget": 20,  # Max listing pages per category and crawl
+        "blocked_urls": ["*mmstat.com*", "*aplus*.js*", "*/alilog/*"],  # Site analytics (see browser_profile)
         "accessible": False
     },
     "jacknutrition": {
@@ -104,7 +90,13 @@ WEBSITE_CONFIGS = {
             "product_name_attr": "alt",
             "price": ".price, .money",
             "rating": ".rating",
+            "next_page": "link[rel='next'], a[rel='next'], .pagination__next",
         },
+        "requires_js": False,  # Shopify collection pages are server-rendered
+        "page_timeout": 10,  # Max seconds to wait for product containers
+        "request_interval": 1,  # Min seconds between requests to this host
+        "page_budget": 20,  # Max listing pages per category and crawl
+        "blocked_urls": ["*monorail-edge.shopifysvc.com*", "*/.well-known/shopify/monorail*", "*facebook.com/tr*"],  # Site analytics (see browser_profile)
         "accessible": False
     },
     "amazon": {
@@ -122,7 +114,13 @@ WEBSITE_CONFIGS = {
             "product_name": "h2 a span",
             "price": ".a-price-whole",
             "rating": ".a-icon-alt",
+            "next_page": "a.s-pagination-next:not(.s-pagination-disabled)",
         },
+        "requires_js": True,  # Search results need a real browser
+        "page_timeout": 15,  # Max seconds to wait for product containers
+        "request_interval": 3,  # Min seconds between requests to this host
+        "page_budget": 5,  # Max listing pages per category and crawl
+        "blocked_urls": ["*amazon-adsystem.com*", "*fls-na.amazon.com*", "*unagi.amazon.com*"],  # Ads/metrics (see browser_profile)
         "accessible": False
     }
 }
@@ -145,33 +143,8 @@ DEMO_PRODUCTS = {
     ]
 }
 
-# -------------------- QUANTITY EXTRACTION --------------------
-def extract_quantity(product_name, website="daraz"):
-    """Extract quantity from product name"""
-    if not product_name:
-        return "Not specified"
-    
-    text = product_name.lower()
-    
-    patterns = [
-        (r'(\d+(?:\.\d+)?)\s*(kg|kilogram)\b', 'kg'),
-        (r'(\d+(?:\.\d+)?)\s*(g|gram)\b', 'g'),
-        (r'(\d+)\s*(mg|milligram)\b', 'mg'),
-        (r'(\d+(?:\.\d+)?)\s*(lb|pound)\b', 'lb'),
-        (r'(\d+)\s*(capsules?|caps?)\b', 'capsules'),
-        (r'(\d+)\s*(tablets?|tabs?)\b', 'tablets'),
-        (r'(\d+)\s*(servings?)\b', 'servings'),
-    ]
-    
-    for pattern, unit in patterns:
-        match = re.search(pattern, text)
-        if match:
-            amount = match.group(1)
-            return f"{amount} {unit}"
-    
-    return "Not specified"
-
 # -------------------- DEMO MODE --------------------
+@labelled()
 def scrape_demo_data(website_name, category):
     """Scrape demo data"""
     print(f"📱 Using DEMO MODE for {WEBSITE_CONFIGS[website_name]['name']}")
@@ -180,22 +153,12 @@ def scrape_demo_data(website_name, category):
     if not db:
         return 0
     
-    cursor.execute("SELECT product_link FROM daraz_products WHERE website = %s", 
-                   (WEBSITE_CONFIGS[website_name]['name'],))
-    existing_links = {row[0] for row in cursor.fetchall()}
-    
-    new_count = 0
+    writer = ProductWriter(db, cursor)
+    deduper = LinkDeduper(db, cursor)
     demo_products = DEMO_PRODUCTS.get(website_name, [])
+    deduper.existing_links(product['link'] for product in demo_products)
     
     for product in demo_products:
-        if product['link'] in existing_links:
-            continue
-        
-        insert_sql = """
-        INSERT INTO daraz_products 
-        (product_name, price, rating, category, website, product_link, page, quantity)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
         values = (
             product['name'],
             product['price'],
@@ -207,21 +170,127 @@ def scrape_demo_data(website_name, category):
             product['quantity']
         )
         
-        try:
-            cursor.execute(insert_sql, values)
-            db.commit()
-            new_count += 1
+        is_new = deduper.is_new(product['link'])
+        writer.add(values, is_new)
+        if is_new:
             print(f"   ✅ Demo: {product['name'][:40]}... | {product['price']}")
-        except:
-            db.rollback()
     
+    writer.close()
     cursor.close()
     db.close()
-    return new_count
+    return writer.new_count
+
+# -------------------- LISTING PAGES --------------------
+def write_listing_page(writer, deduper, state, listing, website_name, category):
+    """Queue one listing page's products and write them in one transaction"""
+    config = WEBSITE_CONFIGS[website_name]
+    products = listing.products
+    
+    # One indexed lookup for the links on this page
+    deduper.existing_links(product['link'] for product in products)
+    
+    for i, product in enumerate(products):
+        try:
+            name = product['name']
+            link = product['link']
+            price = product['price']
+            rating = product['rating']
+            
+            # Extract quantity
+            quantity = extract_quantity(name, website_name)
+            
+            # Queue for the batch upsert (existing links get refreshed)
+            values = (name, price, rating, category, config['name'], link, listing.number, quantity)
+            is_new = deduper.is_new(link)
+            writer.add(values, is_new)
+            if is_new:
+                print(f"   ✅ {i+1}/{len(products)}: {name[:40]}... | {price}")
+            
+        except Exception as e:
+            continue
+    
+    # One transaction for the whole page; the page only counts as crawled once it is written
+    if writer.end_page() and listing.validators:
+        state.record(listing.url, website_name, category, *listing.validators)
+
+def scrape_listing_pages(load_page, first_url, writer, deduper, state, website_name, category, budget=None):
+    """Stream a category's pages into the writer until the results end. Returns pages seen"""
+    pages = 0
+    for listing in paginate(load_page, first_url, page_budget(WEBSITE_CONFIGS[website_name], budget)):
+        pages += 1
+        print(f"   📄 Page {listing.number}: {listing.url}")
+        if listing.status == "unchanged":
+            print(f"   ⏭️ Page unchanged since the last crawl")
+            continue
+        print(f"   Found {len(listing.products)} products")
+        write_listing_page(writer, deduper, state, listing, website_name, category)
+    return pages
 
 # -------------------- AMAZON SCRAPER --------------------
-def scrape_amazon(driver, category):
-    """Scrape Amazon products"""
+@timed("extract_product")
+def extract_amazon_product(product, config):
+    """Read one Amazon search result from the browser (None if it has no link/title)"""
+    try:
+        # Get product link
+        link_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['product_link'])
+        link = link_elem.get_attribute("href")
+        
+        # Get product name
+        name_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['product_name'])
+        name = name_elem.text
+    except Exception:
+        return None
+    
+    # Get price
+    price = "Price not available"
+    try:
+        price_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['price'])
+        price = "$" + price_elem.text
+    except:
+        pass
+    
+    # Get rating
+    rating = "No Rating"
+    try:
+        rating_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['rating'])
+        rating_text = rating_elem.get_attribute("textContent")
+        rating_match = re.search(r'(\d+(?:\.\d+)?)', rating_text)
+        if rating_match:
+            rating = rating_match.group(1)
+    except:
+        pass
+    
+    return {'name': name, 'price': price, 'rating': rating, 'link': link}
+
+def amazon_fields(config):
+    """bulk_extract spec with the same selectors as extract_amazon_product"""
+    selectors = config['selectors']
+    return {
+        'link': field((selectors['product_link'], "href")),
+        'name': field((selectors['product_name'], None)),
+        'price': field((selectors['price'], None)),
+        'rating': field((selectors['rating'], "textContent")),
+    }
+
+def amazon_product_from_record(record):
+    """Same result as extract_amazon_product, from a bulk-extracted record"""
+    if record.get('link') is None or record.get('name') is None:
+        return None
+    
+    price = "Price not available"
+    if record.get('price') is not None:
+        price = "$" + record['price']
+    
+    rating = "No Rating"
+    rating_match = re.search(r'(\d+(?:\.\d+)?)', record.get('rating') or "")
+    if rating_match:
+        rating = rating_match.group(1)
+    
+    return {'name': record['name'], 'price': price, 'rating': rating, 'link': record['link']}
+
+@labelled(website="amazon")
+def scrape_amazon(driver, category, budget=None):
+    """Scrape Amazon search results page by page"""
     print(f"🛒 Scraping Amazon - {category}")
     
     config = WEBSITE_CONFIGS["amazon"]
@@ -230,75 +299,24 @@ def scrape_amazon(driver, category):
     if not db:
         return scrape_demo_data("amazon", category)
     
-    cursor.execute("SELECT product_link FROM daraz_products WHERE website = %s", 
-                   (config['name'],))
-    existing_links = {row[0] for row in cursor.fetchall()}
-    
-    new_count = 0
+    writer = ProductWriter(db, cursor)
+    deduper = LinkDeduper(db, cursor)
     
     try:
         # Build search URL
         search_query = category.replace(" ", "+")
         url = f"{config['base_url']}/s?k={search_query}"
         
-        print(f"   📄 URL: {url}")
-        driver.get(url)
-        time.sleep(4)
-        
-        # Find products
-        products = driver.find_elements(By.CSS_SELECTOR, config['selectors']['product_container'])
-        print(f"   Found {len(products)} products")
-        
-        for i, product in enumerate(products[:10]):  # Limit to 10
-            try:
-                # Get product link
-                link_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['product_link'])
-                link = link_elem.get_attribute("href")
-                
-                if link in existing_links:
-                    continue
-                
-                # Get product name
-                name_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['product_name'])
-                name = name_elem.text
-                
-                # Get price
-                price = "Price not available"
-                try:
-                    price_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['price'])
-                    price = "$" + price_elem.text
-                except:
-                    pass
-                
-                # Get rating
-                rating = "No Rating"
-                try:
-                    rating_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['rating'])
-                    rating_text = rating_elem.get_attribute("textContent")
-                    rating_match = re.search(r'(\d+(?:\.\d+)?)', rating_text)
-                    if rating_match:
-                        rating = rating_match.group(1)
-                except:
-                    pass
-                
-                # Extract quantity
-                quantity = extract_quantity(name, "amazon")
-                
-                # Save to database
-                insert_sql = """
-                INSERT INTO daraz_products 
-                (product_name, price, rating, category, website, product_link, page, quantity)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                values = (name, price, rating, category, config['name'], link, 1, quantity)
-                
-                cursor.execute(insert_sql, values)
-                db.commit()
-                new_count += 1
-                print(f"   ✅ {i+1}/10: {name[:40]}... | {price}")
-                
-            except Exception as e:
-                continue
+        state = get_state()
+        if config['requires_js']:
+            load_page = browser_page_loader(driver, config, "amazon", category, state,
+                                            lambda product: extract_amazon_product(product, config),
+                                            amazon_fields(config), amazon_product_from_record)
+        else:
+            # Plain HTTP (e.g. the offline benchmark's fixture pages), no browser
+            load_page = http_page_loader(config, "amazon", category, state)
+        if not scrape_listing_pages(load_page, url, writer, deduper, state, "amazon", category, budget):
+            print(f"   ⚠️ Could not find any products")
         
     except Exception as e:
         print(f"   ❌ Amazon error: {e}")
@@ -307,11 +325,65 @@ def scrape_amazon(driver, category):
         cursor.close()
         db.close()
     
-    return new_count
+    return writer.new_count
 
 # -------------------- DARAZ/JACKNUTRITION SCRAPER --------------------
-def scrape_website(driver, website_name, category):
-    """Scrape Daraz or JackNutrition"""
+@timed("extract_product")
+def extract_website_product(product, config, website_name):
+    """Read one Daraz/JackNutrition product card from the browser (None if it has no link/image)"""
+    try:
+        # Get link
+        link_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['product_link'])
+        link = link_elem.get_attribute("href")
+        
+        # Get name from image alt
+        img = product.find_element(By.CSS_SELECTOR, config['selectors']['product_image'])
+        name = img.get_attribute(config['selectors']['product_name_attr'])
+    except Exception:
+        return None
+    
+    # Get price
+    price = "Price not available"
+    try:
+        price_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['price'])
+        price = price_elem.text
+    except:
+        pass
+    
+    # Get rating
+    rating = "No Rating"
+    if website_name == "daraz":
+        try:
+            rating_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['rating'])
+            rating = rating_elem.text
+        except:
+            pass
+    
+    return {'name': name, 'price': price, 'rating': rating, 'link': link}
+
+def website_fields(config, website_name):
+    """bulk_extract spec with the same selectors as extract_website_product"""
+    selectors = config['selectors']
+    fields = {
+        'link': field((selectors['product_link'], "href")),
+        'name': field((selectors['product_image'], selectors['product_name_attr'])),
+        'price': field((selectors['price'], None)),
+    }
+    if website_name == "daraz":
+        fields['rating'] = field((selectors['rating'], None))
+    return fields
+
+def website_product_from_record(record):
+    """Same result as extract_website_product, from a bulk-extracted record"""
+    if record.get('link') is None or record.get('name') is None:
+        return None
+    price = record['price'] if record.get('price') is not None else "Price not available"
+    rating = record['rating'] if record.get('rating') is not None else "No Rating"
+    return {'name': record['name'], 'price': price, 'rating': rating, 'link': record['link']}
+
+@labelled()
+def scrape_website(driver, website_name, category, budget=None):
+    """Scrape Daraz or JackNutrition page by page"""
     if website_name not in ["daraz", "jacknutrition"]:
         return 0
     
@@ -326,70 +398,22 @@ def scrape_website(driver, website_name, category):
     if not db:
         return scrape_demo_data(website_name, category)
     
-    cursor.execute("SELECT product_link FROM daraz_products WHERE website = %s", 
-                   (config['name'],))
-    existing_links = {row[0] for row in cursor.fetchall()}
-    
-    new_count = 0
+    writer = ProductWriter(db, cursor)
+    deduper = LinkDeduper(db, cursor)
     
     try:
         url = config['base_url'] + config['search_urls'][category]
-        print(f"   📄 URL: {url}")
-        
-        driver.get(url)
-        time.sleep(3)
-        
-        products = driver.find_elements(By.CSS_SELECTOR, config['selectors']['product_container'])
-        print(f"   Found {len(products)} products")
         
-        for i, product in enumerate(products[:10]):
-            try:
-                # Get link
-                link_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['product_link'])
-                link = link_elem.get_attribute("href")
-                
-                if link in existing_links:
-                    continue
-                
-                # Get name from image alt
-                img = product.find_element(By.CSS_SELECTOR, config['selectors']['product_image'])
-                name = img.get_attribute(config['selectors']['product_name_attr'])
-                
-                # Get price
-                price = "Price not available"
-                try:
-                    price_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['price'])
-                    price = price_elem.text
-                except:
-                    pass
-                
-                # Get rating
-                rating = "No Rating"
-                if website_name == "daraz":
-                    try:
-                        rating_elem = product.find_element(By.CSS_SELECTOR, config['selectors']['rating'])
-                        rating = rating_elem.text
-                    except:
-                        pass
-                
-                # Extract quantity
-                quantity = extract_quantity(name, website_name)
-                
-                # Save to database
-                insert_sql = """
-                INSERT INTO daraz_products 
-                (product_name, price, rating, category, website, product_link, page, quantity)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                values = (name, price, rating, category, config['name'], link, 1, quantity)
-                
-                cursor.execute(insert_sql, values)
-                db.commit()
-                new_count += 1
-                print(f"   ✅ {i+1}/10: {name[:40]}... | {price}")
-                
-            except Exception as e:
-                continue
+        state = get_state()
+        if config['requires_js']:
+            load_page = browser_page_loader(driver, config, website_name, category, state,
+                                            lambda container: extract_website_product(container, config, website_name),
+                                            website_fields(config, website_name), website_product_from_record)
+        else:
+            # Server-rendered pages: conditional HTTP fetch, no browser
+            load_page = http_page_loader(config, website_name, category, state)
+        if not scrape_listing_pages(load_page, url, writer, deduper, state, website_name, category, budget):
+            print(f"   ⚠️ Could not find any products")
         
     except Exception as e:
         print(f"   ❌ {config['name']} error: {e}")
@@ -398,25 +422,30 @@ def scrape_website(driver, website_name, category):
         cursor.close()
         db.close()
     
-    return new_count
+    return writer.new_count
+
+def needs_browser(website_name):
+    """Only JavaScript-rendered sites take a browser from the pool"""
+    return WEBSITE_CONFIGS[website_name]['requires_js']
+
+def scrape_category(driver, website_name, category):
+    """Scrape one category of any supported website"""
+    if website_name == "amazon":
+        return scrape_amazon(driver, category)
+    return scrape_website(driver, website_name, category)
+
+def scrape_with_pool(driver_pool, website_name, category):
+    """Scrape one category, leasing a browser only if the site needs one"""
+    if not needs_browser(website_name):
+        return scrape_category(None, website_name, category)
+    with driver_pool.lease() as driver:
+        return scrape_category(driver, website_name, category)
 
 # -------------------- WEBSITE CHECK --------------------
-def check_websites_accessibility():
-    """Check website accessibility"""
+def check_websites_accessibility(force=False):
+    """Check website accessibility (all at once, cached results reused for a while)"""
     print("\n🔍 Checking website accessibility...")
-    
-    for website in WEBSITE_CONFIGS:
-        config = WEBSITE_CONFIGS[website]
-        
-        print(f"   {config['name']}: {config['base_url']}", end=" ")
-        
-        try:
-            response = requests.get(config['base_url'], timeout=5)
-            config['accessible'] = response.status_code == 200
-            print("✅ ACCESSIBLE" if config['accessible'] else "❌ NOT ACCESSIBLE")
-        except:
-            config['accessible'] = False
-            print("❌ NOT ACCESSIBLE")
+    print_probe_results(WEBSITE_CONFIGS, probe_sites(WEBSITE_CONFIGS, force=force))
     
     print("\n" + "="*60)
 
@@ -470,8 +499,30 @@ def display_statistics():
         cursor.close()
         db.close()
 
+# -------------------- NON-INTERACTIVE CRAWL --------------------
+def crawl_all(driver_pool, sites=None, max_workers=None, force=False, reprobe=False):
+    """
+    Scrape every category of every website concurrently (no menu, for cron).
+    Categories whose recrawl interval has not passed are skipped unless force is set.
+    """
+    print("="*60)
+    print("🛒 MULTI-WEBSITE CRAWL")
+    print("="*60)
+    
+    check_websites_accessibility(force=reprobe)
+    
+    state = get_state()
+    is_due = None if force else (lambda website, category: state.category_due(website, category))
+    tasks = build_tasks(WEBSITE_CONFIGS, sites, is_due)
+    print(f"🔄 Scraping {len(tasks)} categories...")
+    with BackgroundProber(WEBSITE_CONFIGS):
+        report = run_crawl(tasks, scrape_category, driver_pool, max_workers=max_workers,
+                           needs_browser=needs_browser)
+    print_crawl_report(report)
+    return report
+
 # -------------------- MAIN FUNCTION --------------------
-def main():
+def main(driver_pool):
     """Main function"""
     print("="*60)
     print("🛒 MULTI-WEBSITE PRODUCT SCRAPER")
@@ -479,9 +530,6 @@ def main():
     print("Supports: Daraz | JackNutrition | Amazon")
     print("="*60)
     
-    # Setup driver
-    driver = setup_driver()
-    
     # Check websites
     check_websites_accessibility()
     
@@ -513,7 +561,7 @@ def main():
             try:
                 cat_index = int(cat_choice) - 1
                 if 0 <= cat_index < len(categories):
-                    count = scrape_website(driver, "daraz", categories[cat_index])
+                    count = scrape_with_pool(driver_pool, "daraz", categories[cat_index])
                     print(f"\n✅ Added {count} products from Daraz")
                 else:
                     print("❌ Invalid category")
@@ -530,7 +578,7 @@ def main():
             try:
                 cat_index = int(cat_choice) - 1
                 if 0 <= cat_index < len(categories):
-                    count = scrape_website(driver, "jacknutrition", categories[cat_index])
+                    count = scrape_with_pool(driver_pool, "jacknutrition", categories[cat_index])
                     print(f"\n✅ Added {count} products from JackNutrition")
                 else:
                     print("❌ Invalid category")
@@ -547,7 +595,7 @@ def main():
             try:
                 cat_index = int(cat_choice) - 1
                 if 0 <= cat_index < len(categories):
-                    count = scrape_amazon(driver, categories[cat_index])
+                    count = scrape_with_pool(driver_pool, "amazon", categories[cat_index])
                     print(f"\n✅ Added {count} products from Amazon")
                 else:
                     print("❌ Invalid category")
@@ -556,21 +604,11 @@ def main():
         
         elif choice == "4":
             print("\n🔄 Scraping all websites...")
-            total = 0
-            
-            # Daraz
-            count = scrape_website(driver, "daraz", "protein powder")
-            total += count
-            
-            # JackNutrition
-            count = scrape_website(driver, "jacknutrition", "protein")
-            total += count
-            
-            # Amazon
-            count = scrape_amazon(driver, "protein powder")
-            total += count
-            
-            print(f"\n✅ Total added from all websites: {total}")
+            with BackgroundProber(WEBSITE_CONFIGS):
+                report = run_crawl(build_tasks(WEBSITE_CONFIGS), scrape_category, driver_pool,
+                                   needs_browser=needs_browser)
+            print_crawl_report(report)
+            print(f"\n✅ Total added from all websites: {report['total_products']}")
         
         elif choice == "5":
             display_statistics()
@@ -585,12 +623,44 @@ def main():
         input("\nPress Enter to continue...")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-website product scraper")
+    parser.add_argument("--crawl-all", action="store_true",
+                        help="scrape every category concurrently without the menu")
+    parser.add_argument("--sites", nargs="+", choices=list(WEBSITE_CONFIGS.keys()),
+                        help="websites to crawl with --crawl-all (default: all)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="max concurrent scrapes (default: sum of per-site limits)")
+    parser.add_argument("--force", action="store_true",
+                        help="with --crawl-all: also scrape categories whose recrawl interval has not passed")
+    parser.add_argument("--reprobe", action="store_true",
+                        help="with --crawl-all: probe every site now instead of using cached results")
+    parser.add_argument("--metrics-dir", default=None,
+                        help="where to write metrics.json and metrics.prom after the run (default: ../metrics)")
+    parser.add_argument("--browsers", type=int, default=None,
+                        help=f"headless Chrome sessions to keep warm (default: {DEFAULT_POOL_SIZE})")
+    parser.add_argument("--max-page-loads", type=int, default=DEFAULT_MAX_PAGE_LOADS,
+                        help="restart a browser after this many page loads")
+    parser.add_argument("--full-pages", action="store_true",
+                        help="load images, fonts and trackers instead of the lean browser profile")
+    args = parser.parse_args()
+    browser_profile.LEAN_PROFILE = not args.full_pages
+    
+    driver_pool = None
     try:
-        main()
+        pool_size = args.browsers or args.workers or DEFAULT_POOL_SIZE
+        driver_pool = DriverPool(setup_driver, size=pool_size, max_page_loads=args.max_page_loads)
+        
+        if args.crawl_all:
+            crawl_all(driver_pool, args.sites, args.workers, args.force, args.reprobe)
+        else:
+            main(driver_pool)
     except KeyboardInterrupt:
         print("\n\n⚠️ Program interrupted by user")
     except Exception as e:
         print(f"\n❌ Error: {e}")
     finally:
-        if 'driver' in locals():
-            driver.quit()
\ No newline at end of file
+        if driver_pool:
+            driver_pool.close()
+        page_stats.print_summary()
+        metrics.print_summary()
+        print(f"📊 Metrics written to {metrics.export(args.metrics_dir or METRICS_DIR)}")
\ No newline at end of file
@@ -0,0 +1,222 @@
+from decimal import Decimal, InvalidOperation
+from quantity import parse_quantity
+from db_pool import get_connection
+import argparse
+import re
+
+# -------------------- NORMALIZATION SETTINGS --------------------
+# Used when the price text has no currency symbol
+WEBSITE_CURRENCIES = {
+    "Daraz": "PKR",
+    "JackNutrition": "PKR",
+    "Amazon": "USD",
+}
+CURRENCY_MARKERS = [
+    (re.compile(r'\brs\b|pkr|₨', re.IGNORECASE), "PKR"),
+    (re.compile(r'\$|usd', re.IGNORECASE), "USD"),
+]
+PRICE_NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+RATING_RE = re.compile(r'\d+(?:\.\d+)?')
+
+# Everything is stored in grams, millilitres or a plain count
+GRAMS_PER_UNIT = {
+    "kg": Decimal("1000"),
+    "g": Decimal("1"),
+    "mg": Decimal("0.001"),
+    "lb": Decimal("453.59237"),
+    "oz": Decimal("28.349523125"),
+}
+ML_PER_UNIT = {
+    "L": Decimal("1000"),
+    "ml": Decimal("1"),
+}
+COUNT_UNITS = {"capsules", "tablets", "pills", "pieces", "servings", "scoops",
+               "pack", "bottle", "jar", "tub"}
+
+# unit_price_minor is the price per kg, per litre or per item
+UNIT_PRICE_BASE = {"g": 1000, "ml": 1000, "count": 1}
+UNIT_PRICE_LABELS = {"g": "kg", "ml": "L", "count": "item"}
+
+# Column order ProductWriter appends to every row
+NORMALIZED_COLUMNS = ["price_minor", "currency", "rating_value", "qty_value", "qty_unit", "unit_price_minor"]
+
+# -------------------- PARSERS --------------------
+def parse_price(price_text, website=None):
+    """
+    "Rs. 12,999" -> (1299900, "PKR"), "$64.99" -> (6499, "USD").
+    Sale listings like "Rs. 4,999 Rs. 3,999" use the lowest amount.
+    Returns (None, None) when there is no number.
+    """
+    if not price_text:
+        return None, None
+
+    amounts = []
+    for number in PRICE_NUMBER_RE.findall(price_text):
+        try:
+            amounts.append(Decimal(number.replace(",", "")))
+        except InvalidOperation:
+            continue
+    if not amounts:
+        return None, None
+
+    currency = WEBSITE_CURRENCIES.get(website)
+    for marker, code in CURRENCY_MARKERS:
+        if marker.search(price_text):
+            currency = code
+            break
+
+    return int(min(amounts) * 100), currency
+
+def parse_rating(rating_text):
+    """ "4.5" -> 4.5, "No Rating" -> None"""
+    if not rating_text:
+        return None
+    match = RATING_RE.search(str(rating_text))
+    if not match:
+        return None
+    rating = float(match.group())
+    return rating if 0 <= rating <= 5 else None
+
+def canonical_quantity(quantity_text, product_name=None):
+    """
+    "5 lb" -> (2267.96185, "g"), "500 ml" -> (500, "ml"), "60 capsules" -> (60, "count").
+    Falls back to the product name when the quantity text cannot be parsed.
+    """
+    quantity = parse_quantity(quantity_text) if quantity_text else None
+    if quantity is None and product_name:
+        quantity = parse_quantity(product_name)
+    if quantity is None:
+        return None, None
+
+    amount = Decimal(str(quantity.amount)) * quantity.count
+    if quantity.unit in GRAMS_PER_UNIT:
+        return float(amount * GRAMS_PER_UNIT[quantity.unit]), "g"
+    if quantity.unit in ML_PER_UNIT:
+        return float(amount * ML_PER_UNIT[quantity.unit]), "ml"
+    if quantity.unit in COUNT_UNITS:
+        return float(amount), "count"
+    return None, None
+
+def unit_price(price_minor, qty_value, qty_unit):
+    """Price per kg / litre / item in minor units"""
+    if price_minor is None or not qty_value or qty_unit not in UNIT_PRICE_BASE:
+        return None
+    return int(round(price_minor * UNIT_PRICE_BASE[qty_unit] / qty_value))
+
+def normalize_row(values):
+    """
+    Numeric columns for one ProductWriter row
+    (product_name, price, rating, category, website, product_link, page, quantity).
+    Returned in NORMALIZED_COLUMNS order.
+    """
+    name, price, rating, _, website, _, _, quantity = values[:8]
+    price_minor, currency = parse_price(price, website)
+    qty_value, qty_unit = canonical_quantity(quantity, name)
+    return (
+        price_minor,
+        currency,
+        parse_rating(rating),
+        qty_value,
+        qty_unit,
+        unit_price(price_minor, qty_value, qty_unit),
+    )
+
+# -------------------- BACKFILL --------------------
+def backfill_normalized(batch_size=1000, only_missing=True):
+    """Fill the numeric columns for rows stored before normalization existed"""
+    read_db, read_cursor = get_connection()
+    write_db, write_cursor = get_connection()
+
+    sql = "SELECT id, product_name, price, rating, category, website, product_link, page, quantity FROM daraz_products"
+    if only_missing:
+        sql += " WHERE price_minor IS NULL AND rating_value IS NULL AND qty_unit IS NULL"
+
+    update_sql = f"""
+        UPDATE daraz_products
+        SET {", ".join(f"{column} = %s" for column in NORMALIZED_COLUMNS)}, last_updated = last_updated
+        WHERE id = %s
+    """
+
+    scanned = 0
+    updates = []
+    try:
+        read_cursor.execute(sql)
+        for row in read_cursor:
+            scanned += 1
+            updates.append(normalize_row(row[1:]) + (row[0],))
+            if len(updates) >= batch_size:
+                _write_batch(write_db, write_cursor, update_sql, updates)
+                updates = []
+        if updates:
+            _write_batch(write_db, write_cursor, update_sql, updates)
+    finally:
+        read_cursor.close()
+        read_db.close()
+        write_cursor.close()
+        write_db.close()
+
+    print(f"✅ Normalized {scanned} products")
+    return scanned
+
+def _write_batch(db, cursor, sql, rows):
+    db.start_transaction()
+    cursor.executemany(sql, rows)
+    db.commit()
+
+# -------------------- NUMERIC QUERIES --------------------
+def find_products(keyword=None, max_price=None, currency="PKR", qty_unit="g",
+                  sort="unit_price", limit=20):
+    """
+    e.g. find_products("protein", max_price=10000) -> protein under Rs. 10,000, cheapest per kg first.
+    max_price is in major units (rupees/dollars). The unit price sort reads idx_unit_price
+    in order (rows without a unit price are left out); sort="price" uses idx_price_minor.
+    """
+    conditions = ["currency = %s", "price_minor IS NOT NULL"]
+    params = [currency]
+    if max_price is not None:
+        conditions.append("price_minor <= %s")
+        params.append(int(Decimal(str(max_price)) * 100))
+    if qty_unit:
+        conditions.append("qty_unit = %s")
+        params.append(qty_unit)
+    if keyword:
+        conditions.append("(product_name LIKE %s OR category LIKE %s)")
+        params.extend([f"%{keyword}%", f"%{keyword}%"])
+
+    if sort == "unit_price":
+        conditions.append("unit_price_minor IS NOT NULL")
+        order = "unit_price_minor"
+    else:
+        order = "price_minor"
+    sql = f"""
+        SELECT id, product_name, price, price_minor, currency, qty_value, qty_unit, unit_price_minor, rating_value
+        FROM daraz_products
+        WHERE {" AND ".join(conditions)}
+        ORDER BY {order}
+        LIMIT %s
+    """
+    params.append(limit)
+
+    db, cursor = get_connection()
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalized price/rating/quantity columns")
+    parser.add_argument("--backfill", action="store_true", help="fill numeric columns for existing rows")
+    parser.add_argument("--all", action="store_true", help="with --backfill, recompute every row")
+    parser.add_argument("--search", metavar="KEYWORD", help="keyword for a price-per-kg search")
+    parser.add_argument("--max-price", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.backfill:
+        backfill_normalized(only_missing=not args.all)
+    if args.search:
+        for row in find_products(args.search, max_price=args.max_price):
+            _, name, price, price_minor, currency, qty_value, qty_unit, per_unit, rating = row
+            per = f"{per_unit / 100:,.0f} {currency}/{UNIT_PRICE_LABELS[qty_unit]}" if per_unit else "-"
+            print(f"  • {name[:50]} | {price} | {per}")
@@ -0,0 +1,81 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from urllib.parse import urlparse
+from metrics import metrics
+import threading
+import time
+
+# -------------------- WAIT SETTINGS --------------------
+DEFAULT_PAGE_TIMEOUT = 15       # Max seconds to wait for product containers
+DEFAULT_SETTLE_TIME = 0.75      # Container count must stay the same this long
+DEFAULT_POLL_INTERVAL = 0.25
+DEFAULT_REQUEST_INTERVAL = 2.0  # Min seconds between two requests to the same host
+
+# -------------------- PAGE READINESS --------------------
+class ContainersSettled:
+    """
+    WebDriverWait condition: product containers are on the page and
+    their count has stopped growing (lazy-loaded grids keep adding items).
+    """
+
+    def __init__(self, selector, settle_time=DEFAULT_SETTLE_TIME):
+        self.selector = selector
+        self.settle_time = settle_time
+        self.last_count = -1
+        self.changed_at = time.monotonic()
+
+    def __call__(self, driver):
+        containers = driver.find_elements(By.CSS_SELECTOR, self.selector)
+        now = time.monotonic()
+
+        if len(containers) != self.last_count:
+            self.last_count = len(containers)
+            self.changed_at = now
+            return False
+
+        if containers and now - self.changed_at >= self.settle_time:
+            return containers
+        return False
+
+def wait_for_products(driver, selector, timeout=DEFAULT_PAGE_TIMEOUT,
+                      settle_time=DEFAULT_SETTLE_TIME):
+    """
+    Wait until the site's product containers are loaded.
+    Returns the containers, or whatever is on the page when the timeout hits (may be empty).
+    """
+    condition = ContainersSettled(selector, settle_time)
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=DEFAULT_POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        return driver.find_elements(By.CSS_SELECTOR, selector)
+
+# -------------------- POLITENESS RATE LIMIT --------------------
+class HostRateLimiter:
+    """Keeps at least min_interval seconds between requests to the same host (thread-safe)"""
+
+    def __init__(self, default_interval=DEFAULT_REQUEST_INTERVAL):
+        self.default_interval = default_interval
+        self.next_allowed = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url, min_interval=None):
+        """Block until a request to url's host is allowed"""
+        if min_interval is None:
+            min_interval = self.default_interval
+
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_allowed.get(host, now))
+            # Reserve the slot so concurrent workers queue up behind it
+            self.next_allowed[host] = slot + min_interval
+
+        delay = slot - now
+        metrics.observe("rate_limit_wait", max(0.0, delay))
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+# Shared by every scrape function and worker thread
+rate_limiter = HostRateLimiter()
@@ -0,0 +1,115 @@
+from selenium.webdriver.common.by import By
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from collections import namedtuple
+from page_wait import wait_for_products, rate_limiter
+from static_fetch import fetch_changed_products
+from crawl_state import listing_text_hash
+from bulk_extract import extract_page
+from browser_profile import page_metrics, page_stats
+from metrics import metrics
+import itertools
+
+# -------------------- PAGINATION SETTINGS --------------------
+DEFAULT_PAGE_BUDGET = 20        # Max listing pages per category and crawl (config "page_budget" overrides)
+PAGE_PARAM = "page"
+
+# status is "changed" (products to write) or "unchanged" (products is None, nothing to do).
+# validators go to crawl_state.record() once the page is written
+ListingPage = namedtuple("ListingPage", ["number", "url", "status", "products", "validators"])
+
+def page_url(first_url, number, param=PAGE_PARAM):
+    """The configured URL for page 1, the same URL with page=N after that"""
+    if number == 1:
+        return first_url
+    parts = urlsplit(first_url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != param]
+    query.append((param, str(number)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def page_budget(config, budget=None):
+    return budget or config.get('page_budget', DEFAULT_PAGE_BUDGET)
+
+# -------------------- PAGE STREAM --------------------
+def paginate(load_page, first_url, budget=DEFAULT_PAGE_BUDGET):
+    """
+    Yield a category's listing pages one at a time, so each can be written before the
+    next is loaded. load_page(url) returns (status, products, has_next, validators) with
+    status "changed", "unchanged" or "failed"; has_next is None when the site has no
+    next-page marker configured (or the page was not parsed).
+    Stops at the first failed or empty page, a page with no link that earlier pages did
+    not already have, a missing next-page marker, or after `budget` pages.
+    Products repeated from earlier pages are dropped.
+    """
+    seen_links = set()
+    for number in itertools.count(1):
+        if number > budget:
+            print(f"   ⏹️ Page budget ({budget}) reached")
+            return
+
+        url = page_url(first_url, number)
+        status, products, has_next, validators = load_page(url)
+        metrics.inc("pages", status=status)
+        if status == "failed":
+            return
+        if status == "unchanged":
+            yield ListingPage(number, url, status, None, None)
+        else:
+            extracted = [product for product in products or [] if product and product['link']]
+            new_products = [product for product in extracted if product['link'] not in seen_links]
+            metrics.inc("products", len(products or []), event="seen")
+            metrics.inc("products", len(products or []) - len(extracted), event="extract_failed")
+            metrics.inc("products", len(extracted) - len(new_products), event="repeated")
+            if not new_products:
+                print(f"   ⏹️ No new products on page {number}, end of results")
+                return
+            seen_links.update(product['link'] for product in new_products)
+            yield ListingPage(number, url, status, new_products, validators)
+
+        if has_next is False:
+            return
+
+# -------------------- PAGE LOADERS --------------------
+def has_next_page(driver, config):
+    """True/False from the site's next-page marker, None if it has none configured"""
+    selector = config['selectors'].get('next_page')
+    if not selector:
+        return None
+    return bool(driver.find_elements(By.CSS_SELECTOR, selector))
+
+def browser_page_loader(driver, config, website_name, category, state, extract, fields=None, build=None):
+    """
+    load_page for JavaScript sites: extract(container) -> product dict or None.
+    With fields (a bulk_extract spec) and build(record) -> product dict or None,
+    the whole page is read in one script call and extract is only the fallback.
+    """
+    def load_page(url):
+        rate_limiter.wait(url, config['request_interval'])
+        with metrics.timer("page_load"):
+            driver.get(url)
+        with metrics.timer("wait_for_products"):
+            containers = wait_for_products(driver, config['selectors']['product_container'],
+                                           timeout=config['page_timeout'])
+        page_stats.record(page_metrics(driver, url))
+        if not containers:
+            return "failed", None, False, None
+
+        # Same visible text as the last crawl: nothing to extract or write
+        with metrics.timer("page_hash"):
+            page_hash = listing_text_hash(driver, containers)
+        if state.unchanged(url, page_hash):
+            state.record(url, website_name, category, page_hash)
+            return "unchanged", None, has_next_page(driver, config), None
+        with metrics.timer("extract_page"):
+            if fields:
+                products = extract_page(driver, containers, fields, build, extract)
+            else:
+                products = [extract(container) for container in containers]
+        return "changed", products, has_next_page(driver, config), (page_hash, None, None)
+    return load_page
+
+def http_page_loader(config, website_name, category, state):
+    """load_page for server-rendered sites (conditional HTTP, no browser)"""
+    def load_page(url):
+        rate_limiter.wait(url, config['request_interval'])
+        return fetch_changed_products(url, config, website_name, category, state)
+    return load_page
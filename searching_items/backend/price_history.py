@@ -0,0 +1,176 @@
+from datetime import datetime, timezone
+from db_pool import get_connection
+from link_dedup import link_hash, LOOKUP_BATCH_SIZE
+import threading
+import argparse
+import hashlib
+
+# -------------------- HISTORY SETTINGS --------------------
+DEFAULT_DROPS = 20
+
+# Written in the same transaction as the upsert, so a change and its history row land together.
+# The MySQL lookup goes through the indexed link_hash column
+HISTORY_SQL = """
+INSERT INTO price_history (product_id, price, rating, price_minor, currency, rating_value)
+SELECT id, %s, %s, %s, %s, %s FROM daraz_products WHERE link_hash = MD5(%s)
+"""
+SQLITE_HISTORY_SQL = """
+INSERT INTO price_history (product_id, price, rating, price_minor, currency, rating_value)
+SELECT id, %s, %s, %s, %s, %s FROM daraz_products WHERE product_link = %s
+"""
+
+def price_state(price, rating, price_minor, currency, rating_value):
+    """
+    8-byte hash of what a crawl can change. Parsed values are compared when there are
+    any, so "Rs. 4,999" and "Rs 4999" are the same price; rating is rounded because
+    MySQL FLOAT does not give back exactly what was written.
+    """
+    if price_minor is not None:
+        state = (price_minor, currency, None if rating_value is None else round(rating_value, 2))
+    else:
+        state = (price or "", rating or "")
+    return int.from_bytes(hashlib.blake2b(repr(state).encode("utf-8"), digest_size=8).digest(), "little")
+
+def row_state(row):
+    """price_state() of a ProductWriter row"""
+    return price_state(row[1], row[2], row[8], row[9], row[10])
+
+def history_rows(rows):
+    """HISTORY_SQL parameters for ProductWriter rows"""
+    return [(row[1], row[2], row[8], row[9], row[10], row[5]) for row in rows]
+
+# -------------------- CHANGE DETECTION --------------------
+class PriceTracker:
+    """
+    Last written price_state() per link. Links are loaded from the table the first
+    time a writer sees them, so after that a re-crawl of an unchanged page costs no
+    database round trip at all.
+    """
+
+    def __init__(self):
+        self.states = {}          # product_link -> price_state()
+        self.lock = threading.Lock()
+
+    def _load(self, cursor, dialect, links):
+        for start in range(0, len(links), LOOKUP_BATCH_SIZE):
+            batch = links[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(batch))
+            if dialect == "sqlite":
+                cursor.execute("SELECT product_link, price, rating, price_minor, currency, rating_value "
+                               f"FROM daraz_products WHERE product_link IN ({placeholders})", batch)
+            else:
+                cursor.execute("SELECT product_link, price, rating, price_minor, currency, rating_value "
+                               f"FROM daraz_products WHERE link_hash IN ({placeholders})",
+                               [link_hash(link) for link in batch])
+            found = cursor.fetchall()
+            with self.lock:
+                for link, *values in found:
+                    self.states.setdefault(link, price_state(*values))
+
+    def changed(self, cursor, dialect, rows):
+        """The rows whose price or rating differs from the stored one (or that are not stored yet)"""
+        with self.lock:
+            unseen = list({row[5] for row in rows if row[5] and row[5] not in self.states})
+        if unseen:
+            self._load(cursor, dialect, unseen)
+        with self.lock:
+            return [row for row in rows if not row[5] or self.states.get(row[5]) != row_state(row)]
+
+    def remember(self, rows):
+        """Record rows that were just committed"""
+        with self.lock:
+            for row in rows:
+                if row[5]:
+                    self.states[row[5]] = row_state(row)
+
+# Shared by every writer in the process
+_tracker = PriceTracker()
+
+def get_tracker():
+    return _tracker
+
+# -------------------- QUERIES --------------------
+def price_trend(product_id):
+    """Every recorded change of one product, oldest first: (recorded_at, price, price_minor, currency, rating_value)"""
+    db, cursor = get_connection()
+    try:
+        cursor.execute("""
+            SELECT recorded_at, price, price_minor, currency, rating_value
+            FROM price_history
+            WHERE product_id = %s
+            ORDER BY id
+        """, (product_id,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+def _start_of_today(dialect):
+    # SQLite's CURRENT_TIMESTAMP is UTC, MySQL's TIMESTAMP follows the session (local) time
+    now = datetime.now(timezone.utc) if dialect == "sqlite" else datetime.now()
+    return now.strftime("%Y-%m-%d 00:00:00")
+
+def biggest_drops(since=None, limit=DEFAULT_DROPS):
+    """
+    Largest relative price drops recorded since `since` ("YYYY-MM-DD HH:MM:SS",
+    default start of today): (product_id, product_name, website, old_minor, new_minor,
+    currency, recorded_at). Each change is compared with the row before it for the
+    same product, found through idx_history_product.
+    """
+    db, cursor = get_connection()
+    try:
+        cursor.execute("""
+            SELECT h.product_id, p.product_name, p.website, previous.price_minor, h.price_minor,
+                   h.currency, h.recorded_at
+            FROM price_history h
+            JOIN price_history previous ON previous.id = (
+                SELECT MAX(x.id) FROM price_history x WHERE x.product_id = h.product_id AND x.id < h.id)
+            JOIN daraz_products p ON p.id = h.product_id
+            WHERE h.recorded_at >= %s
+              AND h.currency = previous.currency
+              AND h.price_minor < previous.price_minor
+            ORDER BY (previous.price_minor - h.price_minor) * 1.0 / previous.price_minor DESC
+            LIMIT %s
+        """, (since or _start_of_today(getattr(db, "dialect", "mysql")), limit))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+def seed_history():
+    """One starting row per product that has no history yet (its current price). Returns the row count"""
+    db, cursor = get_connection()
+    try:
+        db.start_transaction()
+        cursor.execute("""
+            INSERT INTO price_history (product_id, price, rating, price_minor, currency, rating_value, recorded_at)
+            SELECT p.id, p.price, p.rating, p.price_minor, p.currency, p.rating_value,
+                   COALESCE(p.last_updated, CURRENT_TIMESTAMP)
+            FROM daraz_products p
+            WHERE NOT EXISTS (SELECT 1 FROM price_history h WHERE h.product_id = p.id)
+        """)
+        count = cursor.rowcount
+        db.commit()
+    finally:
+        cursor.close()
+        db.close()
+    print(f"🌱 Seeded price history for {count} products")
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Product price history")
+    parser.add_argument("--seed", action="store_true", help="record current prices of products without history")
+    parser.add_argument("--trend", type=int, metavar="PRODUCT_ID", help="price changes of one product")
+    parser.add_argument("--drops", action="store_true", help="biggest price drops today")
+    parser.add_argument("--since", help='with --drops: "YYYY-MM-DD HH:MM:SS" instead of today')
+    args = parser.parse_args()
+
+    if args.seed:
+        seed_history()
+    if args.trend:
+        for recorded_at, price, _, _, rating_value in price_trend(args.trend):
+            print(f"  {recorded_at}  {price:15} rating {rating_value}")
+    if args.drops:
+        for product_id, name, website, old, new, currency, recorded_at in biggest_drops(args.since):
+            print(f"  -{(old - new) / old:6.1%}  {old / 100:>10,.2f} -> {new / 100:>10,.2f} {currency}  "
+                  f"#{product_id} {name[:45]} | {website}")
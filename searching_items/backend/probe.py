@@ -0,0 +1,146 @@
+from collections import namedtuple
+import aiohttp
+import asyncio
+import argparse
+import threading
+import json
+import time
+import os
+
+# -------------------- PROBE SETTINGS --------------------
+PROBE_TIMEOUT = 5               # Seconds per probe; all sites are probed at once
+CACHE_TTL = 15 * 60             # Reuse a result this long before probing the site again
+REPROBE_INTERVAL = 5 * 60       # Background re-probe period during long crawls
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "probe_cache.json")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Some servers reject HEAD; they get a GET for the first byte only
+HEAD_REJECTED = {403, 405, 501}
+
+ProbeResult = namedtuple("ProbeResult", ["url", "accessible", "status", "latency_ms", "checked_at"])
+
+# -------------------- ASYNC PROBES --------------------
+async def _probe(session, url):
+    started = time.monotonic()
+    status = None
+    try:
+        async with session.head(url, allow_redirects=True) as response:
+            status = response.status
+        if status in HEAD_REJECTED:
+            async with session.get(url, headers={"Range": "bytes=0-0"}, allow_redirects=True) as response:
+                status = response.status
+    except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+        pass
+    accessible = status is not None and 200 <= status < 300
+    return ProbeResult(url, accessible, status, round((time.monotonic() - started) * 1000), time.time())
+
+async def _probe_all(urls, timeout):
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(timeout=client_timeout, headers={"User-Agent": USER_AGENT}) as session:
+        return await asyncio.gather(*(_probe(session, url) for url in urls))
+
+def probe_urls(urls, timeout=PROBE_TIMEOUT):
+    """Probe every URL concurrently: {url: ProbeResult}. Takes about as long as the slowest one"""
+    if not urls:
+        return {}
+    return {result.url: result for result in asyncio.run(_probe_all(list(urls), timeout))}
+
+# -------------------- RESULT CACHE --------------------
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path) as f:
+            return {url: ProbeResult(**entry) for url, entry in json.load(f).items()}
+    except (OSError, ValueError, TypeError):
+        return {}
+
+def save_cache(results, path=CACHE_PATH):
+    # Write-then-rename so a crawl that dies mid-write leaves the old cache
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump({url: result._asdict() for url, result in results.items()}, f, indent=1)
+    os.replace(temp_path, path)
+
+_cache_lock = threading.Lock()
+
+def probe_sites(website_configs, max_age=CACHE_TTL, force=False, path=CACHE_PATH):
+    """
+    Set config['accessible'] for every site from cached results younger than max_age,
+    probing the rest concurrently. Returns {website: ProbeResult}.
+    """
+    with _cache_lock:
+        cache = load_cache(path)
+        now = time.time()
+        urls = {website: config['base_url'] for website, config in website_configs.items()}
+        stale = [url for url in set(urls.values())
+                 if force or url not in cache or now - cache[url].checked_at > max_age]
+        cache.update(probe_urls(stale))
+        if stale:
+            try:
+                save_cache(cache, path)
+            except OSError as e:
+                print(f"⚠️ Could not save probe cache: {e}")
+
+    results = {}
+    for website, url in urls.items():
+        results[website] = cache[url]
+        website_configs[website]['accessible'] = cache[url].accessible
+    return results
+
+def print_probe_results(website_configs, results):
+    for website, result in results.items():
+        config = website_configs[website]
+        if result.accessible:
+            print(f"   {config['name']}: {config['base_url']} ✅ ACCESSIBLE ({result.latency_ms} ms)")
+        else:
+            print(f"   {config['name']}: {config['base_url']} ❌ NOT ACCESSIBLE (status {result.status or 'no response'})")
+
+# -------------------- BACKGROUND RE-PROBE --------------------
+class BackgroundProber:
+    """
+    Re-probes every site on a timer while a long crawl runs, so a site that goes
+    down switches to demo mode (and one that comes back is scraped again) without
+    a restart. Use as `with BackgroundProber(WEBSITE_CONFIGS):`.
+    """
+
+    def __init__(self, website_configs, interval=REPROBE_INTERVAL):
+        self.website_configs = website_configs
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            before = {website: config['accessible'] for website, config in self.website_configs.items()}
+            try:
+                results = probe_sites(self.website_configs, max_age=0)
+            except Exception as e:
+                print(f"   ⚠️ Background probe failed: {e}")
+                continue
+            for website, result in results.items():
+                if result.accessible != before[website]:
+                    state = "back online" if result.accessible else "unreachable, using demo data"
+                    print(f"   🔍 {self.website_configs[website]['name']} is {state}")
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="probe", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=PROBE_TIMEOUT + 1)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probe website accessibility")
+    parser.add_argument("urls", nargs="+", help="URLs to probe")
+    args = parser.parse_args()
+
+    for result in probe_urls(args.urls).values():
+        print(f"  {'✅' if result.accessible else '❌'} {result.status or '---'} {result.latency_ms:>6} ms  {result.url}")
@@ -0,0 +1,154 @@
+from db_pool import DatabaseError
+from metrics import metrics
+from normalize import normalize_row
+from price_history import get_tracker, history_rows, HISTORY_SQL, SQLITE_HISTORY_SQL
+
+# -------------------- WRITER SETTINGS --------------------
+DEFAULT_BATCH_SIZE = 100
+
+# Existing links get their price/rating refreshed instead of being skipped
+UPSERT_SQL = """
+INSERT INTO daraz_products
+(product_name, price, rating, category, website, product_link, page, quantity,
+ price_minor, currency, rating_value, qty_value, qty_unit, unit_price_minor)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    price = VALUES(price),
+    rating = VALUES(rating),
+    price_minor = VALUES(price_minor),
+    currency = VALUES(currency),
+    rating_value = VALUES(rating_value),
+    unit_price_minor = VALUES(unit_price_minor),
+    last_updated = CURRENT_TIMESTAMP
+"""
+
+# Same upsert for the SQLite ecommerce.db (needs SQLite 3.24+)
+SQLITE_UPSERT_SQL = """
+INSERT INTO daraz_products
+(product_name, price, rating, category, website, product_link, page, quantity,
+ price_minor, currency, rating_value, qty_value, qty_unit, unit_price_minor)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT(product_link) DO UPDATE SET
+    price = excluded.price,
+    rating = excluded.rating,
+    price_minor = excluded.price_minor,
+    currency = excluded.currency,
+    rating_value = excluded.rating_value,
+    unit_price_minor = excluded.unit_price_minor,
+    last_updated = CURRENT_TIMESTAMP
+"""
+
+# -------------------- WRITE LISTENERS --------------------
+# Called with the committed (new or changed) rows after every successful flush, from any writer in the process.
+# Rows are the 8 scraped values followed by the NORMALIZED_COLUMNS from normalize.py
+_listeners = []
+
+def add_listener(listener):
+    """Register listener(rows) to keep in-process indexes up to date"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+def remove_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+def _notify(rows):
+    for listener in list(_listeners):
+        try:
+            listener(rows)
+        except Exception as e:
+            # A broken index must never lose a scrape
+            print(f"   ⚠️ Write listener {getattr(listener, '__qualname__', listener)} failed: {e}")
+
+# -------------------- BUFFERED WRITER --------------------
+class ProductWriter:
+    """
+    Buffers scraped products and writes them with one executemany per batch,
+    inside a single transaction. Call end_page() at the end of every page.
+    Rows whose price and rating did not change since the last write are skipped;
+    every change also appends a price_history row (see price_history.py).
+    """
+
+    def __init__(self, db, cursor, batch_size=DEFAULT_BATCH_SIZE, tracker=None):
+        self.db = db
+        self.cursor = cursor
+        self.batch_size = batch_size
+        self.dialect = getattr(db, "dialect", "mysql")
+        self.upsert_sql = SQLITE_UPSERT_SQL if self.dialect == "sqlite" else UPSERT_SQL
+        self.history_sql = SQLITE_HISTORY_SQL if self.dialect == "sqlite" else HISTORY_SQL
+        # Bulk loads pass their own PriceTracker so the shared one does not grow without bound
+        self.tracker = tracker or get_tracker()
+        self.buffer = []
+        self.buffer_new = 0
+        self.new_count = 0
+        self.updated_count = 0
+        self.unchanged_count = 0
+        self.failed_count = 0
+        self.page_failed = False  # A batch of the current page was rolled back
+
+    def add(self, values, is_new=True):
+        """
+        Queue one row: (product_name, price, rating, category, website, product_link, page, quantity).
+        is_new tells the writer whether the link was already in the table (only used for counts).
+        Numeric price/rating/quantity columns are added here (see normalize.py).
+        """
+        self.buffer.append(tuple(values) + normalize_row(values))
+        if is_new:
+            self.buffer_new += 1
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows in one transaction. Returns False if the batch was rolled back"""
+        if not self.buffer:
+            return True
+
+        buffered = self.buffer
+        new_rows = self.buffer_new
+        self.buffer = []
+        self.buffer_new = 0
+
+        try:
+            with metrics.timer("db_change_check"):
+                rows = self.tracker.changed(self.cursor, self.dialect, buffered)
+            if rows:
+                with metrics.timer("db_write"):
+                    # Connection runs with autocommit, so open the transaction explicitly
+                    self.db.start_transaction()
+                    self.cursor.executemany(self.upsert_sql, rows)
+                    self.cursor.executemany(self.history_sql, history_rows(rows))
+                    self.db.commit()
+        except Exception as e:
+            # Never leave the pooled connection inside an open transaction
+            self.db.rollback()
+            self.page_failed = True
+            self.failed_count += len(buffered)
+            metrics.inc("products", len(buffered), event="failed")
+            if not isinstance(e, DatabaseError):
+                raise
+            print(f"   ❌ Batch insert error ({len(buffered)} rows): {e}")
+            return False
+
+        self.tracker.remember(rows)
+        self.new_count += new_rows
+        self.updated_count += len(rows) - new_rows
+        self.unchanged_count += len(buffered) - len(rows)
+        metrics.inc("products", new_rows, event="inserted")
+        metrics.inc("products", len(rows) - new_rows, event="updated")
+        metrics.inc("products", len(buffered) - len(rows), event="unchanged")
+        if rows:
+            _notify(rows)
+        return True
+
+    def end_page(self):
+        """
+        Flush the rest of the page. Returns True only if every batch of the page was
+        written, i.e. the page may be recorded as crawled.
+        """
+        written = self.flush() and not self.page_failed
+        self.page_failed = False
+        return written
+
+    def close(self):
+        """Flush whatever is left"""
+        return self.flush()
@@ -0,0 +1,205 @@
+from collections import namedtuple
+from db_pool import get_connection
+import argparse
+import re
+
+# -------------------- QUANTITY PATTERNS --------------------
+# (amount regex, unit regex, unit label) in priority order: the first pattern
+# that matches anywhere in the name wins, exactly like the old per-pattern loop
+NUMBER = r'\d+(?:\.\d+)?'
+INTEGER = r'\d+'
+
+QUANTITY_PATTERNS = [
+    # Weight patterns
+    (NUMBER, r'kg|kilogram|kilo', 'kg'),
+    (NUMBER, r'g|gm|gram', 'g'),
+    (INTEGER, r'mg|milligram', 'mg'),
+
+    # Volume patterns
+    (NUMBER, r'l|litre|liter', 'L'),
+    (NUMBER, r'ml|milliliter', 'ml'),
+
+    # Count patterns
+    (INTEGER, r'capsules?|caps?', 'capsules'),
+    (INTEGER, r'tablets?|tabs?', 'tablets'),
+    (INTEGER, r'pills?', 'pills'),
+    (INTEGER, r'pieces?|pcs?', 'pieces'),
+    (INTEGER, r'servings?', 'servings'),
+
+    # Pack patterns
+    (INTEGER, r'packs?|pk?', 'pack'),
+    (INTEGER, r'bottles?', 'bottle'),
+    (INTEGER, r'jars?', 'jar'),
+    (INTEGER, r'tubs?', 'tub'),
+    (INTEGER, r'scoops?', 'scoops'),
+
+    # Multi-pack patterns ("2 x 500g"), handled separately below
+    None,
+
+    # Size patterns
+    (NUMBER, r'oz|ounce', 'oz'),
+    (NUMBER, r'lb|pound', 'lb'),
+]
+MULTI_PACK_PATTERN = (r'(?P<c{i}>\d+)\s*x\s*(?P<a{i}>\d+)\s*'
+                      r'(?P<s{i}>mg|g|kg|ml|l|capsules?|tablets?|servings?)\b')
+
+# Sub-units of a multi-pack, mapped to the labels above
+MULTI_PACK_UNITS = {
+    'mg': 'mg', 'g': 'g', 'kg': 'kg', 'ml': 'ml', 'l': 'L',
+    'capsule': 'capsules', 'capsules': 'capsules',
+    'tablet': 'tablets', 'tablets': 'tablets',
+    'serving': 'servings', 'servings': 'servings',
+}
+
+# Checked against the name with spaces removed when no pattern matches
+COMMON_PHRASES = {
+    # Daraz common formats
+    '1kg': '1 kg', '2kg': '2 kg', '5kg': '5 kg',
+    '500g': '500 g', '250g': '250 g', '1l': '1 L',
+    '500ml': '500 ml', '30capsules': '30 capsules',
+    '60tablets': '60 tablets', '90caps': '90 capsules',
+
+    # JackNutrition common formats
+    '2lb': '2 lb', '5lb': '5 lb', '10lb': '10 lb',
+    '907g': '907 g', '2268g': '2268 g',
+    '30servings': '30 servings', '60servings': '60 servings',
+}
+
+def _build_regex():
+    """
+    Compile every pattern into one alternation with a named group per pattern.
+    Every pattern starts with a digit run, so parse_quantity() only tries it at
+    the start of each run of digits instead of at every character.
+    """
+    alternatives = []
+    for i, entry in enumerate(QUANTITY_PATTERNS):
+        if entry is None:
+            body = MULTI_PACK_PATTERN.format(i=i)
+        else:
+            amount, units, _ = entry
+            body = rf'(?P<a{i}>{amount})\s*(?:{units})\b'
+        alternatives.append(f'(?P<p{i}>{body})')
+    return re.compile('|'.join(alternatives))
+
+QUANTITY_RE = _build_regex()
+DIGIT_RUN_RE = re.compile(r'\d+')
+MULTI_PACK_INDEX = QUANTITY_PATTERNS.index(None)
+
+# -------------------- STRUCTURED RESULT --------------------
+# amount: float, unit: label from QUANTITY_PATTERNS, count: items in a multi-pack (1 otherwise),
+# text: the display string extract_quantity() returns
+Quantity = namedtuple("Quantity", ["amount", "unit", "count", "text"])
+
+def parse_quantity(product_name):
+    """Return a Quantity for the product name, or None if no quantity is found"""
+    if not product_name:
+        return None
+
+    text = product_name.lower()
+
+    best_index = None
+    best_match = None
+    multi_pack = None
+    # A pattern that matches inside a digit run also matches at the run's first digit,
+    # so those are the only start positions that can give the leftmost match
+    for run in DIGIT_RUN_RE.finditer(text):
+        match = QUANTITY_RE.match(text, run.start())
+        if match is None:
+            continue
+        # The alternation reports the highest-priority pattern matching at this position
+        index = int(match.lastgroup[1:])
+        if index == MULTI_PACK_INDEX and multi_pack is None:
+            multi_pack = match
+        # Keep the leftmost match of the highest-priority pattern
+        if best_index is None or index < best_index:
+            best_index = index
+            best_match = match
+            if index == 0:
+                break
+
+    if best_match is not None:
+        i = best_index
+        if i == MULTI_PACK_INDEX:
+            count = best_match.group(f'c{i}')
+            amount = best_match.group(f'a{i}')
+            sub_unit = best_match.group(f's{i}')
+            return Quantity(float(amount), MULTI_PACK_UNITS[sub_unit], int(count),
+                            f"{count} x {amount}{sub_unit}")
+        amount = best_match.group(f'a{i}')
+        unit = QUANTITY_PATTERNS[i][2]
+        # "12 x 500g" displays as "500 g" (the g pattern has priority), but still count the packs
+        count = 1
+        if multi_pack is not None and multi_pack.start(f'a{MULTI_PACK_INDEX}') == best_match.start(f'a{i}'):
+            count = int(multi_pack.group(f'c{MULTI_PACK_INDEX}'))
+        return Quantity(float(amount), unit, count, f"{amount} {unit}")
+
+    # Check for common phrases without spaces
+    compact = text.replace(" ", "")
+    for phrase, quantity in COMMON_PHRASES.items():
+        if phrase in compact:
+            amount, unit = quantity.split(" ", 1)
+            return Quantity(float(amount), unit, 1, quantity)
+
+    return None
+
+def extract_quantity(product_name, website="daraz"):
+    """
+    Extract quantity from product name
+    Returns quantity in kg, g, ml, litre, capsule, tablet, etc.
+    """
+    quantity = parse_quantity(product_name)
+    return quantity.text if quantity else "Not specified"
+
+# -------------------- BULK RE-EXTRACTION --------------------
+def reextract_quantities(batch_size=1000):
+    """Recompute the quantity column for every stored product. Returns the number of rows changed"""
+    read_db, read_cursor = get_connection()
+    write_db, write_cursor = get_connection()
+
+    scanned = 0
+    changed = 0
+    updates = []
+    try:
+        # Stream rows on one connection, write changes in batches on the other
+        read_cursor.execute("SELECT id, product_name, quantity FROM daraz_products")
+        for product_id, name, old_quantity in read_cursor:
+            scanned += 1
+            new_quantity = extract_quantity(name)
+            if new_quantity != old_quantity:
+                updates.append((new_quantity, product_id))
+
+            if len(updates) >= batch_size:
+                changed += _write_quantities(write_db, write_cursor, updates)
+                updates = []
+
+        if updates:
+            changed += _write_quantities(write_db, write_cursor, updates)
+    finally:
+        read_cursor.close()
+        read_db.close()
+        write_cursor.close()
+        write_db.close()
+
+    print(f"✅ Re-extracted {scanned} products, {changed} quantities changed")
+    return changed
+
+def _write_quantities(db, cursor, updates):
+    db.start_transaction()
+    # Keep last_updated as the scrape time, not the re-extraction time
+    cursor.executemany("UPDATE daraz_products SET quantity = %s, last_updated = last_updated WHERE id = %s",
+                       updates)
+    db.commit()
+    return len(updates)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Product quantity extraction")
+    parser.add_argument("--reextract", action="store_true",
+                        help="recompute the quantity column for every stored product")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("names", nargs="*", help="product names to parse")
+    args = parser.parse_args()
+
+    if args.reextract:
+        reextract_quantities(args.batch_size)
+    for name in args.names:
+        print(f"{name!r}: {parse_quantity(name)}")
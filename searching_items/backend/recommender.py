@@ -0,0 +1,314 @@
+from db_pool import get_connection
+from fulltext import tokenize
+from scipy import sparse
+import numpy as np
+import argparse
+import math
+import time
+
+# -------------------- RECOMMENDER SETTINGS --------------------
+DEFAULT_K = 10
+# Share of the cosine score each feature group contributes (sums to 1)
+FEATURE_WEIGHTS = {
+    "name": 0.6,
+    "category": 0.15,
+    "price": 0.1,
+    "unit": 0.1,
+    "rating": 0.05,
+}
+BLOCK_BYTES = 64 * 1024 * 1024    # Memory for one block of the similarity matrix
+SAVE_BATCH_SIZE = 5000
+
+# With exact=False and more than EXACT_LIMIT products, only products in nearby k-means
+# clusters are compared (measured recall around 0.73), so it has to be asked for
+EXACT_LIMIT = 10000
+CLUSTER_PROBES = 3                # Each cluster is compared with itself and its nearest clusters
+CANDIDATE_ASSIGNMENTS = 2         # A product is a candidate in its 2 nearest clusters (catches edge cases)
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50000
+RANDOM_SEED = 7
+
+# -------------------- FEATURES --------------------
+def load_products():
+    """(ids, names, categories, price_minor, currencies, qty_units, ratings) for every product"""
+    db, cursor = get_connection()
+    try:
+        cursor.execute("SELECT id, product_name, category, price_minor, currency, qty_unit, rating_value "
+                       "FROM daraz_products ORDER BY id")
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+    return [list(column) for column in zip(*rows)] if rows else [[] for _ in range(7)]
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(matrix)
+
+def name_tfidf(names, vocabulary=None, idf=None):
+    """
+    L2-normalized TF-IDF rows (sublinear tf, smoothed idf) over fulltext tokens.
+    Pass the vocabulary/idf of an earlier call to encode new names the same way
+    (unseen tokens are dropped). Returns (matrix, vocabulary, idf).
+    """
+    fitted = vocabulary is not None
+    vocabulary = vocabulary if fitted else {}
+    rows, columns, counts = [], [], []
+    for row, name in enumerate(names):
+        term_counts = {}
+        for token in tokenize(name):
+            if fitted and token not in vocabulary:
+                continue
+            term_counts[token] = term_counts.get(token, 0) + 1
+        for token, count in term_counts.items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(token, len(vocabulary)))
+            counts.append(count)
+
+    n = len(names)
+    matrix = sparse.csr_matrix((np.array(counts, dtype=np.float32), (rows, columns)),
+                               shape=(n, len(vocabulary)))
+    matrix.data = 1 + np.log(matrix.data)
+    if idf is None:
+        document_frequency = np.bincount(matrix.indices, minlength=len(vocabulary))
+        idf = (np.log((1 + n) / (1 + document_frequency)) + 1).astype(np.float32)
+    return _normalize_rows(matrix.multiply(idf).tocsr()).astype(np.float32), vocabulary, idf
+
+def price_bucket(price_minor):
+    """Half-octave buckets: each one spans about 41% in price"""
+    return int(2 * math.log2(price_minor)) if price_minor and price_minor > 0 else None
+
+def attribute_features(categories, prices, currencies, units, ratings, columns=None):
+    """
+    Dense rows for the low-cardinality features (category, price bucket, unit, rating),
+    each group L2-normalized. Neighbouring price buckets get half weight so close
+    prices on either side of a bucket edge still count as similar.
+    columns ({group: {value: column}}) from an earlier call encodes new rows the same
+    way; unseen values are dropped. Returns (rows, columns).
+    """
+    groups = {name: [{} for _ in categories] for name in ("category", "price", "unit", "rating")}
+    for row, (category, price, currency, unit, rating) in enumerate(zip(categories, prices, currencies,
+                                                                         units, ratings)):
+        if category:
+            groups["category"][row][category.lower()] = 1.0
+        bucket = price_bucket(price)
+        if bucket is not None:
+            for offset, weight in ((-1, 0.5), (0, 1.0), (1, 0.5)):
+                groups["price"][row][(currency, bucket + offset)] = weight
+        if unit:
+            groups["unit"][row][unit] = 1.0
+        if rating:
+            groups["rating"][row][round(rating * 2) / 2] = 1.0
+
+    fitted = columns is not None
+    columns = columns if fitted else {name: {} for name in groups}
+    blocks = []
+    for name, group_rows in groups.items():
+        group_columns = columns[name]
+        if not fitted:
+            for values in group_rows:
+                for key in values:
+                    group_columns.setdefault(key, len(group_columns))
+        block = np.zeros((len(group_rows), len(group_columns)), dtype=np.float32)
+        for row, values in enumerate(group_rows):
+            for key, weight in values.items():
+                column = group_columns.get(key)
+                if column is not None:
+                    block[row, column] = weight
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        blocks.append(block / norms * np.float32(math.sqrt(FEATURE_WEIGHTS[name])))
+    return np.hstack(blocks), columns
+
+def build_vectors(names, categories, prices, currencies, units, ratings):
+    """
+    (sparse name rows, dense attribute rows). The dot product of two products' rows is
+    the FEATURE_WEIGHTS-weighted sum of the per-group cosine similarities.
+    """
+    names_matrix, _, _ = name_tfidf(names)
+    names_matrix = names_matrix * np.float32(math.sqrt(FEATURE_WEIGHTS["name"]))
+    attributes, _ = attribute_features(categories, prices, currencies, units, ratings)
+    return names_matrix.tocsr(), attributes
+
+# -------------------- CLUSTERING --------------------
+def _dense(matrix):
+    return matrix.toarray() if sparse.issparse(matrix) else np.asarray(matrix)
+
+def spherical_kmeans(vectors, clusters, iterations=KMEANS_ITERATIONS, sample=KMEANS_SAMPLE, seed=RANDOM_SEED):
+    """Unit-length centroids (dense) for unit-length rows (sparse or dense), trained on a sample of them"""
+    rng = np.random.default_rng(seed)
+    if vectors.shape[0] > sample:
+        vectors = vectors[rng.choice(vectors.shape[0], sample, replace=False)]
+    n = vectors.shape[0]
+    centroids = _dense(vectors[rng.choice(n, clusters, replace=False)])
+    for _ in range(iterations):
+        assignment = np.asarray((vectors @ centroids.T).argmax(axis=1)).ravel()
+        membership = sparse.csr_matrix((np.ones(n, dtype=np.float32), (assignment, np.arange(n))),
+                                       shape=(clusters, n))
+        sums = _dense(membership @ vectors)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Re-seed empty clusters from random rows
+        sums[empty] = _dense(vectors[rng.choice(n, int(empty.sum()))])
+        norms[empty] = 1
+        centroids = sums / norms[:, None]
+    return centroids.astype(np.float32)
+
+def nearest_clusters(vectors, centroids, count, block_rows=65536):
+    """Indices of each row's `count` most similar centroids, nearest first"""
+    nearest = []
+    for start in range(0, vectors.shape[0], block_rows):
+        similarity = np.asarray(vectors[start:start + block_rows] @ centroids.T)
+        best = np.argpartition(-similarity, count - 1, axis=1)[:, :count]
+        order = np.argsort(-np.take_along_axis(similarity, best, axis=1), axis=1)
+        nearest.append(np.take_along_axis(best, order, axis=1))
+    return np.vstack(nearest)
+
+# -------------------- NEIGHBOURS --------------------
+def _block_top_k(names_matrix, attributes, rows, candidates, k, indices, scores):
+    """Exact scores of rows against candidates (both index arrays), top-k written into indices/scores"""
+    names_candidates = names_matrix[candidates].T.tocsc()
+    attributes_candidates = np.ascontiguousarray(attributes[candidates].T)
+    position = {int(candidate): column for column, candidate in enumerate(candidates)}
+    take = min(k, len(candidates) - 1)
+    chunk = max(1, BLOCK_BYTES // (4 * len(candidates)))
+
+    for start in range(0, len(rows), chunk):
+        chunk_rows = rows[start:start + chunk]
+        similarity = (names_matrix[chunk_rows] @ names_candidates).toarray()
+        similarity += attributes[chunk_rows] @ attributes_candidates
+        # A product is not its own neighbour
+        self_columns = [position.get(int(row), -1) for row in chunk_rows]
+        for i, column in enumerate(self_columns):
+            if column >= 0:
+                similarity[i, column] = -np.inf
+        if take <= 0:
+            continue
+
+        best = np.argpartition(-similarity, take - 1, axis=1)[:, :take]
+        best_scores = np.take_along_axis(similarity, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        indices[chunk_rows, :take] = candidates[np.take_along_axis(best, order, axis=1)]
+        scores[chunk_rows, :take] = np.take_along_axis(best_scores, order, axis=1)
+
+def top_k_neighbors(names_matrix, attributes, k=DEFAULT_K, exact=True, probes=CLUSTER_PROBES):
+    """
+    Top-k most similar rows for every row, as (indices, scores) arrays of shape (n, k);
+    missing neighbours are -1. Similarities are exact and computed in row blocks
+    (sparse x sparse for names, dense BLAS for attributes). By default every pair is
+    scored. With exact=False and more than EXACT_LIMIT rows, rows are grouped with
+    spherical k-means and each cluster is only scored against the products of its
+    `probes` nearest clusters, so the work grows with n * sqrt(n) and a neighbour
+    sitting across a cluster edge can be missed.
+    """
+    n = names_matrix.shape[0]
+    names_matrix = names_matrix.tocsr()
+    indices = np.full((n, k), -1, dtype=np.int32)
+    scores = np.full((n, k), -np.inf, dtype=np.float32)
+    if n < 2:
+        return indices, scores
+
+    if exact or n <= EXACT_LIMIT:
+        every_row = np.arange(n)
+        _block_top_k(names_matrix, attributes, every_row, every_row, k, indices, scores)
+        return indices, scores
+
+    vectors = sparse.hstack([names_matrix, sparse.csr_matrix(attributes)]).tocsr()
+    clusters = int(math.sqrt(n))
+    centroids = spherical_kmeans(vectors, clusters)
+    assigned = nearest_clusters(vectors, centroids, CANDIDATE_ASSIGNMENTS)
+
+    # members[c]: rows whose nearest centroid is c; candidates[c]: rows with c among their nearest
+    members, candidates = [], []
+    for column in range(CANDIDATE_ASSIGNMENTS):
+        order = np.argsort(assigned[:, column], kind="stable")
+        bounds = np.searchsorted(assigned[order, column], np.arange(clusters + 1))
+        groups = [order[bounds[c]:bounds[c + 1]] for c in range(clusters)]
+        if column == 0:
+            members = groups
+            candidates = [[group] for group in groups]
+        else:
+            for c, group in enumerate(groups):
+                candidates[c].append(group)
+    candidates = [np.concatenate(groups) for groups in candidates]
+    probed = np.argsort(-(centroids @ centroids.T), axis=1)[:, :probes]
+
+    for cluster, rows in enumerate(members):
+        if len(rows) == 0:
+            continue
+        pool = np.unique(np.concatenate([candidates[other] for other in probed[cluster]]))
+        _block_top_k(names_matrix, attributes, rows, pool, k, indices, scores)
+    return indices, scores
+
+def build_neighbors(k=DEFAULT_K, exact=True):
+    """
+    Recompute every product's neighbours and replace product_neighbors. Returns the row count.
+    exact=False allows the approximate k-means search on catalogs above EXACT_LIMIT.
+    """
+    started = time.perf_counter()
+    ids, names, categories, prices, currencies, units, ratings = load_products()
+    if len(ids) < 2:
+        print("⚠️ Not enough products for recommendations")
+        return 0
+
+    names_matrix, attributes = build_vectors(names, categories, prices, currencies, units, ratings)
+    vectors_time = time.perf_counter() - started
+    indices, scores = top_k_neighbors(names_matrix, attributes, k, exact)
+    mode = "exact" if exact or len(ids) <= EXACT_LIMIT else "approximate"
+    neighbors_time = time.perf_counter() - started - vectors_time
+
+    ids = np.array(ids)
+    neighbor_ids = ids[indices]
+    rows = [(int(ids[row]), rank, int(neighbor_ids[row, rank]), float(scores[row, rank]))
+            for row in range(len(ids)) for rank in range(indices.shape[1]) if indices[row, rank] >= 0]
+
+    db, cursor = get_connection()
+    try:
+        db.start_transaction()
+        cursor.execute("DELETE FROM product_neighbors")
+        for start in range(0, len(rows), SAVE_BATCH_SIZE):
+            cursor.executemany(
+                "INSERT INTO product_neighbors (product_id, neighbor_rank, neighbor_id, score) "
+                "VALUES (%s, %s, %s, %s)", rows[start:start + SAVE_BATCH_SIZE])
+        db.commit()
+    finally:
+        cursor.close()
+        db.close()
+
+    print(f"🧭 Neighbours for {len(ids)} products ({mode}): vectors {vectors_time:.2f}s, "
+          f"top-{indices.shape[1]} {neighbors_time:.2f}s, total {time.perf_counter() - started:.2f}s")
+    return len(rows)
+
+def similar(product_id, k=DEFAULT_K):
+    """Precomputed neighbours of a product: (neighbor_id, score, product_name, website, price)"""
+    db, cursor = get_connection()
+    try:
+        cursor.execute("""
+            SELECT n.neighbor_id, n.score, p.product_name, p.website, p.price
+            FROM product_neighbors n
+            JOIN daraz_products p ON p.id = n.neighbor_id
+            WHERE n.product_id = %s
+            ORDER BY n.neighbor_rank
+            LIMIT %s
+        """, (product_id, k))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Similar-product recommendations")
+    parser.add_argument("--build", action="store_true", help="recompute product_neighbors")
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--approximate", action="store_true",
+                        help=f"above {EXACT_LIMIT} products, only compare nearby k-means clusters (faster, may miss neighbours)")
+    parser.add_argument("product_ids", nargs="*", type=int, help="products to show neighbours for")
+    args = parser.parse_args()
+
+    if args.build:
+        build_neighbors(args.k, exact=not args.approximate)
+    for product_id in args.product_ids:
+        print(f"Similar to #{product_id}:")
+        for neighbor_id, score, name, website, price in similar(product_id, args.k):
+            print(f"  {score:.3f}  #{neighbor_id} {name[:50]} | {website} | {price}")
@@ -3,11 +3,17 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-import mysql.connector
-import time
-import re
-import requests
-import socket
+from browser_profile import setup_lean_driver, blocked_urls, page_stats
+from probe import probe_sites, print_probe_results
+from metrics import metrics, labelled, timed
+from driver_pool import DriverPool
+from pagination import paginate, page_budget, browser_page_loader, http_page_loader
+from crawl_state import get_state
+from product_writer import ProductWriter
+from db_pool import get_connection, DatabaseError
+from link_dedup import LinkDeduper
+from quantity import extract_quantity
+from bulk_extract import field
 
 # -------------------- DRIVER SETUP --------------------
 def setup_driver():
@@ -21,8 +27,7 @@ def setup_driver():
     
     # Try to create driver
     try:
-        driver = webdriver.Chrome(options=options)
-        driver.set_page_load_timeout(30)
+        driver = setup_lean_driver(options, blocked_urls(WEBSITE_CONFIGS))
         return driver
     except Exception as e:
         print(f"❌ Failed to create Chrome driver: {e}")
@@ -30,58 +35,13 @@ def setup_driver():
 
 # -------------------- DATABASE SETUP --------------------
 def setup_database():
-    """Setup MySQL database connection"""
+    """Get a pooled database connection (the table is created once per process)"""
     try:
-        db = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="mazhar334",
-            database="ecommerce",
-            autocommit=True
-        )
-        
-        cursor = db.cursor()
-        
-        # Create table if it doesn't exist
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS daraz_products (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            product_name VARCHAR(500),
-            price VARCHAR(100),
-            rating VARCHAR(50),
-            category VARCHAR(100),
-            website VARCHAR(50),
-            product_link VARCHAR(1000) UNIQUE,
-            page INT,
-            quantity VARCHAR(100),
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        )
-        """
-        cursor.execute(create_table_sql)
-        db.commit()
-        
-        return db, cursor
-        
-    except mysql.connector.Error as err:
+        return get_connection()
+    except DatabaseError as err:
         print(f"❌ Database connection error: {err}")
         return None, None
 
-# -------------------- WEBSITE CHECK FUNCTION --------------------
-def check_website_accessibility(url):
-    """Check if a website is accessible"""
-    try:
-        # Try DNS resolution first
-        domain = url.split('/')[2]
-        socket.gethostbyname(domain)
-        
-        # Try HTTP request
-        response = requests.get(url, timeout=10, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        return response.status_code == 200
-    except:
-        return False
-
 # -------------------- WEBSITE CONFIGURATIONS --------------------
 WEBSITE_CONFIGS = {
     "daraz": {
@@ -101,7 +61,13 @@ WEBSITE_CONFIGS = {
             "product_name_attr": "alt",
             "price": ".ooOxS, .jcHByF, .c13VH6",
             "rating": ".mdmmT span, .rating__yellow, .c2XhW",
+            "next_page": "li.ant-pagination-next:not(.ant-pagination-disabled)",
         },
+        "requires_js": True,  # Listing grid is rendered by JavaScript
+        "page_timeout": 15,  # Max seconds to wait for product containers
+        "request_interval": 2,  # Min seconds between requests to this host
+        "page_budget": 20,  # Max listing pages per category and crawl
+        "blocked_urls": ["*mmstat.com*", "*aplus*.js*", "*/alilog/*"],  # Site analytics (see browser_profile)
         "accessible": False  # Will be set dynamically
     },
     "jacknutrition": {
@@ -122,7 +88,13 @@ WEBSITE_CONFIGS = {
             "product_name_attr": "alt",
             "price": ".price, .money, .product-price, .price-item",
             "rating": ".rating, .review-rating, .star-rating",
+            "next_page": "link[rel='next'], a[rel='next'], .pagination__next",
         },
+        "requires_js": False,  # Shopify collection pages are server-rendered
+        "page_timeout": 10,  # Max seconds to wait for product containers
+        "request_interval": 1,  # Min seconds between requests to this host
+        "page_budget": 20,  # Max listing pages per category and crawl
+        "blocked_urls": ["*monorail-edge.shopifysvc.com*", "*/.well-known/shopify/monorail*", "*facebook.com/tr*"],  # Site analytics (see browser_profile)
         "accessible": False  # Will be set dynamically
     }
 }
@@ -214,84 +186,8 @@ DEMO_PRODUCTS = {
     ]
 }
 
-# -------------------- QUANTITY EXTRACTION FUNCTION --------------------
-def extract_quantity(product_name, website="daraz"):
-    """
-    Extract quantity from product name
-    Returns quantity in kg, g, ml, litre, capsule, tablet, etc.
-    """
-    if not product_name:
-        return "Not specified"
-    
-    # Convert to lowercase for easier matching
-    text = product_name.lower()
-    
-    # Common quantity patterns for both websites
-    patterns = [
-        # Weight patterns
-        (r'(\d+(?:\.\d+)?)\s*(kg|kilogram|kilo)\b', 'kg'),
-        (r'(\d+(?:\.\d+)?)\s*(g|gm|gram)\b', 'g'),
-        (r'(\d+)\s*(mg|milligram)\b', 'mg'),
-        
-        # Volume patterns
-        (r'(\d+(?:\.\d+)?)\s*(l|litre|liter)\b', 'L'),
-        (r'(\d+(?:\.\d+)?)\s*(ml|milliliter)\b', 'ml'),
-        
-        # Count patterns
-        (r'(\d+)\s*(capsules?|caps?)\b', 'capsules'),
-        (r'(\d+)\s*(tablets?|tabs?)\b', 'tablets'),
-        (r'(\d+)\s*(pills?)\b', 'pills'),
-        (r'(\d+)\s*(pieces?|pcs?)\b', 'pieces'),
-        (r'(\d+)\s*(servings?)\b', 'servings'),
-        
-        # Pack patterns
-        (r'(\d+)\s*(packs?|pk?)\b', 'pack'),
-        (r'(\d+)\s*(bottles?)\b', 'bottle'),
-        (r'(\d+)\s*(jars?)\b', 'jar'),
-        (r'(\d+)\s*(tubs?)\b', 'tub'),
-        (r'(\d+)\s*(scoops?)\b', 'scoops'),
-        
-        # Multi-pack patterns
-        (r'(\d+)\s*x\s*(\d+)\s*(mg|g|kg|ml|l|capsules?|tablets?|servings?)\b', 'multi-pack'),
-        
-        # Size patterns
-        (r'(\d+(?:\.\d+)?)\s*(oz|ounce)\b', 'oz'),
-        (r'(\d+(?:\.\d+)?)\s*(lb|pound)\b', 'lb'),
-    ]
-    
-    for pattern, unit in patterns:
-        match = re.search(pattern, text)
-        if match:
-            if unit == 'multi-pack':
-                count = match.group(1)
-                amount = match.group(2)
-                sub_unit = match.group(3)
-                return f"{count} x {amount}{sub_unit}"
-            else:
-                amount = match.group(1)
-                return f"{amount} {unit}"
-    
-    # Check for common phrases without spaces
-    common_phrases = {
-        # Daraz common formats
-        '1kg': '1 kg', '2kg': '2 kg', '5kg': '5 kg',
-        '500g': '500 g', '250g': '250 g', '1l': '1 L',
-        '500ml': '500 ml', '30capsules': '30 capsules',
-        '60tablets': '60 tablets', '90caps': '90 capsules',
-        
-        # JackNutrition common formats
-        '2lb': '2 lb', '5lb': '5 lb', '10lb': '10 lb',
-        '907g': '907 g', '2268g': '2268 g',
-        '30servings': '30 servings', '60servings': '60 servings',
-    }
-    
-    for phrase, quantity in common_phrases.items():
-        if phrase in text.replace(" ", ""):
-            return quantity
-    
-    return "Not specified"
-
 # -------------------- DEMO MODE FUNCTIONS --------------------
+@labelled()
 def scrape_demo_data(website_name, category):
     """Scrape demo data when website is not accessible"""
     print(f"📱 Using DEMO MODE for {WEBSITE_CONFIGS[website_name]['name']} - {category}")
@@ -300,30 +196,21 @@ def scrape_demo_data(website_name, category):
     if not db:
         return 0
     
-    # Get existing links
-    cursor.execute("SELECT product_link FROM daraz_products WHERE website = %s", 
-                   (WEBSITE_CONFIGS[website_name]['name'],))
-    existing_links = {row[0] for row in cursor.fetchall()}
-    
-    new_products_count = 0
+    writer = ProductWriter(db, cursor)
+    deduper = LinkDeduper(db, cursor)
     
     # Use demo products
     demo_products = DEMO_PRODUCTS.get(website_name, [])
     
+    # Only look up the links we are about to write
+    deduper.existing_links(product['link'] for product in demo_products)
+    
     for product in demo_products:
-        if product['link'] in existing_links:
-            continue
-        
         # Extract quantity if not already set
         if 'quantity' not in product or product['quantity'] == 'Not specified':
             product['quantity'] = extract_quantity(product['name'], website_name)
         
-        # Insert into database
-        insert_sql = """
-        INSERT INTO daraz_products 
-        (product_name, price, rating, category, website, product_link, page, quantity)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        # Queue for the batch upsert (existing links get refreshed)
         values = (
             product['name'],
             product['price'],
@@ -334,26 +221,23 @@ def scrape_demo_data(website_name, category):
             1,
             product['quantity']
         )
-        
-        try:
-            cursor.execute(insert_sql, values)
-            db.commit()
-            new_products_count += 1
+        is_new = deduper.is_new(product['link'])
+        writer.add(values, is_new)
+        if is_new:
             print(f"   ✅ Demo: {product['name'][:40]}... | {product['price']} | Qty: {product['quantity']}")
-            time.sleep(0.3)  # Small delay for realism
-        except mysql.connector.IntegrityError:
-            db.rollback()
-        except Exception as e:
-            db.rollback()
-            print(f"   ❌ Demo insert error: {e}")
     
+    writer.close()
     cursor.close()
     db.close()
-    return new_products_count
+    return writer.new_count
 
 # -------------------- REAL SCRAPING FUNCTIONS --------------------
-def scrape_real_website(driver, website_name, category, max_pages=2):
-    """Scrape real website data"""
+@labelled()
+def scrape_real_website(driver, website_name, category, budget=None):
+    """
+    Scrape a category page by page until the results end (or its page budget is spent).
+    Each page is written as soon as it is parsed.
+    """
     if website_name not in WEBSITE_CONFIGS:
         return 0
     
@@ -370,71 +254,42 @@ def scrape_real_website(driver, website_name, category, max_pages=2):
     if not db:
         return 0
     
-    # Get existing links
-    cursor.execute("SELECT product_link FROM daraz_products WHERE website = %s", 
-                   (config['name'],))
-    existing_links = {row[0] for row in cursor.fetchall()}
+    writer = ProductWriter(db, cursor)
+    deduper = LinkDeduper(db, cursor)
+    state = get_state()
     
-    new_products_count = 0
+    first_url = config['base_url'] + config['search_urls'][category]
+    if config['requires_js']:
+        driver.set_page_load_timeout(20)
+        load_page = browser_page_loader(driver, config, website_name, category, state,
+                                        lambda container: extract_product_info(container, config, website_name),
+                                        product_fields(config, website_name),
+                                        lambda record: product_from_record(record, website_name))
+    else:
+        # Server-rendered pages: conditional HTTP fetch, no browser
+        load_page = http_page_loader(config, website_name, category, state)
     
-    for page in range(1, max_pages + 1):
-        # Build URL
-        if page == 1:
-            url = config['base_url'] + config['search_urls'][category]
-        else:
-            if website_name == "daraz":
-                url = f"{config['base_url']}{config['search_urls'][category]}&page={page}"
-            else:
-                url = f"{config['base_url']}{config['search_urls'][category]}?page={page}"
-        
-        print(f"   📄 Page {page}: {url}")
-        
-        try:
-            # Try to load page with timeout
-            driver.set_page_load_timeout(20)
-            driver.get(url)
-            time.sleep(3)
-            
-            # Find product containers
-            containers = driver.find_elements(By.CSS_SELECTOR, config['selectors']['product_container'])
+    pages = 0
+    try:
+        for listing in paginate(load_page, first_url, page_budget(config, budget)):
+            pages += 1
+            print(f"   📄 Page {listing.number}: {listing.url}")
+            if listing.status == "unchanged":
+                print(f"   ⏭️ Page unchanged since the last crawl")
+                continue
             
-            if not containers:
-                print(f"   ⚠️ No products found, trying alternative approach...")
-                # Try to find any product links
-                all_links = driver.find_elements(By.TAG_NAME, "a")
-                product_links = []
-                for link in all_links:
-                    href = link.get_attribute("href")
-                    if href and '/products/' in href:
-                        product_links.append(href)
-                
-                if product_links:
-                    print(f"   Found {len(product_links)} product links")
-                    # Use demo data since we can't parse the page properly
-                    return scrape_demo_data(website_name, category)
-                else:
-                    print(f"   ⚠️ Could not find any products")
-                    continue
+            products = listing.products
+            print(f"   Found {len(products)} products")
+            if not config['requires_js']:
+                for product in products:
+                    product['quantity'] = extract_quantity(product['name'], website_name)
             
-            print(f"   Found {len(containers)} products")
+            # One indexed lookup for the links on this page
+            deduper.existing_links(product_info['link'] for product_info in products)
             
-            for i, container in enumerate(containers[:10]):  # Limit to 10 products per page
+            for i, product_info in enumerate(products):
                 try:
-                    # Extract product info
-                    product_info = extract_product_info(container, config, website_name)
-                    if not product_info:
-                        continue
-                    
-                    # Skip if already exists
-                    if product_info['link'] in existing_links:
-                        continue
-                    
-                    # Save to database
-                    insert_sql = """
-                    INSERT INTO daraz_products 
-                    (product_name, price, rating, category, website, product_link, page, quantity)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """
+                    # Queue for the batch upsert (existing links get refreshed)
                     values = (
                         product_info['name'],
                         product_info['price'],
@@ -442,45 +297,56 @@ def scrape_real_website(driver, website_name, category, max_pages=2):
                         category,
                         config['name'],
                         product_info['link'],
-                        page,
+                        listing.number,
                         product_info['quantity']
                     )
                     
-                    try:
-                        cursor.execute(insert_sql, values)
-                        db.commit()
-                        new_products_count += 1
-                        existing_links.add(product_info['link'])
-                        print(f"   ✅ {i+1}/{len(containers)}: {product_info['name'][:40]}...")
-                    except mysql.connector.IntegrityError:
-                        db.rollback()
-                    except Exception as e:
-                        db.rollback()
-                        print(f"   ❌ Insert error: {e}")
-                    
-                    time.sleep(0.5)
+                    is_new = deduper.is_new(product_info['link'])
+                    writer.add(values, is_new)
+                    if is_new:
+                        print(f"   ✅ {i+1}/{len(products)}: {product_info['name'][:40]}...")
                     
                 except Exception as e:
                     print(f"   ⚠️ Error with product {i+1}: {str(e)[:50]}")
                     continue
             
-            time.sleep(2)  # Delay between pages
-            
-        except TimeoutException:
-            print(f"   ⚠️ Timeout loading page {page}")
-            continue
-        except WebDriverException as e:
-            print(f"   ❌ Browser error: {str(e)[:100]}")
-            # Switch to demo mode
+            # One transaction per page; the page only counts as crawled once it is written
+            if writer.end_page() and listing.validators:
+                state.record(listing.url, website_name, category, *listing.validators)
+        
+    except TimeoutException:
+        print(f"   ⚠️ Timeout loading page {pages + 1}")
+    except WebDriverException as e:
+        print(f"   ❌ Browser error: {str(e)[:100]}")
+        # Switch to demo mode
+        writer.close()
+        cursor.close()
+        db.close()
+        return scrape_demo_data(website_name, category)
+    except Exception as e:
+        print(f"   ❌ Error: {e}")
+    
+    if pages == 0 and config['requires_js']:
+        print(f"   ⚠️ No products found, trying alternative approach...")
+        # Try to find any product links
+        product_links = [link.get_attribute("href") for link in driver.find_elements(By.TAG_NAME, "a")]
+        product_links = [href for href in product_links if href and '/products/' in href]
+        if product_links:
+            print(f"   Found {len(product_links)} product links")
+            # Use demo data since we can't parse the page properly
+            writer.close()
+            cursor.close()
+            db.close()
             return scrape_demo_data(website_name, category)
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
-            continue
+    if pages == 0:
+        print(f"   ⚠️ Could not find any products")
     
+    writer.close()
     cursor.close()
     db.close()
-    return new_products_count
+    return writer.new_count
 
+@timed("extract_product")
 def extract_product_info(container, config, website_name):
     """Extract product information from container"""
     try:
@@ -543,23 +409,52 @@ def extract_product_info(container, config, website_name):
         print(f"   ⚠️ Extraction error: {str(e)[:50]}")
         return None
 
+def product_fields(config, website_name):
+    """bulk_extract spec with the same selectors and fallbacks as extract_product_info"""
+    selectors = config['selectors']
+    image_name = (selectors['product_image'], selectors['product_name_attr'])
+    fields = {
+        'link': field((selectors['product_link'], "href"), ("a", "href")),
+        'name': field(image_name) if website_name == "daraz" else field((".title, .product-title, .name", None), image_name),
+        'price': field((selectors['price'], None)),
+    }
+    if website_name == "daraz":
+        fields['rating'] = field((selectors['rating'], None))
+    return fields
+
+def product_from_record(record, website_name):
+    """Product dict from a bulk-extracted record (None without a link, like extract_product_info)"""
+    if not record.get('link'):
+        return None
+    name = record.get('name')
+    if not name or name.strip() == "":
+        name = "Unknown Product"
+    return {
+        'name': name,
+        'price': record.get('price') if record.get('price') is not None else "Price not available",
+        'rating': record.get('rating') if record.get('rating') is not None else "No Rating",
+        'quantity': extract_quantity(name, website_name),
+        'link': record['link']
+    }
+
+def scrape_category(driver_pool, website_name, category, budget=None):
+    """Scrape one category on a leased browser, or demo data when offline"""
+    config = WEBSITE_CONFIGS[website_name]
+    if config['accessible'] and not config['requires_js']:
+        # Server-rendered site, no browser needed
+        return scrape_real_website(None, website_name, category, budget)
+    if config['accessible']:
+        with driver_pool.lease() as driver:
+            if driver:
+                return scrape_real_website(driver, website_name, category, budget)
+    return scrape_demo_data(website_name, category)
+
 # -------------------- MAIN FUNCTIONS --------------------
-def check_websites_accessibility():
-    """Check which websites are accessible"""
+def check_websites_accessibility(force=False):
+    """Check which websites are accessible (all at once, cached results reused for a while)"""
     print("\n🔍 Checking website accessibility...")
-    
-    for website in WEBSITE_CONFIGS:
-        config = WEBSITE_CONFIGS[website]
-        test_url = config['base_url']
-        
-        print(f"   {config['name']}: {test_url}", end=" ")
-        
-        if check_website_accessibility(test_url):
-            config['accessible'] = True
-            print("✅ ACCESSIBLE")
-        else:
-            config['accessible'] = False
-            print("❌ NOT ACCESSIBLE (Using demo data)")
+    print_probe_results(WEBSITE_CONFIGS, probe_sites(WEBSITE_CONFIGS, force=force))
+    print("   (Sites that are not accessible use demo data)")
     
     print("\n" + "="*60)
 
@@ -603,7 +498,7 @@ def display_statistics():
         cursor.close()
         db.close()
 
-def main():
+def main(driver_pool):
     """Main function"""
     print("="*60)
     print("🛒 SMART PRODUCT SCRAPER")
@@ -612,9 +507,8 @@ def main():
     print("and uses demo data when websites are not accessible.")
     print("="*60)
     
-    # Setup driver
-    driver = setup_driver()
-    if not driver:
+    # Browsers are started by the pool
+    if not driver_pool.stats["created"]:
         print("❌ Failed to start browser. Running in demo-only mode.")
     
     # Check website accessibility
@@ -651,10 +545,7 @@ def main():
             if cat_choice.lower() == 'all':
                 total = 0
                 for cat in categories:
-                    if driver and WEBSITE_CONFIGS["daraz"]["accessible"]:
-                        count = scrape_real_website(driver, "daraz", cat, max_pages=1)
-                    else:
-                        count = scrape_demo_data("daraz", cat)
+                    count = scrape_category(driver_pool, "daraz", cat)
                     total += count
                 print(f"\n✅ Total added from Daraz: {total}")
             else:
@@ -662,10 +553,7 @@ def main():
                     cat_index = int(cat_choice) - 1
                     if 0 <= cat_index < len(categories):
                         cat = categories[cat_index]
-                        if driver and WEBSITE_CONFIGS["daraz"]["accessible"]:
-                            count = scrape_real_website(driver, "daraz", cat)
-                        else:
-                            count = scrape_demo_data("daraz", cat)
+                        count = scrape_category(driver_pool, "daraz", cat)
                         print(f"\n✅ Added {count} products from Daraz")
                     else:
                         print("❌ Invalid category number")
@@ -683,10 +571,7 @@ def main():
             if cat_choice.lower() == 'all':
                 total = 0
                 for cat in categories:
-                    if driver and WEBSITE_CONFIGS["jacknutrition"]["accessible"]:
-                        count = scrape_real_website(driver, "jacknutrition", cat, max_pages=1)
-                    else:
-                        count = scrape_demo_data("jacknutrition", cat)
+                    count = scrape_category(driver_pool, "jacknutrition", cat)
                     total += count
                 print(f"\n✅ Total added from JackNutrition: {total}")
             else:
@@ -694,10 +579,7 @@ def main():
                     cat_index = int(cat_choice) - 1
                     if 0 <= cat_index < len(categories):
                         cat = categories[cat_index]
-                        if driver and WEBSITE_CONFIGS["jacknutrition"]["accessible"]:
-                            count = scrape_real_website(driver, "jacknutrition", cat)
-                        else:
-                            count = scrape_demo_data("jacknutrition", cat)
+                        count = scrape_category(driver_pool, "jacknutrition", cat)
                         print(f"\n✅ Added {count} products from JackNutrition")
                     else:
                         print("❌ Invalid category number")
@@ -710,18 +592,12 @@ def main():
             
             # Daraz
             print("\n📦 Daraz:")
-            if driver and WEBSITE_CONFIGS["daraz"]["accessible"]:
-                count = scrape_real_website(driver, "daraz", "protein powder", max_pages=1)
-            else:
-                count = scrape_demo_data("daraz", "protein powder")
+            count = scrape_category(driver_pool, "daraz", "protein powder")
             total += count
             
             # JackNutrition
             print("\n📦 JackNutrition:")
-            if driver and WEBSITE_CONFIGS["jacknutrition"]["accessible"]:
-                count = scrape_real_website(driver, "jacknutrition", "protein", max_pages=1)
-            else:
-                count = scrape_demo_data("jacknutrition", "protein")
+            count = scrape_category(driver_pool, "jacknutrition", "protein")
             total += count
             
             print(f"\n✅ Total added from both websites: {total}")
@@ -757,14 +633,18 @@ if __name__ == "__main__":
             print("Installing required packages...")
             import subprocess
             import sys
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "requests", "mysql-connector-python", "selenium"])
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "requests", "mysql-connector-python", "selenium", "beautifulsoup4", "lxml"])
         
-        main()
+        driver_pool = DriverPool(setup_driver, size=1)
+        main(driver_pool)
     except KeyboardInterrupt:
         print("\n\n⚠️ Program interrupted by user")
     except Exception as e:
         print(f"\n❌ Error: {e}")
     finally:
-        if 'driver' in locals():
-            driver.quit()
-            print("\n🔌 Browser closed.")
\ No newline at end of file
+        if 'driver_pool' in locals():
+            driver_pool.close()
+            print("\n🔌 Browser closed.")
+        page_stats.print_summary()
+        metrics.print_summary()
+        print(f"📊 Metrics written to {metrics.export()}")
\ No newline at end of file
@@ -0,0 +1,351 @@
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from db_pool import get_connection
+from product_writer import add_listener
+import fulltext
+import fuzzy
+import threading
+import argparse
+import heapq
+import json
+import time
+import re
+
+# -------------------- INDEX SETTINGS --------------------
+DEFAULT_K = 8                 # Same as the frontend dropdown
+CACHED_TOP_K = 20             # Suggestions kept per cached prefix
+WARM_PREFIX_LENGTH = 3        # Busy prefixes up to this length are cached when the index is built
+HEAVY_RANGE = 256             # Prefixes matching more keys than this are cached on first use
+KEY_LENGTH = 40               # Keys are truncated, longer prefixes are checked against the name
+DELTA_MIN_SIZE = 4096         # New keys wait in a small sorted array until it reaches
+DELTA_FRACTION = 32           # max(DELTA_MIN_SIZE, 1/DELTA_FRACTION of the main array)
+REFRESH_INTERVAL = 30         # Seconds between catch-up reads in --serve mode
+
+WORD_START_RE = re.compile(r'[a-z0-9]+')
+SPACES_RE = re.compile(r'\s+')
+
+def normalize_text(text):
+    return SPACES_RE.sub(" ", text.lower()).strip()
+
+def word_starts(normalized):
+    return [match.start() for match in WORD_START_RE.finditer(normalized)]
+
+# -------------------- PREFIX INDEX --------------------
+class PrefixIndex:
+    """
+    Autocomplete over product names, kept as one sorted array of keys.
+    Every word of a name starts a key ("whey" finds "Optimum Nutrition Whey 2kg"),
+    a prefix is a bisect range, and busy prefixes keep a precomputed top-k.
+    Suggestions are distinct names ranked by best rating, then shortest name.
+    """
+
+    def __init__(self):
+        self.keys = []          # sorted, truncated to KEY_LENGTH
+        self.postings = []      # name id for each key
+        self.delta = []         # recently added (key, name id), merged into keys in bulk
+        self.names = []         # display name per name id
+        self.normalized = []    # normalized name per name id
+        self.scores = []        # best rating_value seen per name id
+        self.name_ids = {}      # normalized name -> name id
+        self.top_k = {}         # prefix -> name ids, best first
+        self.max_product_id = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    # ---------- building ----------
+    def build(self, rows):
+        """Load (id, product_name, rating_value) rows in one pass and one sort"""
+        entries = []
+        with self.lock:
+            for product_id, name, rating in rows:
+                self.max_product_id = max(self.max_product_id, product_id or 0)
+                name_id, is_new, _ = self._upsert_name(name, rating)
+                if is_new:
+                    entries.extend(self._keys_for(name_id))
+            entries.sort()
+            self.keys = [key for key, _ in entries]
+            self.postings = [name_id for _, name_id in entries]
+            self.delta = []
+            self.top_k = {}
+            self._warm_cache()
+
+    def _warm_cache(self):
+        prefixes = {key[:length] for key in self.keys for length in range(1, WARM_PREFIX_LENGTH + 1)}
+        for prefix in prefixes:
+            if self._range_size(prefix) > HEAVY_RANGE:
+                self.top_k[prefix] = self._rank_range(prefix, CACHED_TOP_K)
+
+    def _upsert_name(self, name, rating):
+        """Returns (name id, is_new, score_raised); name id is None for blank names"""
+        if not name or not name.strip():
+            return None, False, False
+        normalized = normalize_text(name)
+        score = rating or 0.0
+        name_id = self.name_ids.get(normalized)
+        if name_id is None:
+            name_id = len(self.names)
+            self.name_ids[normalized] = name_id
+            self.names.append(name.strip())
+            self.normalized.append(normalized)
+            self.scores.append(score)
+            return name_id, True, False
+        if score > self.scores[name_id]:
+            # Scores only go up, so a name outside a cached top-k can only enter through here
+            self.scores[name_id] = score
+            return name_id, False, True
+        return name_id, False, False
+
+    def _keys_for(self, name_id):
+        normalized = self.normalized[name_id]
+        return [(normalized[start:start + KEY_LENGTH], name_id) for start in word_starts(normalized)]
+
+    # ---------- incremental updates ----------
+    def add(self, items):
+        """Add (product_name, rating_value) pairs, e.g. from a ProductWriter flush"""
+        with self.lock:
+            entries = []
+            raised = []
+            for name, rating in items:
+                name_id, is_new, score_raised = self._upsert_name(name, rating)
+                if is_new:
+                    entries.extend(self._keys_for(name_id))
+                elif score_raised:
+                    raised.extend(self._keys_for(name_id))
+            if not entries and not raised:
+                return
+
+            # Merging into the small delta array is cheap; the big array is only rewritten
+            # when the delta outgrows a fraction of it, so each key is copied O(1) times on average
+            for entry in sorted(entries):
+                self.delta.insert(bisect_right(self.delta, entry), entry)
+            if len(self.delta) >= max(DELTA_MIN_SIZE, len(self.keys) // DELTA_FRACTION):
+                self._merge_delta()
+
+            for key, name_id in entries + raised:
+                self._update_cache(key, name_id)
+
+    def _merge_delta(self):
+        # Two sorted runs, which sorted() merges in linear time
+        merged = sorted(list(zip(self.keys, self.postings)) + self.delta)
+        self.keys = [key for key, _ in merged]
+        self.postings = [name_id for _, name_id in merged]
+        self.delta = []
+
+    def on_rows(self, rows):
+        """ProductWriter listener: rows are the written upsert rows (normalize.py columns at the end)"""
+        self.add((row[0], row[10]) for row in rows)
+
+    def _update_cache(self, key, name_id):
+        rank = self._rank(name_id)
+        for length in range(1, len(key) + 1):
+            cached = self.top_k.get(key[:length])
+            if cached is None:
+                continue
+            if name_id in cached:
+                cached.remove(name_id)
+            elif len(cached) >= CACHED_TOP_K and rank >= self._rank(cached[-1]):
+                continue
+            position = 0
+            while position < len(cached) and self._rank(cached[position]) < rank:
+                position += 1
+            cached.insert(position, name_id)
+            del cached[CACHED_TOP_K:]
+
+    def refresh(self):
+        """Pick up rows other processes inserted since the last build/refresh"""
+        db, cursor = get_connection()
+        try:
+            cursor.execute("SELECT id, product_name, rating_value FROM daraz_products WHERE id > %s ORDER BY id",
+                           (self.max_product_id,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            db.close()
+        if rows:
+            self.max_product_id = rows[-1][0]
+            self.add((name, rating) for _, name, rating in rows)
+        return len(rows)
+
+    # ---------- queries ----------
+    def _rank(self, name_id):
+        return -self.scores[name_id], len(self.names[name_id]), self.normalized[name_id]
+
+    @staticmethod
+    def _range(keys, key_prefix):
+        low = bisect_left(keys, key_prefix)
+        return low, bisect_left(keys, key_prefix + "\uffff", low)
+
+    def _delta_range(self, key_prefix):
+        low = bisect_left(self.delta, (key_prefix,))
+        return low, bisect_left(self.delta, (key_prefix + "\uffff",), low)
+
+    def _range_size(self, key_prefix):
+        low, high = self._range(self.keys, key_prefix)
+        delta_low, delta_high = self._delta_range(key_prefix)
+        return high - low + delta_high - delta_low
+
+    def _rank_range(self, prefix, k):
+        low, high = self._range(self.keys, prefix[:KEY_LENGTH])
+        delta_low, delta_high = self._delta_range(prefix[:KEY_LENGTH])
+        name_ids = set(self.postings[low:high])
+        name_ids.update(name_id for _, name_id in self.delta[delta_low:delta_high])
+        if len(prefix) > KEY_LENGTH:
+            # Keys are truncated, so confirm the full prefix against the name
+            name_ids = {name_id for name_id in name_ids
+                        if any(self.normalized[name_id].startswith(prefix, start)
+                               for start in word_starts(self.normalized[name_id]))}
+        return heapq.nsmallest(k, name_ids, key=self._rank)
+
+    def suggest(self, prefix, k=DEFAULT_K):
+        """Up to k product names with a word starting with prefix, best first"""
+        if not prefix:
+            return []
+        prefix = normalize_text(prefix)
+        if not prefix:
+            return []
+
+        with self.lock:
+            if k <= CACHED_TOP_K:
+                cached = self.top_k.get(prefix)
+                if cached is None and len(prefix) <= KEY_LENGTH and self._range_size(prefix) > HEAVY_RANGE:
+                    # Busy prefix: rank it once, then _update_cache keeps it current
+                    cached = self.top_k[prefix] = self._rank_range(prefix, CACHED_TOP_K)
+                if cached is not None:
+                    return [self.names[name_id] for name_id in cached[:k]]
+            return [self.names[name_id] for name_id in self._rank_range(prefix, k)]
+
+# -------------------- SHARED INDEX --------------------
+# Built from the table on first use, then kept current by every ProductWriter flush
+_index = None
+_index_lock = threading.Lock()
+
+def build_from_db():
+    index = PrefixIndex()
+    db, cursor = get_connection()
+    try:
+        cursor.execute("SELECT id, product_name, rating_value FROM daraz_products")
+        index.build(cursor.fetchall())
+    finally:
+        cursor.close()
+        db.close()
+    return index
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            started = time.perf_counter()
+            _index = build_from_db()
+            add_listener(_index.on_rows)
+            print(f"🔎 Prefix index: {len(_index)} names, {len(_index.keys)} keys "
+                  f"in {time.perf_counter() - started:.2f}s")
+        return _index
+
+def suggest(prefix, k=DEFAULT_K):
+    return get_index().suggest(prefix, k)
+
+# -------------------- SUGGEST ENDPOINT --------------------
+class SuggestHandler(BaseHTTPRequestHandler):
+    """
+    GET /api/suggest?q=whe&k=8 -> {"query": "whe", "suggestions": [...]}
+    GET /api/search?q=whey 5lb&k=10&site=Daraz&category=protein -> BM25 results (fulltext.py),
+        with typos corrected first (fuzzy.py)
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        routes = {"/api/suggest": self._suggest, "/api/search": self._search}
+        if url.path not in routes:
+            self._send(404, {"error": "Not found"})
+            return
+
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        try:
+            k = max(1, min(int(params.get("k", DEFAULT_K)), 100))
+        except ValueError:
+            self._send(400, {"error": "k must be a number"})
+            return
+
+        started = time.perf_counter()
+        payload = routes[url.path](params.get("q", ""), k, params)
+        payload["took_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        self._send(200, payload)
+
+    def _suggest(self, query, k, params):
+        return {"query": query, "suggestions": suggest(query, k)}
+
+    def _search(self, query, k, params):
+        corrected, results = fuzzy.search(query, k, params.get("site"), params.get("category"))
+        return {
+            "query": query,
+            "corrected": corrected,
+            "results": [
+                {"score": score, "product_name": name, "category": category, "website": website,
+                 "product_link": link}
+                for score, name, category, website, link in results
+            ],
+        }
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        # Same open CORS policy as server.js
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# Indexes the server keeps in step with rows written by scraper processes
+SERVED_INDEXES = [
+    ("Prefix index", get_index),
+    ("Full-text index", fulltext.get_index),
+    ("Fuzzy index", fuzzy.get_index),
+]
+
+def _refresh_loop(interval):
+    while True:
+        time.sleep(interval)
+        for label, index_getter in SERVED_INDEXES:
+            try:
+                added = index_getter().refresh()
+                if added:
+                    print(f"🔎 {label}: +{added} rows")
+            except Exception as e:
+                print(f"⚠️ {label} refresh failed: {e}")
+
+def serve(port=5001, refresh_interval=REFRESH_INTERVAL):
+    for _, index_getter in SERVED_INDEXES:
+        index_getter()
+    threading.Thread(target=_refresh_loop, args=(refresh_interval,), daemon=True).start()
+    server = ThreadingHTTPServer(("0.0.0.0", port), SuggestHandler)
+    print(f"🚀 Search API on http://localhost:{port}/api/suggest?q=whey and /api/search?q=whey")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Product name autocomplete")
+    parser.add_argument("--serve", action="store_true", help="run the /api/suggest and /api/search endpoints")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("prefixes", nargs="*", help="prefixes to look up")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+    for prefix in args.prefixes:
+        started = time.perf_counter()
+        results = suggest(prefix, args.k)
+        print(f"{prefix!r} ({(time.perf_counter() - started) * 1000:.3f} ms):")
+        for name in results:
+            print(f"  • {name}")
@@ -0,0 +1,151 @@
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from crawl_state import product_list_hash
+from metrics import metrics
+import requests
+import threading
+
+# -------------------- HTTP SETTINGS --------------------
+REQUEST_TIMEOUT = 15
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Same fallback title selector extract_product_info uses
+TITLE_SELECTOR = ".title, .product-title, .name"
+
+# -------------------- SESSION POOL --------------------
+_local = threading.local()
+
+def get_session():
+    """One keep-alive requests.Session per worker thread"""
+    if not hasattr(_local, "session"):
+        session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(HEADERS)
+        _local.session = session
+    return _local.session
+
+def fetch_html(url, timeout=REQUEST_TIMEOUT):
+    """Download a listing page without a browser. Returns None on failure"""
+    try:
+        response = get_session().get(url, timeout=timeout)
+        if response.status_code != 200:
+            print(f"   ⚠️ HTTP {response.status_code} for {url}")
+            return None
+        return response.text
+    except requests.RequestException as e:
+        print(f"   ⚠️ Request error: {str(e)[:100]}")
+        return None
+
+def fetch_page(url, headers=None, timeout=REQUEST_TIMEOUT):
+    """
+    GET with extra (e.g. conditional) headers. Returns (status, html, etag, last_modified):
+    status 304 means unchanged since the validators were issued, None means the fetch failed.
+    """
+    try:
+        response = get_session().get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        print(f"   ⚠️ Request error: {str(e)[:100]}")
+        return None, None, None, None
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if response.status_code == 304:
+        return 304, None, etag, last_modified
+    if response.status_code != 200:
+        print(f"   ⚠️ HTTP {response.status_code} for {url}")
+        return None, None, None, None
+    return 200, response.text, etag, last_modified
+
+# -------------------- HTML EXTRACTION --------------------
+def _select_text(node, selector):
+    element = node.select_one(selector)
+    if element is None:
+        return None
+    text = element.get_text(" ", strip=True)
+    return text or None
+
+def extract_listing(html, config, website_name):
+    """
+    (products, has_next) for a listing page. has_next comes from the site's
+    next_page selector, None when it has none configured.
+    """
+    selectors = config['selectors']
+    soup = BeautifulSoup(html, "lxml")
+    has_next = bool(soup.select_one(selectors['next_page'])) if selectors.get('next_page') else None
+
+    products = []
+    seen_links = set()
+    for container in soup.select(selectors['product_container']):
+        # Get product link
+        link_element = container.select_one(selectors['product_link']) or container.find("a", href=True)
+        if link_element is None or not link_element.get("href"):
+            continue
+        link = urljoin(config['base_url'], link_element["href"])
+
+        # Nested containers (e.g. .grid__item > .product-item) match the same product twice
+        if link in seen_links:
+            continue
+        seen_links.add(link)
+
+        # Get product name
+        name = None
+        if 'product_name' in selectors:
+            name = _select_text(container, selectors['product_name'])
+        elif website_name != "daraz":
+            name = _select_text(container, TITLE_SELECTOR)
+        if not name and 'product_image' in selectors:
+            img = container.select_one(selectors['product_image'])
+            if img is not None:
+                name = (img.get(selectors['product_name_attr']) or "").strip()
+        if not name:
+            name = "Unknown Product"
+
+        # Get price
+        price = _select_text(container, selectors['price']) or "Price not available"
+
+        # Get rating
+        rating = "No Rating"
+        if website_name == "daraz":
+            rating = _select_text(container, selectors['rating']) or "No Rating"
+
+        products.append({
+            'name': name,
+            'price': price,
+            'rating': rating,
+            'link': link
+        })
+
+    return products, has_next
+
+def fetch_changed_products(url, config, website_name, category, state):
+    """
+    Conditional fetch of a listing page against its crawl_state entry.
+    Returns (status, products, has_next, validators):
+      "unchanged" - 304, or the same product list as last time (already recorded in state)
+      "failed"    - fetch error, products is None
+      "changed"   - new products; call state.record(url, ..., *validators) once they are written
+    has_next is the next-page marker (see extract_listing), None after a 304.
+    """
+    with metrics.timer("http_fetch"):
+        status, html, etag, last_modified = fetch_page(url, state.conditional_headers(url))
+    if status == 304:
+        state.record(url, website_name, category, etag=etag, last_modified=last_modified)
+        return "unchanged", None, None, None
+    if status is None:
+        return "failed", None, False, None
+
+    with metrics.timer("html_parse"):
+        products, has_next = extract_listing(html, config, website_name)
+    page_hash = product_list_hash(products)
+    if products and state.unchanged(url, page_hash):
+        state.record(url, website_name, category, page_hash, etag, last_modified)
+        return "unchanged", None, has_next, None
+    return "changed", products, has_next, (page_hash, etag, last_modified)
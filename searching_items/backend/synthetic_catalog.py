@@ -0,0 +1,288 @@
+from db_pool import get_connection, configure_pool, SQLitePool
+from product_writer import ProductWriter
+from price_history import PriceTracker, price_trend
+from link_dedup import LinkDeduper
+from normalize import find_products
+from quantity import extract_quantity
+from multiscraper import WEBSITE_CONFIGS
+import argparse
+import random
+import time
+
+# -------------------- GENERATOR SETTINGS --------------------
+DEFAULT_ROWS = 1_000_000
+DEFAULT_BATCH_SIZE = 5000       # Rows per ProductWriter transaction
+TRACKER_ROWS = 100_000          # Fresh PriceTracker after this many rows (keeps memory flat)
+REPORT_EVERY = 100_000
+QUERY_SAMPLES = 100
+SYNTHETIC_MARKER = "/synthetic/"    # In every generated link, so --purge can find them again
+WEBSITE_WEIGHTS = {"daraz": 0.5, "jacknutrition": 0.15, "amazon": 0.35}
+
+BRANDS = ["Optimum Nutrition", "MuscleTech", "Dymatize", "BSN", "MyProtein", "Jack Nutrition",
+          "Cellucor", "Rule 1", "GNC", "Universal Nutrition", "Scitec Nutrition", "Applied Nutrition",
+          "Nutrex", "Muscle Pharm", "Ultimate Nutrition", "Kevin Levrone", "Evlution Nutrition",
+          "Now Foods", "Nature's Bounty", "Centrum", "Ghost", "Transparent Labs", "Allmax", "Redcon1"]
+# Category keyword -> (product lines, quantity formats, price range in PKR per kg).
+# Only quantity formats extract_quantity understands; capsules and tablets use CAPSULE_PRICE
+PRODUCT_TYPES = {
+    "whey": (["Gold Standard 100% Whey", "Nitro-Tech Whey Gold", "ISO100 Hydrolyzed", "Impact Whey Protein",
+              "Syntha-6 Protein Powder", "Prostar 100% Whey", "R1 Protein", "Iso Whey Zero"],
+             ["{kg}kg", "{kg} kg", "{lb}lb", "{lb} pound", "{g}g", "{g} gm", "{n} x {g}g"], (6000, 14000)),
+    "protein": (["Casein Protein", "Plant Protein Blend", "Egg White Protein", "Beef Protein Isolate",
+                 "Protein Powder", "Clear Whey Isolate", "Vegan Protein"],
+                ["{kg}kg", "{lb}lb", "{g}g", "{n} x {g}g", "{lb} pound"], (5000, 12000)),
+    "creatine": (["Creatine Monohydrate", "Micronized Creatine", "Creatine HCL", "Cell-Tech Creatine",
+                  "Platinum 100% Creatine", "Creapure Creatine"],
+                 ["{g}g", "{g} gm", "{caps} Capsules", "{caps} caps", "{serv} Servings"], (8000, 20000)),
+    "gainer": (["Serious Mass", "Mass Tech Extreme 2000", "Super Mass Gainer", "True Mass", "Real Gains",
+                "Up Your Mass"],
+               ["{lb}lb", "{lb} pound", "{kg}kg", "{kg} kg"], (2500, 5000)),
+    "vitamin": (["Opti-Men Multivitamin", "Vitamin D3 5000 IU", "Omega 3 Fish Oil", "Vitamin C 1000mg",
+                 "ZMA", "Animal Pak", "Daily Multi", "Magnesium Glycinate"],
+                ["{caps} Capsules", "{caps} Tablets", "{caps} caps", "{n} x {caps} capsules"],
+                None),
+    "pre workout": (["C4 Original Pre-Workout", "Gold Standard Pre-Workout", "Total War", "Psychotic",
+                     "Pre-Kaged", "Legend Pre-Workout"],
+                    ["{serv} Servings", "{g}g", "{serv} Scoops"], (15000, 30000)),
+}
+FLAVOURS = ["", "", "", "Double Rich Chocolate", "Vanilla Ice Cream", "Cookies & Cream", "Strawberry",
+            "Unflavored", "Blue Raspberry", "Fruit Punch", "Mocha Cappuccino", "Banana Cream"]
+EXTRAS = ["", "", "", "", "(Imported)", "Free Shaker", "- Original", "100% Authentic", "Buy 1 Get 1",
+          "With Free Shipping", "New Look"]
+CAPSULE_PRICE = (8, 40)         # PKR per capsule/tablet
+PKR_PER_USD = 280
+
+# -------------------- GENERATOR --------------------
+def _product_type(category):
+    for keyword in ("whey", "creatine", "gainer", "vitamin", "pre workout", "protein"):
+        if keyword in category:
+            return PRODUCT_TYPES[keyword]
+    return PRODUCT_TYPES["protein"]
+
+def _quantity(rng, formats):
+    """(text for the name, amount in kg, or capsules when per_unit) for pricing"""
+    values = {"kg": rng.choice([1, 2, 2.27, 4.5, 5]), "lb": rng.choice([2, 5, 6, 10, 12]),
+              "g": rng.choice([250, 300, 454, 500, 907, 1000]), "n": rng.choice([2, 3, 4, 6]),
+              "caps": rng.choice([30, 60, 90, 100, 120, 180, 240]), "serv": rng.choice([20, 30, 40, 60, 80])}
+    text = rng.choice(formats)
+    per_unit = "{caps}" in text
+    if "{kg}" in text:
+        amount = values["kg"]
+    elif "{lb}" in text:
+        amount = values["lb"] * 0.4536
+    elif "{g}" in text:
+        amount = values["g"] / 1000
+    elif "{serv}" in text:
+        amount = values["serv"] * 0.01
+    else:
+        amount = values["caps"]
+    if "{n}" in text:
+        amount *= values["n"]
+    return text.format(**values), amount, per_unit
+
+def _price_text(website, pkr):
+    if website == "amazon":
+        return f"${pkr / PKR_PER_USD:,.2f}"
+    if website == "jacknutrition":
+        return f"Rs.{round(pkr, -1):,.2f}"
+    return f"Rs. {round(pkr, -1):,.0f}"
+
+def _rating_text(rng, website):
+    if website == "jacknutrition" or rng.random() < 0.25:
+        return "No Rating"
+    return f"{rng.triangular(2.5, 5.0, 4.5):.1f}"
+
+def generate_rows(count, seed=42):
+    """
+    Yield `count` ProductWriter rows (product_name, price, rating, category, website,
+    product_link, page, quantity), one at a time. The same seed gives the same
+    catalog; links contain SYNTHETIC_MARKER, the seed and the row number.
+    """
+    rng = random.Random(seed)
+    websites = list(WEBSITE_WEIGHTS)
+    weights = [WEBSITE_WEIGHTS[website] for website in websites]
+    categories = {website: list(WEBSITE_CONFIGS[website]['search_urls']) for website in websites}
+
+    for number in range(count):
+        website = rng.choices(websites, weights)[0]
+        config = WEBSITE_CONFIGS[website]
+        category = rng.choice(categories[website])
+        lines, formats, per_kg = _product_type(category)
+
+        quantity_text, amount, per_unit = _quantity(rng, formats)
+        low, high = CAPSULE_PRICE if per_unit else per_kg
+        parts = [rng.choice(BRANDS), rng.choice(lines), rng.choice(FLAVOURS), quantity_text, rng.choice(EXTRAS)]
+        if rng.random() < 0.2:
+            # Quantity first, as some listings write it
+            parts.insert(0, parts.pop(3))
+        name = " ".join(part for part in parts if part)
+
+        price = _price_text(website, rng.uniform(low, high) * amount)
+        link = f"{config['base_url']}{SYNTHETIC_MARKER}{seed}-{number}"
+        yield (name, price, _rating_text(rng, website), category, config['name'], link,
+               number // 40 + 1, extract_quantity(name, website))
+
+# -------------------- BULK LOAD --------------------
+def load_catalog(rows=DEFAULT_ROWS, seed=42, batch_size=DEFAULT_BATCH_SIZE):
+    """Stream generated rows into daraz_products through ProductWriter. Returns (rows, seconds)"""
+    db, cursor = get_connection()
+    written = 0
+    started = time.perf_counter()
+    try:
+        writer = None
+        for values in generate_rows(rows, seed):
+            if written % TRACKER_ROWS == 0:
+                if writer:
+                    writer.close()
+                writer = ProductWriter(db, cursor, batch_size, tracker=PriceTracker())
+            writer.add(values, is_new=True)
+            written += 1
+            if written % REPORT_EVERY == 0:
+                elapsed = time.perf_counter() - started
+                print(f"   📦 {written:,} rows in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s)")
+        if writer:
+            writer.close()
+    finally:
+        cursor.close()
+        db.close()
+    elapsed = time.perf_counter() - started
+    print(f"✅ Loaded {written:,} rows in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s)")
+    return written, elapsed
+
+def purge_synthetic():
+    """Delete every generated product and its price history. Returns the product count"""
+    db, cursor = get_connection()
+    try:
+        db.start_transaction()
+        cursor.execute("""
+            DELETE FROM price_history WHERE product_id IN
+                (SELECT id FROM daraz_products WHERE product_link LIKE %s)
+        """, (f"%{SYNTHETIC_MARKER}%",))
+        cursor.execute("DELETE FROM daraz_products WHERE product_link LIKE %s", (f"%{SYNTHETIC_MARKER}%",))
+        count = cursor.rowcount
+        db.commit()
+    finally:
+        cursor.close()
+        db.close()
+    print(f"🗑️ Deleted {count:,} synthetic products")
+    return count
+
+# -------------------- MEASUREMENTS --------------------
+def storage_sizes():
+    """{table or index name: bytes} for daraz_products and price_history"""
+    db, cursor = get_connection()
+    try:
+        if getattr(db, "dialect", "mysql") == "sqlite":
+            try:
+                cursor.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+                return {name: size for name, size in cursor.fetchall()
+                        if name.startswith(("daraz_products", "price_history", "idx_", "sqlite_autoindex_daraz"))}
+            except Exception:
+                # SQLite built without the dbstat table: whole file only
+                cursor.execute("PRAGMA page_count")
+                pages = cursor.fetchone()[0]
+                cursor.execute("PRAGMA page_size")
+                return {"database": pages * cursor.fetchone()[0]}
+        cursor.execute("""
+            SELECT table_name, index_name, stat_value * @@innodb_page_size
+            FROM mysql.innodb_index_stats
+            WHERE database_name = DATABASE() AND table_name IN ('daraz_products', 'price_history')
+              AND stat_name = 'size'
+        """)
+        return {f"{table}.{index}": size for table, index, size in cursor.fetchall()}
+    finally:
+        cursor.close()
+        db.close()
+
+def _sample_products(samples, seed):
+    """(id, link, website, category) of random stored products, found by random id probes"""
+    rng = random.Random(seed)
+    db, cursor = get_connection()
+    try:
+        cursor.execute("SELECT MIN(id), MAX(id) FROM daraz_products")
+        low, high = cursor.fetchone()
+        products = []
+        for _ in range(samples):
+            cursor.execute("SELECT id, product_link, website, category FROM daraz_products WHERE id >= %s ORDER BY id LIMIT 1",
+                           (rng.randint(low, high),))
+            products.append(cursor.fetchone())
+        return products
+    finally:
+        cursor.close()
+        db.close()
+
+def _category_page(website, category):
+    db, cursor = get_connection()
+    try:
+        cursor.execute("""
+            SELECT id, product_name, price, rating FROM daraz_products
+            WHERE website = %s AND category = %s
+            ORDER BY id LIMIT 20
+        """, (website, category))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+def _link_lookup(link):
+    db, cursor = get_connection()
+    try:
+        return LinkDeduper(db, cursor).existing_links([link])
+    finally:
+        cursor.close()
+        db.close()
+
+def query_latencies(samples=QUERY_SAMPLES, seed=7):
+    """{query: (p50 ms, p99 ms)} for the lookups the scrapers and the search API make"""
+    products = [product for product in _sample_products(samples, seed) if product]
+    rng = random.Random(seed)
+    queries = {
+        "link lookup (dedup)": lambda product: _link_lookup(product[1]),
+        "category page": lambda product: _category_page(product[2], product[3]),
+        "find_products keyword+price": lambda product: find_products(
+            rng.choice(["whey", "creatine", "gainer", "vitamin"]), max_price=rng.choice([5000, 15000, 40000])),
+        "find_products cheapest per kg": lambda product: find_products(qty_unit="g"),
+        "price_trend": lambda product: price_trend(product[0]),
+    }
+    results = {}
+    for name, query in queries.items():
+        latencies = []
+        for product in products:
+            started = time.perf_counter()
+            query(product)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        results[name] = (latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))])
+    return results
+
+def report(samples=QUERY_SAMPLES):
+    print("\n💾 Storage:")
+    for name, size in sorted(storage_sizes().items(), key=lambda item: -item[1]):
+        print(f"   {name:40} {size / 1024 / 1024:10.1f} MB")
+    print(f"\n⏱️ Query latency ({samples} samples):")
+    for name, (p50, p99) in query_latencies(samples).items():
+        print(f"   {name:32} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic product catalog for load tests")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--seed", type=int, default=42, help="same seed = same catalog (re-running updates it)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help='load into this SQLite file (":memory:" for a throwaway run) instead of SCRAPER_DB')
+    parser.add_argument("--report", action="store_true", help="print storage sizes and query latency afterwards")
+    parser.add_argument("--report-only", action="store_true", help="measure the current table without loading")
+    parser.add_argument("--samples", type=int, default=QUERY_SAMPLES, help="queries per latency measurement")
+    parser.add_argument("--purge", action="store_true", help="delete all synthetic products and exit")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        configure_pool("sqlite", SQLitePool(args.sqlite))
+    if args.purge:
+        purge_synthetic()
+    elif args.report_only:
+        report(args.samples)
+    else:
+        load_catalog(args.rows, args.seed, args.batch_size)
+        if args.report:
+            report(args.samples)
@@ -0,0 +1,22 @@
+from matching import ProductMatcher
+
+def test_quantity_tolerance_does_not_chain():
+    matcher = ProductMatcher()
+    matcher.add(1, "Optimum Nutrition Gold Standard 100% Whey 2kg")
+    matcher.add(2, "Optimum Nutrition Gold Standard 100% Whey 5lb")
+    matcher.add(9, "Optimum Nutrition Gold Standard 100% Whey 2.6kg")
+    matcher.add(10, "Optimum Nutrition Gold Standard 100% Whey 3kg")
+    assert sorted(matcher.clusters().values()) == [[1, 2], [9, 10]]
+
+def test_listings_without_brand_are_not_matched():
+    matcher = ProductMatcher()
+    matcher.add(1, "Mass Gainer 5kg")
+    matcher.add(2, "Mass Gainer 12lb")
+    matcher.add(3, "Mass Gainer 5kg")
+    assert sorted(matcher.clusters().values()) == [[1], [2], [3]]
+
+def test_same_brand_listings_still_match():
+    matcher = ProductMatcher()
+    matcher.add(1, "MuscleTech Mass Tech Extreme 2000 6lb")
+    matcher.add(2, "Muscle Tech Mass-Tech Extreme 2000 2.72kg Chocolate")
+    assert matcher.clusters() == {1: [1, 2]}